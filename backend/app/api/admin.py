@@ -0,0 +1,197 @@
+"""Admin-only runtime diagnostics endpoints.
+
+Endpoints are plain functions so FastAPI runs them in the threadpool;
+snapshots and statistics of a large heap take a while to compute. Every
+answer comes from the worker that handled the request (see ``pid``).
+"""
+
+import gc
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import PlainTextResponse
+
+from app.config import get_settings
+from app.core.exceptions import ConflictError, NotFoundError
+from app.core.loop_monitor import loop_monitor
+from app.core.memory import (
+    GroupBy,
+    SnapshotNotFound,
+    gc_stats,
+    memory_profiler,
+    rss_stats,
+)
+from app.core.profiler import ProfileNotFound, profiler
+from app.core.startup import startup_report
+from app.db.database import recent_slow_queries
+from app.dependencies import AdminUser
+
+router = APIRouter(prefix="/admin/diagnostics", tags=["admin"])
+
+# Time left after a window profile for the response, within the deadline
+_WINDOW_HEADROOM_SECONDS = 5.0
+
+
+@router.get("/memory")
+def memory_overview(admin: AdminUser) -> dict[str, Any]:
+    """RSS, garbage collector and tracemalloc state of this worker."""
+    return {
+        **memory_profiler.status(),
+        **rss_stats(),
+        "gc": gc_stats(),
+    }
+
+
+@router.post("/memory/tracemalloc/start")
+def start_tracing(
+    admin: AdminUser, frames: int = Query(default=1, ge=1, le=64)
+) -> dict[str, Any]:
+    """Start tracing allocations (restarts tracing if ``frames`` changed)."""
+    memory_profiler.start(frames)
+    return memory_profiler.status()
+
+
+@router.post("/memory/tracemalloc/stop")
+def stop_tracing(admin: AdminUser) -> dict[str, Any]:
+    """Stop tracing and drop all snapshots."""
+    memory_profiler.stop()
+    return memory_profiler.status()
+
+
+@router.post("/memory/gc")
+def collect_garbage(admin: AdminUser) -> dict[str, Any]:
+    """Run a full collection, e.g. before a snapshot."""
+    collected = gc.collect()
+    return {"collected": collected, **rss_stats(), "gc": gc_stats()}
+
+
+@router.post("/memory/snapshots", status_code=201)
+def take_snapshot(admin: AdminUser) -> dict[str, Any]:
+    """Snapshot the traced allocations; only the latest few are kept."""
+    try:
+        return memory_profiler.take_snapshot()
+    except RuntimeError as e:
+        raise ConflictError(str(e))
+
+
+@router.delete("/memory/snapshots/{snapshot_id}", status_code=204)
+def delete_snapshot(snapshot_id: int, admin: AdminUser) -> Response:
+    """Drop a snapshot."""
+    try:
+        memory_profiler.delete_snapshot(snapshot_id)
+    except SnapshotNotFound:
+        raise NotFoundError("Snapshot")
+    return Response(status_code=204)
+
+
+@router.get("/memory/snapshots/{snapshot_id}/top")
+def top_allocations(
+    snapshot_id: int,
+    admin: AdminUser,
+    group_by: GroupBy = "lineno",
+    limit: int = Query(default=20, ge=1, le=500),
+) -> dict[str, Any]:
+    """The allocation sites holding the most memory in a snapshot."""
+    try:
+        stats = memory_profiler.top(snapshot_id, group_by, limit)
+    except SnapshotNotFound:
+        raise NotFoundError("Snapshot")
+    return {"snapshot": snapshot_id, "group_by": group_by, "top": stats}
+
+
+@router.get("/memory/snapshots/{snapshot_id}/diff/{base_id}")
+def diff_allocations(
+    snapshot_id: int,
+    base_id: int,
+    admin: AdminUser,
+    group_by: GroupBy = "lineno",
+    limit: int = Query(default=20, ge=1, le=500),
+) -> dict[str, Any]:
+    """The allocation sites that grew the most since the base snapshot."""
+    if snapshot_id == base_id:
+        raise HTTPException(status_code=400, detail="Compare two different snapshots")
+    try:
+        stats = memory_profiler.diff(snapshot_id, base_id, group_by, limit)
+    except SnapshotNotFound:
+        raise NotFoundError("Snapshot")
+    return {
+        "snapshot": snapshot_id,
+        "base": base_id,
+        "group_by": group_by,
+        "diff": stats,
+    }
+
+
+@router.get("/event-loop")
+def event_loop_overview(admin: AdminUser) -> dict[str, Any]:
+    """Event-loop lag and the stacks of recent blocking callbacks."""
+    return loop_monitor.status()
+
+
+@router.get("/db/slow-queries")
+def slow_queries(admin: AdminUser) -> dict[str, Any]:
+    """The most recent slow statements, newest last."""
+    return {"queries": list(recent_slow_queries)}
+
+
+@router.get("/profiler")
+def profiler_status(admin: AdminUser) -> dict[str, Any]:
+    """Armed request filter, running and finished profiles of this worker."""
+    return profiler.status()
+
+
+@router.post("/profiler/requests")
+def arm_request_profiling(
+    admin: AdminUser,
+    path_prefix: str = Query(default="/api/", min_length=1),
+    count: int = Query(default=1, ge=1, le=100),
+    method: str | None = None,
+) -> dict[str, Any]:
+    """Profile the next ``count`` matching requests handled by this worker.
+
+    Each profiled response carries an ``X-Profile-Id`` header.
+    """
+    profiler.arm(path_prefix, count, method)
+    return profiler.status()
+
+
+@router.delete("/profiler/requests", status_code=204)
+def disarm_request_profiling(admin: AdminUser) -> Response:
+    """Stop profiling requests that have not started yet."""
+    profiler.disarm()
+    return Response(status_code=204)
+
+
+@router.post("/profiler/window", response_class=PlainTextResponse)
+def profile_window(
+    admin: AdminUser, seconds: float = Query(default=10.0, gt=0)
+) -> PlainTextResponse:
+    """Profile every thread of this worker for a while; returns folded stacks.
+
+    The window must end before the request deadline, which for this route
+    is ``request_max_timeout_seconds``.
+    """
+    limit = get_settings().request_max_timeout_seconds - _WINDOW_HEADROOM_SECONDS
+    if seconds > limit:
+        raise HTTPException(
+            status_code=400, detail=f"Window must be at most {limit:g} seconds"
+        )
+    profile = profiler.profile_window(seconds)
+    return PlainTextResponse(
+        profile.folded(), headers={"X-Profile-Id": str(profile.id)}
+    )
+
+
+@router.get("/profiler/profiles/{profile_id}", response_class=PlainTextResponse)
+def download_profile(profile_id: int, admin: AdminUser) -> PlainTextResponse:
+    """A finished profile as folded stacks (flamegraph.pl, speedscope)."""
+    try:
+        return PlainTextResponse(profiler.get(profile_id).folded())
+    except ProfileNotFound:
+        raise NotFoundError("Profile")
+
+
+@router.get("/startup")
+def startup_overview(admin: AdminUser) -> dict[str, Any]:
+    """How long this worker took to import and start up."""
+    return startup_report.as_dict()
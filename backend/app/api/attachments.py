@@ -0,0 +1,195 @@
+"""Attachment and avatar proxy endpoints with an on-disk cache."""
+
+import logging
+from urllib.parse import urlsplit
+
+import httpx
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+
+from app.api.relay import _get_connection_for_user
+from app.config import get_settings
+from app.dependencies import ConnectionRepo, CurrentUser
+from app.models.connection import JiraConnection
+from app.services.blob_cache import CachedBlob, blob_cache
+from app.services.relay_service import relay_service
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/jira", tags=["jira-attachments"])
+
+# Upstream headers worth passing through for binary content
+_PASSTHROUGH_HEADERS = (
+    "accept-ranges",
+    "content-disposition",
+    "content-range",
+    "etag",
+    "last-modified",
+)
+
+# Attachment content never changes for a given attachment ID
+_ATTACHMENT_CACHE_CONTROL = "private, max-age=86400, immutable"
+
+
+def _file_response(cached: CachedBlob, cache_control: str) -> FileResponse:
+    """Serve a cache hit straight from disk (handles Range requests)."""
+    headers = {"Cache-Control": cache_control}
+    if cached.content_disposition:
+        headers["Content-Disposition"] = cached.content_disposition
+    return FileResponse(cached.path, media_type=cached.content_type, headers=headers)
+
+
+async def _proxy_blob(
+    connection: JiraConnection,
+    path: str,
+    request: Request,
+    cache_control: str,
+    max_age: float | None = None,
+) -> Response:
+    """Serve binary content from the cache, or stream it from JIRA.
+
+    Complete (200) responses are written to the cache while they stream to
+    the client. Range requests that miss the cache are forwarded upstream
+    and streamed through without caching.
+    """
+    if connection.jira_url == "demo://local":
+        raise HTTPException(
+            status_code=404, detail="Binary content is not available in demo mode"
+        )
+
+    key = f"{connection.id}:{path}"
+    cached = await blob_cache.lookup(key, max_age=max_age)
+    if cached:
+        logger.info(f"[Attachments] Cache hit: {path}")
+        return _file_response(cached, cache_control)
+
+    range_header = request.headers.get("range")
+    try:
+        stream = await relay_service.open_stream(
+            connection, path, headers={"Range": range_header} if range_header else None
+        )
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Relay error: {str(e)}")
+
+    upstream = stream.response
+    if upstream.status_code not in (200, 206):
+        body = await upstream.aread()
+        await stream.aclose()
+        return Response(
+            content=body,
+            status_code=upstream.status_code,
+            media_type=upstream.headers.get("content-type"),
+        )
+
+    content_type = upstream.headers.get("content-type", "application/octet-stream")
+    headers = {
+        key: upstream.headers[key]
+        for key in _PASSTHROUGH_HEADERS
+        if key in upstream.headers
+    }
+    headers["Cache-Control"] = cache_control
+    # httpx decodes content-encoding, so the upstream length is only valid
+    # when the body was sent unencoded
+    if "content-length" in upstream.headers and not upstream.headers.get(
+        "content-encoding"
+    ):
+        headers["Content-Length"] = upstream.headers["content-length"]
+
+    writer = None
+    declared_size = int(upstream.headers.get("content-length", 0) or 0)
+    if upstream.status_code == 200 and declared_size <= blob_cache.max_item_bytes:
+        writer = blob_cache.open_writer(
+            key, content_type, upstream.headers.get("content-disposition")
+        )
+
+    async def body_iterator():
+        completed = False
+        try:
+            async for chunk in upstream.aiter_bytes():
+                if writer:
+                    await writer.write(chunk)
+                yield chunk
+            completed = True
+        finally:
+            await stream.aclose()
+            if writer and not completed:
+                await writer.abort()
+        if writer:
+            await writer.commit()
+
+    logger.info(f"[Attachments] Cache miss, streaming: {path}")
+    return StreamingResponse(
+        body_iterator(),
+        status_code=upstream.status_code,
+        headers=headers,
+        media_type=content_type,
+    )
+
+
+def _avatar_path(connection: JiraConnection, url: str) -> str:
+    """Turn an avatar URL into a path on the connection's JIRA host.
+
+    Only URLs on the JIRA host itself are proxied (those need credentials);
+    anything else could be used to send the API token to a third party.
+    """
+    base = urlsplit(connection.jira_url)
+    target = urlsplit(url)
+    if target.scheme or target.netloc:
+        if (target.scheme, target.netloc) != (base.scheme, base.netloc):
+            raise HTTPException(
+                status_code=400,
+                detail="Avatar URL must point to the connection's JIRA host",
+            )
+    if not target.path.startswith("/"):
+        raise HTTPException(status_code=400, detail="Invalid avatar URL")
+
+    # open_stream prefixes jira_url, which may already carry a context path
+    path = target.path
+    base_path = base.path.rstrip("/")
+    if base_path and path.startswith(f"{base_path}/"):
+        path = path[len(base_path) :]
+    if target.query:
+        path = f"{path}?{target.query}"
+    return path
+
+
+@router.get("/{connection_id}/attachment/{attachment_id}")
+async def get_attachment(
+    connection_id: str,
+    attachment_id: str,
+    request: Request,
+    current_user: CurrentUser,
+    connection_repo: ConnectionRepo,
+    thumbnail: bool = False,
+) -> Response:
+    """Stream attachment content (or its thumbnail) with caching and Range."""
+    if not attachment_id.isdigit():
+        raise HTTPException(status_code=400, detail="Invalid attachment ID")
+
+    connection = await _get_connection_for_user(
+        connection_id, current_user, connection_repo
+    )
+    kind = "thumbnail" if thumbnail else "content"
+    path = f"/rest/api/{connection.api_version}/attachment/{kind}/{attachment_id}"
+    return await _proxy_blob(connection, path, request, _ATTACHMENT_CACHE_CONTROL)
+
+
+@router.get("/{connection_id}/avatar")
+async def get_avatar(
+    connection_id: str,
+    url: str,
+    request: Request,
+    current_user: CurrentUser,
+    connection_repo: ConnectionRepo,
+) -> Response:
+    """Stream an avatar image from the JIRA host with a time-limited cache."""
+    connection = await _get_connection_for_user(
+        connection_id, current_user, connection_repo
+    )
+    ttl = get_settings().avatar_cache_ttl_seconds
+    return await _proxy_blob(
+        connection,
+        _avatar_path(connection, url),
+        request,
+        f"private, max-age={ttl}",
+        max_age=ttl,
+    )
@@ -0,0 +1,95 @@
+"""Outbox API endpoints for pushing pending local edits server-side."""
+
+from fastapi import APIRouter, HTTPException, Query, Response
+from sqlalchemy.exc import IntegrityError
+
+from app.core.exceptions import ConflictError, NotFoundError
+from app.dependencies import OutboxRepo, OwnedConnection
+from app.models.schemas import (
+    OutboxOperationList,
+    OutboxOperationResponse,
+    OutboxUploadRequest,
+)
+from app.services.outbox import outbox_worker
+
+router = APIRouter(prefix="/outbox", tags=["outbox"])
+
+
+@router.post(
+    "/{connection_id}/operations",
+    response_model=OutboxOperationList,
+    status_code=202,
+)
+async def upload_operations(
+    payload: OutboxUploadRequest,
+    connection: OwnedConnection,
+    outbox_repo: OutboxRepo,
+) -> OutboxOperationList:
+    """Queue pending operations; they are pushed to JIRA in the background.
+
+    Operations on the same issue run in upload order. Uploading an operation
+    with a ``client_op_id`` that was already uploaded returns the existing
+    operation instead of queueing it twice.
+    """
+    try:
+        operations = await outbox_repo.enqueue(
+            connection.user_id,
+            connection.id,
+            [
+                {
+                    "client_op_id": op.client_op_id,
+                    "entity_key": op.issue_key,
+                    "kind": op.kind,
+                    "payload": op.payload,
+                }
+                for op in payload.operations
+            ],
+        )
+    except IntegrityError:
+        raise ConflictError("Operations are being uploaded concurrently")
+    outbox_worker.notify()
+    return OutboxOperationList(
+        operations=[OutboxOperationResponse.model_validate(op) for op in operations]
+    )
+
+
+@router.get("/{connection_id}/operations", response_model=OutboxOperationList)
+async def list_operations(
+    connection: OwnedConnection,
+    outbox_repo: OutboxRepo,
+    ids: str | None = Query(None, description="Comma-separated operation IDs"),
+    status: str | None = None,
+    after_id: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=1000),
+) -> OutboxOperationList:
+    """Poll the state and results of queued operations."""
+    id_list = None
+    if ids:
+        try:
+            id_list = [int(i) for i in ids.split(",") if i.strip()]
+        except ValueError:
+            raise HTTPException(
+                status_code=400, detail="ids must be comma-separated integers"
+            )
+    operations = await outbox_repo.list_for_connection(
+        connection.id, ids=id_list, status=status, after_id=after_id, limit=limit
+    )
+    return OutboxOperationList(
+        operations=[OutboxOperationResponse.model_validate(op) for op in operations]
+    )
+
+
+@router.delete("/{connection_id}/operations/{op_id}", status_code=204)
+async def delete_operation(
+    op_id: int,
+    connection: OwnedConnection,
+    outbox_repo: OutboxRepo,
+) -> Response:
+    """Cancel a pending operation, or acknowledge a finished one."""
+    operation = await outbox_repo.get(connection.id, op_id)
+    if operation is None:
+        raise NotFoundError("Operation")
+    if operation.status == "running":
+        raise ConflictError("Operation is being pushed to JIRA")
+    await outbox_repo.delete(operation)
+    return Response(status_code=204)
@@ -1,18 +1,47 @@
 """JIRA relay proxy API endpoints."""
 
+import asyncio
 import json
 import logging
+import re
+from collections.abc import Iterable
 from typing import Any
+from urllib.parse import urlencode
 
-from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, Response
 from fastapi.responses import RedirectResponse
+from starlette.background import BackgroundTask
 
-from app.dependencies import ConnectionRepo, CurrentUser
-from app.services.relay_service import RelayError, relay_service
+from app.config import get_settings
+from app.core.lanes import PRIORITY_HEADER, lane_scope, request_lane
+from app.dependencies import ConnectionRepo, CurrentUser, get_owned_connection
+from app.models.connection import JiraConnection
+from app.models.schemas import (
+    RelayBatchItem,
+    RelayBatchRequest,
+    RelayBatchResponse,
+    RelayBatchResult,
+)
+from app.services.idempotency import idempotency_store, request_fingerprint
+from app.services.metadata_cache import metadata_cache
+from app.services.prewarm import should_record_use
+from app.services.relay_service import RelayError, RelayResponse, relay_service
+from app.services.search_index import index_payload, index_relay_response
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/jira", tags=["jira-relay"])
 
+# Methods that honour the Idempotency-Key header
+_IDEMPOTENT_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+# Batch sub-requests may only target the JIRA REST API
+_BATCH_PATH = re.compile(r"^/rest/api/\d+/[^?#]+$")
+
+
+def _request_lane(request: Request) -> str:
+    """Priority lane of a relay request: the client's header, else the route."""
+    return request_lane(request.url.path, request.headers.get(PRIORITY_HEADER))
+
 
 async def _get_connection_for_user(
     connection_id: str,
@@ -23,25 +52,13 @@ async def _get_connection_for_user(
     logger.info(
         f"[Relay] Looking up connection: {connection_id} for user: {current_user.id}"
     )
-    connection = await connection_repo.get_by_id(connection_id)
-    if not connection:
-        logger.error(f"[Relay] Connection {connection_id} not found in database")
-        logger.error(f"[Relay] User {current_user.id} has these connections:")
-        all_connections = await connection_repo.get_by_user_id(current_user.id)
-        if not all_connections:
-            logger.error("[Relay]   (no connections found for this user)")
-        for conn in all_connections:
-            logger.error(f"[Relay]   - {conn.id}: {conn.name} ({conn.jira_url})")
-        raise HTTPException(status_code=404, detail="Connection not found")
-    if connection.user_id != current_user.id:
-        logger.error(
-            f"[Relay] Connection {connection_id} belongs to user "
-            f"{connection.user_id}, not {current_user.id}"
-        )
-        raise HTTPException(
-            status_code=403, detail="Not authorized to use this connection"
-        )
+    connection = await get_owned_connection(
+        connection_id, current_user, connection_repo
+    )
     logger.info(f"[Relay] Found connection: {connection.name} ({connection.jira_url})")
+    # Feed the prewarm scheduler's ranking of recently used connections
+    if should_record_use(connection.id):
+        await connection_repo.touch_last_used(connection.id)
     return connection
 
 
@@ -55,6 +72,7 @@ async def search_issues(
     connection_id: str,
     current_user: CurrentUser,
     connection_repo: ConnectionRepo,
+    background_tasks: BackgroundTasks,
     jql: str | None = None,
     next_page_token: str | None = None,
     max_results: int = 50,
@@ -74,7 +92,7 @@ async def search_issues(
     field_list = fields.split(",") if fields else None
 
     try:
-        return await relay_service.search_issues(
+        result = await relay_service.search_issues(
             connection=connection,
             jql=jql,
             next_page_token=next_page_token,
@@ -86,6 +104,10 @@ async def search_issues(
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Relay error: {str(e)}")
 
+    # Keep the local full-text index warm with what we just fetched
+    background_tasks.add_task(index_payload, connection.id, result)
+    return result
+
 
 @router.get("/{connection_id}/issue/{issue_key}")
 async def get_issue(
@@ -93,6 +115,7 @@ async def get_issue(
     issue_key: str,
     current_user: CurrentUser,
     connection_repo: ConnectionRepo,
+    background_tasks: BackgroundTasks,
 ) -> dict[str, Any]:
     """
     Get a single issue by key.
@@ -105,7 +128,7 @@ async def get_issue(
     )
 
     try:
-        return await relay_service.get_issue(
+        result = await relay_service.get_issue(
             connection=connection,
             issue_id_or_key=issue_key,
         )
@@ -114,6 +137,175 @@ async def get_issue(
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Relay error: {str(e)}")
 
+    background_tasks.add_task(index_payload, connection.id, result)
+    return result
+
+
+def _response_headers(response: RelayResponse) -> dict[str, str]:
+    """Upstream headers plus the upstream phase timings as Server-Timing."""
+    if response.timing is None:
+        return response.headers
+    headers = {
+        k: v for k, v in response.headers.items() if k.lower() != "server-timing"
+    }
+    timings = [response.timing.server_timing()]
+    timings += [v for k, v in response.headers.items() if k.lower() == "server-timing"]
+    headers["Server-Timing"] = ", ".join(t for t in timings if t)
+    return headers
+
+
+def _decode_body(body: bytes | None, content_type: str) -> Any:
+    """Embed an upstream body in a batch result (JSON if possible)."""
+    if not body:
+        return None
+    if "json" in content_type:
+        try:
+            return json.loads(body)
+        except ValueError:
+            pass
+    return body.decode("utf-8", errors="replace")
+
+
+async def _run_batch_item(
+    connection: JiraConnection,
+    item: RelayBatchItem,
+    background_tasks: BackgroundTasks,
+) -> RelayBatchResult:
+    """Execute one sub-request; failures become results, never exceptions."""
+    if not _BATCH_PATH.match(item.path) or ".." in item.path.split("/"):
+        return RelayBatchResult(
+            id=item.id,
+            status=400,
+            body={"detail": "Path must be a JIRA REST API path (/rest/api/...)"},
+        )
+
+    query_string = urlencode(item.query or {})
+    use_metadata_cache = item.method == "GET" and metadata_cache.is_cacheable(item.path)
+    if use_metadata_cache:
+        cached = await metadata_cache.get(connection.id, item.path, query_string)
+        if cached:
+            return RelayBatchResult(
+                id=item.id,
+                status=cached.status_code,
+                headers=cached.headers,
+                body=_decode_body(
+                    cached.body, cached.headers.get("content-type", "json")
+                ),
+            )
+
+    try:
+        response = await relay_service.forward_request(
+            connection=connection,
+            method=item.method,
+            path=item.path,
+            body=item.body,
+            query_params=item.query,
+        )
+    except RelayError as e:
+        return RelayBatchResult(
+            id=item.id, status=e.status_code, body={"detail": str(e)}
+        )
+    except Exception as e:
+        logger.error(f"[Relay] Batch item {item.method} {item.path} failed: {e}")
+        return RelayBatchResult(
+            id=item.id, status=502, body={"detail": f"Relay error: {str(e)}"}
+        )
+
+    if use_metadata_cache:
+        await metadata_cache.put(
+            connection.id,
+            item.path,
+            query_string,
+            response.status_code,
+            response.headers,
+            response.body,
+        )
+    if item.method == "GET" and response.status_code == 200:
+        background_tasks.add_task(
+            index_relay_response, connection.id, item.path, response.body
+        )
+
+    content_type = next(
+        (v for k, v in response.headers.items() if k.lower() == "content-type"), ""
+    )
+    return RelayBatchResult(
+        id=item.id,
+        status=response.status_code,
+        headers=_response_headers(response),
+        body=_decode_body(response.body, content_type),
+    )
+
+
+@router.post("/{connection_id}/batch", response_model=RelayBatchResponse)
+async def relay_batch(
+    connection_id: str,
+    batch: RelayBatchRequest,
+    current_user: CurrentUser,
+    connection_repo: ConnectionRepo,
+    background_tasks: BackgroundTasks,
+    request: Request,
+) -> RelayBatchResponse:
+    """
+    Run several independent JIRA requests in one round trip.
+
+    Authentication and the connection lookup happen once for the whole
+    batch; sub-requests then run concurrently (up to the configured limit)
+    and each gets its own status in the result list, in request order.
+    """
+    settings = get_settings()
+    if len(batch.requests) > settings.relay_batch_max_requests:
+        raise HTTPException(
+            status_code=400,
+            detail=(f"Batch exceeds {settings.relay_batch_max_requests} sub-requests"),
+        )
+
+    connection = await _get_connection_for_user(
+        connection_id, current_user, connection_repo
+    )
+    logger.info(f"[Relay] Batch of {len(batch.requests)} for {connection_id}")
+
+    semaphore = asyncio.Semaphore(settings.relay_batch_concurrency)
+
+    async def run(item: RelayBatchItem) -> RelayBatchResult:
+        async with semaphore:
+            return await _run_batch_item(connection, item, background_tasks)
+
+    # Batches are bulk traffic unless the client marks them interactive
+    with lane_scope(_request_lane(request)):
+        results = await asyncio.gather(*(run(item) for item in batch.requests))
+    return RelayBatchResponse(results=results)
+
+
+# Browser and hop-by-hop headers that must not reach JIRA
+_EXCLUDED_HEADERS = frozenset(
+    (
+        "host",
+        "authorization",
+        "content-length",
+        "connection",
+        "content-type",
+        "cookie",
+        "accept-language",
+        "accept-encoding",
+        "referer",
+        "sec-fetch-dest",
+        "sec-fetch-mode",
+        "sec-fetch-site",
+        "origin",
+        "sec-ch-ua-mobile",
+        "sec-ch-ua",
+        "user-agent",
+        "sec-ch-ua-platform",
+        "x-jira-url",
+        PRIORITY_HEADER,
+    )
+)
+
+
+def _forwarded_headers(items: Iterable[tuple[str, str]]) -> dict[str, str]:
+    """Request headers to pass on to JIRA."""
+    return {key: value for key, value in items if key.lower() not in _EXCLUDED_HEADERS}
+
 
 # Core handler function for all relay requests
 async def _relay_jira_request_impl(
@@ -150,6 +342,24 @@ async def _relay_jira_request_impl(
     # Get query params
     query_params = dict(request.query_params) if request.query_params else None
 
+    # Serve slowly changing metadata from the cache when possible
+    query_string = str(request.query_params)
+    use_metadata_cache = (
+        request.method == "GET"
+        and metadata_cache.is_cacheable(full_path)
+        and "no-cache" not in request.headers.get("cache-control", "")
+    )
+    if use_metadata_cache:
+        cached = await metadata_cache.get(connection.id, full_path, query_string)
+        if cached:
+            logger.info(f"[Relay] Metadata cache hit: {full_path}")
+            return Response(
+                content=cached.body,
+                status_code=cached.status_code,
+                headers=cached.headers,
+                media_type=cached.headers.get("Content-Type", "application/json"),
+            )
+
     # Get body if present
     body: dict[str, Any] | None = None
     if request.method in ("POST", "PUT", "PATCH"):
@@ -161,29 +371,7 @@ async def _relay_jira_request_impl(
             pass
 
     # Get custom headers (exclude internal ones)
-    headers: dict[str, str] = {}
-    for key, value in request.headers.items():
-        if key.lower() not in (
-            "host",
-            "authorization",
-            "content-length",
-            "connection",
-            "content-type",
-            "cookie",
-            "accept-language",
-            "accept-encoding",
-            "referer",
-            "sec-fetch-dest",
-            "sec-fetch-mode",
-            "sec-fetch-site",
-            "origin",
-            "sec-ch-ua-mobile",
-            "sec-ch-ua",
-            "user-agent",
-            "sec-ch-ua-platform",
-            "x-jira-url",
-        ):
-            headers[key] = value
+    headers = _forwarded_headers(request.headers.items())
 
     try:
         logger.info(f"[Relay] {request.method} {full_path} -> {connection.jira_url}")
@@ -199,11 +387,29 @@ async def _relay_jira_request_impl(
         if response.status_code >= 400:
             logger.error(f"[Relay] Error body: {response.body}")
 
+        if use_metadata_cache:
+            await metadata_cache.put(
+                connection.id,
+                full_path,
+                query_string,
+                response.status_code,
+                response.headers,
+                response.body,
+            )
+
+        # Index issues and comments from successful reads after responding
+        background = None
+        if request.method == "GET" and response.status_code == 200:
+            background = BackgroundTask(
+                index_relay_response, connection.id, full_path, response.body
+            )
+
         return Response(
             content=response.body,
             status_code=response.status_code,
-            headers=response.headers,
+            headers=_response_headers(response),
             media_type=response.headers.get("Content-Type", "application/json"),
+            background=background,
         )
     except RelayError as e:
         logger.error(f"[Relay] RelayError: {e.status_code} - {e}")
@@ -241,12 +447,55 @@ async def relay_jira_request(
     current_user: CurrentUser,
     connection_repo: ConnectionRepo,
 ) -> Response:
-    """Route handler wrapper that delegates to the implementation."""
-    return await _relay_jira_request_impl(
-        connection_id=connection_id,
-        api_version=api_version,
-        path=path,
-        request=request,
-        current_user=current_user,
-        connection_repo=connection_repo,
+    """Route handler wrapper that delegates to the implementation.
+
+    Upstream calls run in the priority lane picked by the
+    ``X-Request-Priority`` header (search defaults to the sync lane).
+    Mutating requests carrying an ``Idempotency-Key`` header are executed
+    at most once per user and key; retries get the stored first response.
+    """
+    with lane_scope(_request_lane(request)):
+        return await _relay_with_idempotency(
+            connection_id, api_version, path, request, current_user, connection_repo
+        )
+
+
+async def _relay_with_idempotency(
+    connection_id: str,
+    api_version: str,
+    path: str,
+    request: Request,
+    current_user: CurrentUser,
+    connection_repo: ConnectionRepo,
+) -> Response:
+    """Execute a relay request, deduplicated by its Idempotency-Key."""
+    idempotency_key = request.headers.get("idempotency-key")
+    if idempotency_key is None or request.method not in _IDEMPOTENT_METHODS:
+        return await _relay_jira_request_impl(
+            connection_id=connection_id,
+            api_version=api_version,
+            path=path,
+            request=request,
+            current_user=current_user,
+            connection_repo=connection_repo,
+        )
+
+    fingerprint = request_fingerprint(
+        request.method, request.url.path, request.url.query, await request.body()
     )
+    async with idempotency_store.reserve(
+        current_user.id, idempotency_key, fingerprint
+    ) as reservation:
+        if reservation.replay is not None:
+            logger.info(f"[Relay] Replaying response for Idempotency-Key {path}")
+            return reservation.replay.to_response()
+        response = await _relay_jira_request_impl(
+            connection_id=connection_id,
+            api_version=api_version,
+            path=path,
+            request=request,
+            current_user=current_user,
+            connection_repo=connection_repo,
+        )
+        await reservation.save(response)
+        return response
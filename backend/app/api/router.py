@@ -2,8 +2,12 @@
 
 from fastapi import APIRouter
 
+from app.api.admin import router as admin_router
+from app.api.attachments import router as attachments_router
 from app.api.auth import router as auth_router
+from app.api.outbox import router as outbox_router
 from app.api.relay import router as relay_router
+from app.api.search import router as search_router
 from app.api.users import router as users_router
 
 # Main API router
@@ -12,4 +16,8 @@ api_router = APIRouter(prefix="/api")
 # Include sub-routers
 api_router.include_router(auth_router)
 api_router.include_router(users_router)
+api_router.include_router(attachments_router)
 api_router.include_router(relay_router)
+api_router.include_router(search_router)
+api_router.include_router(outbox_router)
+api_router.include_router(admin_router)
@@ -0,0 +1,64 @@
+"""Issue full-text search API endpoints."""
+
+from typing import Literal
+
+from fastapi import APIRouter, Query
+
+from app.dependencies import OwnedConnection, SearchRepo
+from app.models.schemas import (
+    IssueIndexRequest,
+    IssueIndexResponse,
+    IssueSearchHit,
+    IssueSearchResponse,
+)
+from app.services.search_index import extract_issue_documents
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("/{connection_id}", response_model=IssueSearchResponse)
+async def search_issues(
+    connection: OwnedConnection,
+    search_repo: SearchRepo,
+    q: str = Query(..., min_length=1, max_length=500),
+    scope: Literal["text", "summary"] = "text",
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+) -> IssueSearchResponse:
+    """Ranked full-text search over locally indexed issues.
+
+    ``scope=summary`` mirrors JQL ``summary ~``, the default ``text`` scope
+    mirrors ``text ~`` (summary, description and comments).
+    """
+    total, hits = await search_repo.search(
+        connection.id, q, scope=scope, limit=limit, offset=offset
+    )
+    return IssueSearchResponse(
+        query=q,
+        total=total,
+        offset=offset,
+        limit=limit,
+        results=[IssueSearchHit.model_validate(hit) for hit in hits],
+    )
+
+
+@router.post("/{connection_id}/issues", response_model=IssueIndexResponse)
+async def index_issues(
+    payload: IssueIndexRequest,
+    connection: OwnedConnection,
+    search_repo: SearchRepo,
+) -> IssueIndexResponse:
+    """Add or refresh issues in the index (used by the frontend sync engine)."""
+    documents = extract_issue_documents({"issues": payload.issues})
+    await search_repo.upsert_many(connection.id, documents)
+    return IssueIndexResponse(indexed=len(documents))
+
+
+@router.delete("/{connection_id}/issues/{issue_key}", status_code=204)
+async def remove_issue(
+    issue_key: str,
+    connection: OwnedConnection,
+    search_repo: SearchRepo,
+) -> None:
+    """Remove a deleted issue from the index."""
+    await search_repo.delete(connection.id, issue_key)
@@ -79,10 +79,7 @@ async def create_test_issue(issue: TestIssueCreate) -> dict[str, str]:
     This bypasses the normal JIRA API to create test data quickly.
     """
     # Calculate next issue number
-    seen_ids = set()
-    for stored_issue in _issues.values():
-        seen_ids.add(stored_issue["id"])
-    next_num = len(seen_ids) + 1
+    next_num = len(_issues) + 1
 
     key = f"TEST-{next_num}"
     issue_id = str(next_num)
@@ -126,9 +123,7 @@ async def create_test_issue(issue: TestIssueCreate) -> dict[str, str]:
         },
     }
 
-    # Store by both key and ID for lookup flexibility
-    _issues[key] = new_issue
-    _issues[issue_id] = new_issue
+    _issues.add(new_issue)
 
     return {"key": key, "id": issue_id}
 
@@ -143,28 +138,28 @@ async def simulate_remote_change(
     the normal update flow, simulating what would happen if another
     user edited the issue in JIRA.
     """
-    if issue_id_or_key not in _issues:
+    issue = _issues.get(issue_id_or_key)
+    if issue is None:
         raise HTTPException(status_code=404, detail="Issue not found")
 
-    issue = _issues[issue_id_or_key]
-
     if changes.summary is not None:
         issue["fields"]["summary"] = changes.summary
 
     if changes.description is not None:
         issue["fields"]["description"] = changes.description
 
+    indexed: dict[str, Any] = {}
     if changes.status is not None:
         for t in DEFAULT_TRANSITIONS:
             if t["name"].lower() == changes.status.lower():
-                issue["fields"]["status"] = t["to"]
+                indexed["status"] = t["to"]
                 break
 
     if changes.assignee is not None:
-        issue["fields"]["assignee"] = {"displayName": changes.assignee}
+        indexed["assignee"] = {"displayName": changes.assignee}
 
     # Update timestamp to trigger conflict detection
-    issue["fields"]["updated"] = _now_iso()
+    _issues.update_fields(issue, **indexed, updated=_now_iso())
 
     return {"status": "updated"}
 
@@ -184,10 +179,10 @@ async def add_test_comment(
     """Add a comment directly to an issue for testing."""
     import uuid
 
-    if issue_id_or_key not in _issues:
+    issue = _issues.get(issue_id_or_key)
+    if issue is None:
         raise HTTPException(status_code=404, detail="Issue not found")
 
-    issue = _issues[issue_id_or_key]
     now = _now_iso()
 
     comment_id = str(uuid.uuid4())
@@ -207,7 +202,7 @@ async def add_test_comment(
 
     issue["fields"]["comment"]["comments"].append(new_comment)
     issue["fields"]["comment"]["total"] = len(issue["fields"]["comment"]["comments"])
-    issue["fields"]["updated"] = now
+    _issues.update_fields(issue, updated=now)
 
     return {"id": comment_id}
 
@@ -10,6 +10,7 @@ from app.models.schemas import (
     JiraConnectionResponse,
     JiraConnectionUpdate,
 )
+from app.services.metadata_cache import metadata_cache
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -100,6 +101,8 @@ async def update_connection(
         )
 
     connection = await conn_repo.update(connection, **update_data)
+    # Cached metadata may belong to the old URL or credentials
+    await metadata_cache.invalidate_connection(connection.id)
 
     return JiraConnectionResponse.model_validate(connection)
 
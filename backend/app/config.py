@@ -47,12 +47,117 @@ class Settings(BaseSettings):
     postgres_password: str = ""
     postgres_database: str = "jiralocal"
 
+    # Query instrumentation: statements at least this slow are logged, and a
+    # request running one statement this many times is reported as an N+1
+    db_slow_query_seconds: float = 0.1
+    db_repeated_query_threshold: int = 5
+
     # Security
     secret_key: str = secrets.token_urlsafe(32)  # JWT signing key
     encryption_key: str = ""  # Fernet key for API token encryption (generated if empty)
     access_token_expire_minutes: int = 60 * 24 * 30  # 30 days
     algorithm: str = "HS256"
 
+    # Issue full-text search index (fed by relay responses and sync uploads)
+    search_index_enabled: bool = True
+
+    # Attachment/avatar disk cache (shared by all workers on the host)
+    blob_cache_dir: Path = Path(__file__).parent.parent / "data" / "blob_cache"
+    blob_cache_max_bytes: int = 1024 * 1024 * 1024  # 1 GiB
+    blob_cache_max_item_bytes: int = 100 * 1024 * 1024  # 100 MiB
+    avatar_cache_ttl_seconds: int = 60 * 60
+
+    # Shared cache backend for relay metadata and principals
+    # memory: per worker; sqlite: shared by workers on one host;
+    # postgresql: shared by all nodes (requires database_type="postgresql")
+    cache_backend: Literal["memory", "sqlite", "postgresql"] = "sqlite"
+    cache_path: Path = Path(__file__).parent.parent / "data" / "cache.db"
+    cache_max_bytes: int = 256 * 1024 * 1024  # 256 MiB
+
+    # Relay cache for slowly changing metadata (fields, statuses, ...)
+    metadata_cache_ttl_seconds: int = 30 * 60
+
+    # Cache of authenticated users, saves a DB lookup per request
+    principal_cache_ttl_seconds: int = 60
+
+    # Request deadlines: X-Request-Timeout-Ms header or these route defaults
+    request_timeout_seconds: float = 60.0
+    relay_timeout_seconds: float = 30.0  # Also the upper bound for JIRA reads
+    relay_batch_timeout_seconds: float = 60.0
+    request_max_timeout_seconds: float = 110.0  # Below nginx proxy_read_timeout
+
+    # Shared upstream HTTP client for JIRA
+    relay_connect_timeout_seconds: float = 10.0
+    relay_pool_timeout_seconds: float = 5.0  # Wait for a free pooled connection
+    relay_min_timeout_seconds: float = 5.0  # Floor of the adaptive read timeout
+    relay_max_connections: int = 100
+    relay_max_keepalive_connections: int = 20
+
+    # Upstream slots per priority lane; interactive requests may use all
+    # relay_max_connections, so these bound what bulk traffic can occupy
+    relay_sync_concurrency: int = 32
+    relay_prefetch_concurrency: int = 8
+    relay_background_concurrency: int = 8
+    # Upstream slots one user may hold at once per lane; queued users share
+    # fairly, in proportion to their weight ("user-id=weight,...", default 1)
+    relay_user_max_concurrency: int = 16
+    relay_user_weights: str = ""
+
+    # Admission control: past these limits new lower-priority API requests
+    # get 503 + Retry-After (interactive ones only at the in-flight limit)
+    admission_enabled: bool = True
+    admission_max_inflight: int = 200  # Per worker
+    admission_max_queue_wait_seconds: float = 5.0  # Oldest upstream waiter
+    admission_retry_after_seconds: int = 5
+
+    # Comma-separated usernames allowed to use the /api/admin endpoints
+    admin_usernames: str = ""
+
+    # Request tracing, exported as OTLP/JSON to a JSON-lines file and/or an
+    # OTLP/HTTP collector (e.g. http://localhost:4318/v1/traces)
+    tracing_enabled: bool = False
+    tracing_sample_rate: float = 1.0  # Share of new traces recorded
+    tracing_export_path: str = ""
+    tracing_otlp_endpoint: str = ""
+    tracing_export_interval_seconds: float = 5.0
+    tracing_service_name: str = "jiralocal-backend"
+
+    # Event-loop lag monitor; with DEBUG (or capture_stacks) the stack of the
+    # loop thread is logged whenever it is blocked for over the threshold
+    loop_monitor_enabled: bool = True
+    loop_monitor_interval_seconds: float = 0.25
+    loop_monitor_block_threshold_seconds: float = 0.1
+    loop_monitor_capture_stacks: bool = False
+
+    # Sampling interval of the on-demand profiler (/api/admin/diagnostics/profiler)
+    profiler_interval_seconds: float = 0.005
+
+    # Expose Prometheus metrics at /metrics (not proxied by nginx)
+    metrics_enabled: bool = True
+
+    # How long responses to Idempotency-Key requests are replayed
+    idempotency_ttl_seconds: int = 24 * 60 * 60
+
+    # Relay batch endpoint limits
+    relay_batch_max_requests: int = 20
+    relay_batch_concurrency: int = 4  # Parallel upstream calls per batch
+
+    # Server-side outbox for pending local edits
+    outbox_enabled: bool = True
+    outbox_poll_interval_seconds: float = 5.0
+    outbox_concurrency: int = 4  # Parallel JIRA writes per worker process
+    outbox_max_attempts: int = 8
+    outbox_retention_hours: int = 7 * 24  # Keep finished results this long
+
+    # Background prewarm of recently used connections
+    prewarm_enabled: bool = False
+    prewarm_interval_seconds: int = 15 * 60
+    prewarm_upstream_budget: int = 100  # Upstream calls per cycle, all connections
+    prewarm_max_connections: int = 20
+    prewarm_lookback_hours: int = 72  # Only connections used this recently
+    prewarm_issue_window_hours: int = 24  # "Recently updated" issue window
+    prewarm_comment_issues: int = 10  # Issues per connection to fetch comments for
+
     # JIRA defaults (for mock server)
     jira_default_url: str = "http://localhost:8000"
     jira_default_project: str = "TEST"
@@ -0,0 +1,111 @@
+"""Admission control: shed low-priority requests early under overload.
+
+Without it the backend accepts everything and every request slows down
+together until nginx gives up. The middleware counts in-flight API requests
+per priority lane (see ``app.core.lanes``) and watches how long requests
+wait for an upstream slot. Past the configured thresholds, new requests of
+lower lanes get an immediate ``503`` with ``Retry-After``, so the work
+already admitted, and interactive requests, keep their latency.
+"""
+
+import json
+import logging
+from typing import Any
+
+from app.config import Settings, get_settings
+from app.core.lanes import LANES, PRIORITY_HEADER, LaneScheduler, request_lane
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Share of admission_max_inflight up to which each lane is still admitted;
+# lower lanes are shed first as load grows
+_INFLIGHT_SHARE = {
+    "interactive": 1.0,
+    "sync": 0.75,
+    "prefetch": 0.5,
+    "background": 0.5,
+}
+
+# In-flight API requests per lane in this worker
+_inflight = dict.fromkeys(LANES, 0)
+
+registry.gauge(
+    "http_requests_inflight",
+    "API requests being handled per priority lane",
+    labels=("lane",),
+    callback=lambda: {(lane,): count for lane, count in _inflight.items()},
+)
+requests_shed = registry.counter(
+    "http_requests_shed_total",
+    "Requests rejected by admission control",
+    labels=("lane",),
+)
+
+
+class AdmissionMiddleware:
+    """ASGI middleware rejecting new requests of overloaded lanes with 503."""
+
+    def __init__(
+        self, app: Any, scheduler: LaneScheduler, settings: Settings | None = None
+    ):
+        self.app = app
+        self.scheduler = scheduler
+        self._settings = settings or get_settings()
+
+    def rejection(self, lane: str) -> str | None:
+        """Why a new request of this lane would be shed, or None to admit it."""
+        settings = self._settings
+        total = sum(_inflight.values())
+        if total >= settings.admission_max_inflight * _INFLIGHT_SHARE[lane]:
+            return f"{total} requests in flight"
+        if lane == "interactive":
+            return None
+        # Bulk traffic also yields when its lane or a higher one is queueing
+        for other in LANES[: LANES.index(lane) + 1]:
+            delay = self.scheduler.queue_delay(other)
+            if delay >= settings.admission_max_queue_wait_seconds:
+                return f"{other} requests waiting {delay:.1f}s for upstream"
+        return None
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not scope.get("path", "").startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+
+        header = None
+        for name, value in scope.get("headers", []):
+            if name.decode("latin-1").lower() == PRIORITY_HEADER:
+                header = value.decode("latin-1")
+                break
+        lane = request_lane(scope["path"], header)
+
+        if self._settings.admission_enabled:
+            reason = self.rejection(lane)
+            if reason is not None:
+                requests_shed.inc(lane=lane)
+                logger.warning(f"[Admission] Shedding {lane} {scope['path']}: {reason}")
+                await self._send_overloaded(send)
+                return
+
+        _inflight[lane] += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _inflight[lane] -= 1
+
+    async def _send_overloaded(self, send) -> None:
+        body = json.dumps({"detail": "Server is overloaded, retry later"}).encode()
+        retry_after = str(self._settings.admission_retry_after_seconds)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", retry_after.encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,512 @@
+"""Pluggable key/value cache shared across gunicorn workers.
+
+Values are opaque bytes with an optional TTL. Backends enforce a total byte
+budget by evicting the least recently accessed entries:
+
+- ``memory``: per-process LRU (each worker warms its own copy)
+- ``sqlite``: a WAL-mode, memory-mapped SQLite file shared by every worker
+  on the host
+- ``postgresql``: an UNLOGGED table in the application database, shared by
+  every node
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+
+from sqlalchemy import text
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Evict down to this fraction of the budget so eviction does not run per write
+_LOW_WATERMARK = 0.9
+
+# Only refresh an entry's access time when it is older than this (seconds),
+# which keeps hot reads from turning into writes
+_ACCESS_RESOLUTION = 60.0
+
+# Shared backends only recompute their total size every N writes
+_SIZE_CHECK_INTERVAL = 50
+
+
+class CacheBackend(ABC):
+    """Interface implemented by all cache stores."""
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        """Get a value, or None if missing or expired."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        """Store a value, replacing any previous one."""
+
+    @abstractmethod
+    async def add(self, key: str, value: bytes, ttl: float | None = None) -> bool:
+        """Store a value only if the key is absent or expired.
+
+        Atomic across every process sharing the backend, so it can serve as
+        a lightweight lock. Returns whether the value was stored.
+        """
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove a single key."""
+
+    @abstractmethod
+    async def delete_prefix(self, prefix: str) -> None:
+        """Remove every key starting with ``prefix``."""
+
+    async def close(self) -> None:
+        """Release resources held by the backend."""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU cache with a byte budget."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[bytes, float | None]] = OrderedDict()
+        self._size = 0
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at < time.time():
+            await self.delete(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        await self.delete(key)
+        if len(value) > self.max_bytes:
+            return
+        expires_at = time.time() + ttl if ttl is not None else None
+        self._entries[key] = (value, expires_at)
+        self._size += len(value)
+        while self._size > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    async def add(self, key: str, value: bytes, ttl: float | None = None) -> bool:
+        # No await in between, so this is atomic on the event loop
+        if await self.get(key) is not None:
+            return False
+        await self.set(key, value, ttl)
+        return key in self._entries
+
+    async def delete(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[0])
+
+    async def delete_prefix(self, prefix: str) -> None:
+        for key in [k for k in self._entries if k.startswith(prefix)]:
+            await self.delete(key)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """Cache stored in a local SQLite file shared by all workers on a host.
+
+    Calls run in worker threads so a busy database never stalls the event
+    loop; each thread keeps its own connection.
+    """
+
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, timeout=5.0, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={self.max_bytes * 2}")
+            conn.execute(
+                """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL,
+    accessed_at REAL NOT NULL
+)
+"""
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_cache_entries_accessed_at "
+                "ON cache_entries (accessed_at)"
+            )
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    async def get(self, key: str) -> bytes | None:
+        return await asyncio.to_thread(self._get, key)
+
+    def _get(self, key: str) -> bytes | None:
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, expires_at, accessed_at FROM cache_entries WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at, accessed_at = row
+        now = time.time()
+        if expires_at is not None and expires_at < now:
+            conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            return None
+        if now - accessed_at > _ACCESS_RESOLUTION:
+            conn.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        await asyncio.to_thread(self._set, key, value, ttl)
+
+    def _set(self, key: str, value: bytes, ttl: float | None) -> None:
+        if len(value) > self.max_bytes:
+            return
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries "
+            "(key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+            (key, value, len(value), now + ttl if ttl is not None else None, now),
+        )
+        self._writes += 1
+        if self._writes % _SIZE_CHECK_INTERVAL == 0 or len(value) > self.max_bytes / 10:
+            self._evict(conn)
+
+    async def add(self, key: str, value: bytes, ttl: float | None = None) -> bool:
+        return await asyncio.to_thread(self._add, key, value, ttl)
+
+    def _add(self, key: str, value: bytes, ttl: float | None) -> bool:
+        if len(value) > self.max_bytes:
+            return False
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "DELETE FROM cache_entries WHERE key = ? AND expires_at < ?", (key, now)
+        )
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO cache_entries "
+            "(key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+            (key, value, len(value), now + ttl if ttl is not None else None, now),
+        )
+        return cursor.rowcount == 1
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop expired entries, then least recently accessed ones."""
+        conn.execute("DELETE FROM cache_entries WHERE expires_at < ?", (time.time(),))
+        (total,) = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM cache_entries"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+        to_free = total - self.max_bytes * _LOW_WATERMARK
+        while to_free > 0:
+            rows = conn.execute(
+                "SELECT key, size FROM cache_entries ORDER BY accessed_at LIMIT 100"
+            ).fetchall()
+            if not rows:
+                break
+            victims = []
+            for key, size in rows:
+                victims.append((key,))
+                to_free -= size
+                if to_free <= 0:
+                    break
+            conn.executemany("DELETE FROM cache_entries WHERE key = ?", victims)
+        logger.info(f"[Cache] Evicted entries to stay under {self.max_bytes} bytes")
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(
+            lambda: self._conn().execute(
+                "DELETE FROM cache_entries WHERE key = ?", (key,)
+            )
+        )
+
+    async def delete_prefix(self, prefix: str) -> None:
+        # Range scan on the primary key instead of LIKE (no escaping needed)
+        await asyncio.to_thread(
+            lambda: self._conn().execute(
+                "DELETE FROM cache_entries WHERE key >= ? AND key < ?",
+                (prefix, prefix + "\U0010ffff"),
+            )
+        )
+
+    async def close(self) -> None:
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+class PostgresCacheBackend(CacheBackend):
+    """Cache stored in an UNLOGGED table of the application's PostgreSQL.
+
+    UNLOGGED skips the WAL: writes are cheap and the table is truncated after
+    a crash, which is exactly the durability a cache needs.
+    """
+
+    def __init__(self, engine, max_bytes: int):
+        self.engine = engine
+        self.max_bytes = max_bytes
+        self._ready = False
+        self._writes = 0
+
+    async def _ensure_table(self) -> None:
+        if self._ready:
+            return
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                text(
+                    """
+CREATE UNLOGGED TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    value BYTEA NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at DOUBLE PRECISION,
+    accessed_at DOUBLE PRECISION NOT NULL
+)
+"""
+                )
+            )
+            await conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_cache_entries_accessed_at "
+                    "ON cache_entries (accessed_at)"
+                )
+            )
+        self._ready = True
+
+    async def get(self, key: str) -> bytes | None:
+        await self._ensure_table()
+        now = time.time()
+        async with self.engine.begin() as conn:
+            row = (
+                await conn.execute(
+                    text(
+                        "SELECT value, expires_at, accessed_at "
+                        "FROM cache_entries WHERE key = :key"
+                    ),
+                    {"key": key},
+                )
+            ).first()
+            if row is None:
+                return None
+            value, expires_at, accessed_at = row
+            if expires_at is not None and expires_at < now:
+                await conn.execute(
+                    text("DELETE FROM cache_entries WHERE key = :key"), {"key": key}
+                )
+                return None
+            if now - accessed_at > _ACCESS_RESOLUTION:
+                await conn.execute(
+                    text(
+                        "UPDATE cache_entries SET accessed_at = :now WHERE key = :key"
+                    ),
+                    {"now": now, "key": key},
+                )
+            return bytes(value)
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        if len(value) > self.max_bytes:
+            return
+        await self._ensure_table()
+        now = time.time()
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                text(
+                    """
+INSERT INTO cache_entries (key, value, size, expires_at, accessed_at)
+VALUES (:key, :value, :size, :expires_at, :now)
+ON CONFLICT (key) DO UPDATE SET
+    value = EXCLUDED.value,
+    size = EXCLUDED.size,
+    expires_at = EXCLUDED.expires_at,
+    accessed_at = EXCLUDED.accessed_at
+"""
+                ),
+                {
+                    "key": key,
+                    "value": value,
+                    "size": len(value),
+                    "expires_at": now + ttl if ttl is not None else None,
+                    "now": now,
+                },
+            )
+            self._writes += 1
+            if self._writes % _SIZE_CHECK_INTERVAL == 0:
+                await self._evict(conn)
+
+    async def add(self, key: str, value: bytes, ttl: float | None = None) -> bool:
+        if len(value) > self.max_bytes:
+            return False
+        await self._ensure_table()
+        now = time.time()
+        async with self.engine.begin() as conn:
+            row = (
+                await conn.execute(
+                    text(
+                        """
+INSERT INTO cache_entries (key, value, size, expires_at, accessed_at)
+VALUES (:key, :value, :size, :expires_at, :now)
+ON CONFLICT (key) DO UPDATE SET
+    value = EXCLUDED.value,
+    size = EXCLUDED.size,
+    expires_at = EXCLUDED.expires_at,
+    accessed_at = EXCLUDED.accessed_at
+WHERE cache_entries.expires_at < :now
+RETURNING key
+"""
+                    ),
+                    {
+                        "key": key,
+                        "value": value,
+                        "size": len(value),
+                        "expires_at": now + ttl if ttl is not None else None,
+                        "now": now,
+                    },
+                )
+            ).first()
+        return row is not None
+
+    async def _evict(self, conn) -> None:
+        """Drop expired entries, then least recently accessed ones."""
+        await conn.execute(
+            text("DELETE FROM cache_entries WHERE expires_at < :now"),
+            {"now": time.time()},
+        )
+        total = (
+            await conn.execute(text("SELECT COALESCE(SUM(size), 0) FROM cache_entries"))
+        ).scalar_one()
+        if total <= self.max_bytes:
+            return
+        # Delete the oldest entries whose cumulative size covers the excess.
+        # The running total is computed once, in a single ordered scan.
+        await conn.execute(
+            text(
+                """
+DELETE FROM cache_entries WHERE key IN (
+    SELECT key FROM (
+        SELECT
+            key,
+            SUM(size) OVER (ORDER BY accessed_at, key ROWS UNBOUNDED PRECEDING)
+                - size AS freed_before
+        FROM cache_entries
+    ) oldest
+    WHERE freed_before < :to_free
+)
+"""
+            ),
+            {"to_free": total - self.max_bytes * _LOW_WATERMARK},
+        )
+
+    async def delete(self, key: str) -> None:
+        await self._ensure_table()
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                text("DELETE FROM cache_entries WHERE key = :key"), {"key": key}
+            )
+
+    async def delete_prefix(self, prefix: str) -> None:
+        await self._ensure_table()
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                text("DELETE FROM cache_entries WHERE starts_with(key, :prefix)"),
+                {"prefix": prefix},
+            )
+
+
+class Cache:
+    """A namespaced view of a cache backend.
+
+    Lets unrelated features share one backend (and one byte budget) without
+    key collisions. Without an explicit backend, the configured shared one
+    is resolved on first use.
+    """
+
+    def __init__(self, namespace: str, backend: CacheBackend | None = None):
+        self.namespace = namespace
+        self._backend = backend
+
+    @property
+    def backend(self) -> CacheBackend:
+        return self._backend or get_cache_backend()
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get(self, key: str) -> bytes | None:
+        """Get a value from this namespace."""
+        return await self.backend.get(self._key(key))
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        """Store a value in this namespace."""
+        await self.backend.set(self._key(key), value, ttl)
+
+    async def add(self, key: str, value: bytes, ttl: float | None = None) -> bool:
+        """Store a value in this namespace unless the key already exists."""
+        return await self.backend.add(self._key(key), value, ttl)
+
+    async def delete(self, key: str) -> None:
+        """Remove a key from this namespace."""
+        await self.backend.delete(self._key(key))
+
+    async def delete_prefix(self, prefix: str) -> None:
+        """Remove every key of this namespace starting with ``prefix``."""
+        await self.backend.delete_prefix(self._key(prefix))
+
+
+_backend: CacheBackend | None = None
+
+
+def get_cache_backend() -> CacheBackend:
+    """Get the process-wide cache backend configured in settings."""
+    global _backend
+    if _backend is None:
+        settings = get_settings()
+        if settings.cache_backend == "postgresql":
+            if settings.database_type != "postgresql":
+                raise ValueError(
+                    "CACHE_BACKEND=postgresql requires DATABASE_TYPE=postgresql"
+                )
+            from app.db.database import engine
+
+            _backend = PostgresCacheBackend(engine, settings.cache_max_bytes)
+        elif settings.cache_backend == "sqlite":
+            _backend = SQLiteCacheBackend(settings.cache_path, settings.cache_max_bytes)
+        else:
+            _backend = MemoryCacheBackend(settings.cache_max_bytes)
+    return _backend
+
+
+async def close_cache() -> None:
+    """Close the shared backend (called on application shutdown)."""
+    global _backend
+    if _backend is not None:
+        await _backend.close()
+        _backend = None
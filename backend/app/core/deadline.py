@@ -0,0 +1,148 @@
+"""Per-request deadlines propagated to upstream calls.
+
+Every HTTP request gets a time budget, either from the client's
+``X-Request-Timeout-Ms`` header or from a route default. The deadline is kept
+in a context variable so the relay service can derive its connect, read and
+pool timeouts from the time actually left. When the budget runs out before a
+response has started, the handler is cancelled and the client gets a 504,
+instead of the work finishing for nobody.
+"""
+
+import asyncio
+import json
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from app.config import get_settings
+
+# Header carrying the client's time budget in milliseconds
+DEADLINE_HEADER = "x-request-timeout-ms"
+
+# Smallest accepted client budget
+_MIN_TIMEOUT_SECONDS = 0.1
+
+_deadline: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+
+def remaining() -> float | None:
+    """Seconds left until the current deadline, or None without a deadline."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def expired() -> bool:
+    """Whether the current deadline has passed."""
+    left = remaining()
+    return left is not None and left <= 0
+
+
+@contextmanager
+def deadline_scope(seconds: float):
+    """Run a block with a deadline, keeping any earlier (tighter) one."""
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def _route_timeouts() -> list[tuple[re.Pattern, str]]:
+    return [
+        # Window profiles block for as long as the admin asked for
+        (
+            re.compile(r"^/api/admin/diagnostics/profiler/window$"),
+            "request_max_timeout_seconds",
+        ),
+        (re.compile(r"^/api/jira/[^/]+/batch$"), "relay_batch_timeout_seconds"),
+        (re.compile(r"^/api/jira/"), "relay_timeout_seconds"),
+    ]
+
+
+class DeadlineMiddleware:
+    """ASGI middleware assigning every HTTP request a deadline.
+
+    Only the time until the response starts is bounded; streaming bodies
+    (attachments) are not cut off once they are under way.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+        self._routes = _route_timeouts()
+
+    def budget(self, scope: dict[str, Any]) -> float:
+        """Time budget in seconds for a request."""
+        settings = get_settings()
+        for name, value in scope.get("headers", []):
+            if name.decode("latin-1").lower() == DEADLINE_HEADER:
+                try:
+                    seconds = int(value) / 1000
+                except ValueError:
+                    break
+                return min(
+                    max(seconds, _MIN_TIMEOUT_SECONDS),
+                    settings.request_max_timeout_seconds,
+                )
+        path = scope.get("path", "")
+        for pattern, setting in self._routes:
+            if pattern.match(path):
+                return getattr(settings, setting)
+        return settings.request_timeout_seconds
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        budget = self.budget(scope)
+        started = False
+
+        async def send_wrapper(message) -> None:
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        with deadline_scope(budget):
+            # The task copies the current context, deadline included
+            task = asyncio.ensure_future(self.app(scope, receive, send_wrapper))
+            try:
+                done, _ = await asyncio.wait({task}, timeout=budget)
+                if not done and not started:
+                    task.cancel()
+                    try:
+                        await task
+                    except (asyncio.CancelledError, Exception):
+                        pass
+                    if not started:
+                        await self._send_timeout(send, budget)
+                    return
+                await task
+            except asyncio.CancelledError:
+                task.cancel()
+                raise
+
+    @staticmethod
+    async def _send_timeout(send, budget: float) -> None:
+        body = json.dumps(
+            {"detail": f"Request deadline of {budget:.1f}s exceeded"}
+        ).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 504,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,101 @@
+"""Cancel request handling when the client goes away.
+
+Without this, a browser navigating away mid-search leaves the handler
+waiting for JIRA, reading the whole response and holding an upstream slot
+and rate-limit budget for nobody. The middleware listens for the ASGI
+``http.disconnect`` message while the response is being produced and
+cancels the handler, which cancels its in-flight upstream calls (and the
+sub-requests of a batch) on the spot.
+"""
+
+import asyncio
+import logging
+from typing import Any
+
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+client_disconnects = registry.counter(
+    "http_client_disconnects_total",
+    "Requests cancelled because the client disconnected before the response",
+)
+
+
+class DisconnectMiddleware:
+    """ASGI middleware cancelling the handler on client disconnect.
+
+    The middleware owns the ``receive`` channel and hands request messages
+    to the app through a buffer that runs at most one body chunk ahead, so
+    uploads keep their backpressure. Once the response body is complete,
+    nothing is cancelled anymore; background tasks run undisturbed.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        buffer: asyncio.Queue = asyncio.Queue()
+        consumed = asyncio.Event()
+        finished = asyncio.Event()
+        disconnected = asyncio.Event()
+
+        async def app_receive():
+            message = await buffer.get()
+            consumed.set()
+            return message
+
+        async def app_send(message) -> None:
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                finished.set()
+
+        handler = asyncio.ensure_future(self.app(scope, app_receive, app_send))
+        watcher = asyncio.ensure_future(
+            self._watch(scope, receive, buffer, consumed, finished, disconnected)
+        )
+        watcher.add_done_callback(
+            lambda _: handler.cancel() if disconnected.is_set() else None
+        )
+        try:
+            await handler
+        except asyncio.CancelledError:
+            if not disconnected.is_set():
+                # Cancelled from outside (which cancels the handler too)
+                raise
+        finally:
+            watcher.cancel()
+
+    @staticmethod
+    async def _watch(
+        scope,
+        receive,
+        buffer: asyncio.Queue,
+        consumed: asyncio.Event,
+        finished: asyncio.Event,
+        disconnected: asyncio.Event,
+    ) -> None:
+        """Pump request messages until the client disconnects."""
+        while True:
+            message = await receive()
+            buffer.put_nowait(message)
+            if message["type"] == "http.disconnect":
+                if not finished.is_set():
+                    client_disconnects.inc()
+                    logger.info(
+                        f"[Disconnect] Client left, cancelling {scope.get('method')}"
+                        f" {scope.get('path')}"
+                    )
+                    disconnected.set()
+                return
+            if message.get("more_body", False):
+                # Stay at most one chunk ahead of the app
+                while not buffer.empty():
+                    consumed.clear()
+                    await consumed.wait()
@@ -0,0 +1,305 @@
+"""Priority lanes for upstream JIRA calls.
+
+Relay traffic is split into lanes, highest priority first: ``interactive``
+(a user waiting on a screen), ``sync`` (bulk synchronisation), ``prefetch``
+(speculative warming) and ``background`` (the outbox). Every lane except
+``interactive`` has its own concurrency budget below the worker's total, so
+bulk traffic can never occupy every upstream slot; when a slot frees up,
+waiting requests of higher lanes get it first. Within a lane, users get
+fair shares, so one user's huge sync can't starve everyone else on the
+same worker.
+
+The lane of the current request lives in a context variable, set by the
+relay endpoints from the ``X-Request-Priority`` header or the route, and by
+background services for their own calls.
+"""
+
+import asyncio
+import re
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from app.core.metrics import registry
+
+# Lanes in priority order
+LANES = ("interactive", "sync", "prefetch", "background")
+
+# Header letting clients pick the lane of a request
+PRIORITY_HEADER = "x-request-priority"
+
+# Relay routes that are bulk sync traffic unless the client says otherwise;
+# batches back interactive screens (an issue with its comments), so they
+# stay interactive by default
+_SYNC_ROUTES = re.compile(r"^/api/jira/[^/]+/rest/api/[^/]+/search(/jql)?/?$")
+
+_lane: ContextVar[str] = ContextVar("request_lane", default="interactive")
+
+queue_wait_seconds = registry.histogram(
+    "relay_queue_wait_seconds",
+    "Time relay requests waited for an upstream slot",
+    labels=("lane",),
+)
+
+
+def current_lane() -> str:
+    """Lane of the current request."""
+    return _lane.get()
+
+
+def parse_lane(value: str | None) -> str | None:
+    """Validate a lane name from a header, or None if it isn't one."""
+    if value is None:
+        return None
+    value = value.strip().lower()
+    return value if value in LANES else None
+
+
+def parse_user_weights(value: str) -> dict[str, float]:
+    """Parse fair-share weights from ``"user-id=weight,..."``.
+
+    Raises:
+        ValueError: if an entry isn't ``user-id=weight`` with a positive weight
+    """
+    weights = {}
+    for entry in value.split(","):
+        if not entry.strip():
+            continue
+        user, _, weight = (part.strip() for part in entry.partition("="))
+        try:
+            weights[user] = float(weight)
+        except ValueError:
+            weights[user] = 0.0
+        if not user or weights[user] <= 0:
+            raise ValueError(f"Invalid user weight: {entry.strip()!r}")
+    return weights
+
+
+def request_lane(path: str, header: str | None = None) -> str:
+    """Lane of an HTTP request: the client's header, else by route."""
+    lane = parse_lane(header)
+    if lane is not None:
+        return lane
+    return "sync" if _SYNC_ROUTES.match(path) else "interactive"
+
+
+@contextmanager
+def lane_scope(lane: str) -> Iterator[None]:
+    """Run a block with upstream calls assigned to a lane."""
+    if lane not in LANES:
+        raise ValueError(f"Unknown lane: {lane}")
+    token = _lane.set(lane)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+@dataclass
+class _Waiter:
+    future: asyncio.Future
+    user: str
+    connection: str
+    enqueued: float = field(default_factory=time.monotonic)
+
+
+class _LaneQueue:
+    """Waiters of one lane, queued per user and per connection of a user.
+
+    Users are served by weighted fair queuing: each grant advances a user's
+    virtual time by ``1 / weight`` and the backlogged user with the lowest
+    virtual time goes next. A user's connections take turns round-robin.
+
+    A user's entries are kept while it has queued waiters or slots in use,
+    so a user re-queueing right after a grant keeps the lead it built up;
+    the scheduler calls :meth:`forget` once it has neither.
+    """
+
+    def __init__(self):
+        self.flows: dict[str, OrderedDict[str, deque[_Waiter]]] = {}
+        self.vtime: dict[str, float] = {}
+        # Virtual time of the last grant; where newly backlogged users start
+        self.now = 0.0
+        self.last_connection: dict[str, str] = {}
+        self.size = 0
+
+    def push(self, waiter: _Waiter) -> None:
+        if waiter.user not in self.flows:
+            # A newly backlogged user starts no earlier than the current
+            # virtual time instead of spending credit saved up while idle
+            self.vtime[waiter.user] = max(
+                self.vtime.get(waiter.user, self.now), self.now
+            )
+            self.flows[waiter.user] = OrderedDict()
+        connections = self.flows[waiter.user]
+        connections.setdefault(waiter.connection, deque()).append(waiter)
+        self.size += 1
+
+    def pop(self, eligible: Callable[[str], bool], weight: Callable[[str], float]):
+        """Remove and return the next waiter of an eligible user, if any."""
+        users = [user for user in self.flows if eligible(user)]
+        if not users:
+            return None
+        user = min(users, key=lambda u: self.vtime[u])
+        connections = self.flows[user]
+        connection = next(iter(connections))
+        if connection == self.last_connection.get(user) and len(connections) > 1:
+            connections.move_to_end(connection)
+            connection = next(iter(connections))
+        waiters = connections[connection]
+        waiter = waiters.popleft()
+        connections.move_to_end(connection)
+        if not waiters:
+            del connections[connection]
+        if not connections:
+            del self.flows[user]
+        self.last_connection[user] = connection
+        self.now = self.vtime[user]
+        self.vtime[user] += 1.0 / weight(user)
+        self.size -= 1
+        return waiter
+
+    def remove(self, waiter: _Waiter) -> bool:
+        connections = self.flows.get(waiter.user)
+        waiters = connections.get(waiter.connection) if connections else None
+        if not waiters or waiter not in waiters:
+            return False
+        waiters.remove(waiter)
+        if not waiters:
+            del connections[waiter.connection]
+        if not connections:
+            del self.flows[waiter.user]
+        self.size -= 1
+        return True
+
+    def forget(self, user: str) -> None:
+        """Drop the state of a user without queued waiters."""
+        if user not in self.flows:
+            self.vtime.pop(user, None)
+            self.last_connection.pop(user, None)
+
+
+class LaneScheduler:
+    """Grants upstream slots by lane priority, fairly across users.
+
+    Lanes without a configured limit may use every slot. Within a lane,
+    users share slots by weighted fair queuing, and no user holds more than
+    ``user_limit`` slots of a lane. The cap is per lane so a user's own bulk
+    traffic can't hold the slots their interactive requests need.
+    """
+
+    def __init__(
+        self,
+        total: int,
+        limits: dict[str, int] | None = None,
+        user_limit: int | None = None,
+        weights: dict[str, float] | None = None,
+    ):
+        self.total = total
+        self.limits = {
+            lane: min(limit, total) for lane, limit in (limits or {}).items()
+        }
+        self.user_limit = min(user_limit or total, total)
+        self.weights = weights or {}
+        self._active = 0
+        self._active_by_lane = dict.fromkeys(LANES, 0)
+        self._active_by_user: dict[str, dict[str, int]] = {lane: {} for lane in LANES}
+        self._queues = {lane: _LaneQueue() for lane in LANES}
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Active and waiting requests per lane."""
+        return {
+            lane: {
+                "active": self._active_by_lane[lane],
+                "waiting": self._queues[lane].size,
+            }
+            for lane in LANES
+        }
+
+    @asynccontextmanager
+    async def slot(
+        self, lane: str | None = None, user: str = "", connection: str = ""
+    ) -> AsyncIterator[None]:
+        """Hold an upstream slot in a lane (default: the current lane)."""
+        lane = lane or current_lane()
+        await self._acquire(lane, user, connection)
+        try:
+            yield
+        finally:
+            self._release(lane, user)
+
+    def queue_delay(self, lane: str) -> float:
+        """How long the oldest request of a lane has been waiting (0 if none)."""
+        oldest = min(
+            (
+                waiters[0].enqueued
+                for connections in self._queues[lane].flows.values()
+                for waiters in connections.values()
+            ),
+            default=None,
+        )
+        return 0.0 if oldest is None else time.monotonic() - oldest
+
+    def _has_room(self, lane: str) -> bool:
+        return self._active < self.total and self._active_by_lane[lane] < (
+            self.limits.get(lane, self.total)
+        )
+
+    def _user_has_room(self, lane: str, user: str) -> bool:
+        return self._active_by_user[lane].get(user, 0) < self.user_limit
+
+    def _weight(self, user: str) -> float:
+        return self.weights.get(user, 1.0)
+
+    def _grant(self, lane: str, user: str) -> None:
+        self._active += 1
+        self._active_by_lane[lane] += 1
+        active = self._active_by_user[lane]
+        active[user] = active.get(user, 0) + 1
+
+    async def _acquire(self, lane: str, user: str, connection: str) -> None:
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), user, connection)
+        self._queues[lane].push(waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just before the cancellation arrived; hand it on
+                self._release(lane, user)
+            else:
+                self._queues[lane].remove(waiter)
+                if user not in self._active_by_user[lane]:
+                    self._queues[lane].forget(user)
+            raise
+        queue_wait_seconds.observe(time.monotonic() - waiter.enqueued, lane=lane)
+
+    def _release(self, lane: str, user: str) -> None:
+        self._active -= 1
+        self._active_by_lane[lane] -= 1
+        active = self._active_by_user[lane]
+        active[user] -= 1
+        if not active[user]:
+            del active[user]
+            self._queues[lane].forget(user)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiters, highest lane first."""
+        for lane in LANES:
+            queue = self._queues[lane]
+            while queue.size and self._has_room(lane):
+                waiter = queue.pop(
+                    lambda user: self._user_has_room(lane, user), self._weight
+                )
+                if waiter is None:
+                    # Everyone queued here is at their user limit
+                    break
+                if not waiter.future.done():
+                    self._grant(lane, waiter.user)
+                    waiter.future.set_result(None)
+            if self._active >= self.total:
+                return
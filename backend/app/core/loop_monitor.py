@@ -0,0 +1,157 @@
+"""Event-loop lag monitor and blocking-call detector.
+
+A background task sleeps for a fixed interval and measures how late it wakes
+up: any delay beyond the interval is time the loop spent running something
+else without yielding, which every other request on the worker waited for.
+Lag is exported as Prometheus metrics.
+
+With ``DEBUG`` (or ``LOOP_MONITOR_CAPTURE_STACKS``), a watchdog thread also
+notices when the monitor task is overdue by more than the block threshold and
+logs the event loop thread's stack while it is still blocked, pointing at the
+callback responsible. Blocking calls that hold the GIL for their whole
+duration (C code such as a large ``json.loads``) keep the watchdog from
+running until they return, so for those the stack may point past the culprit;
+the lag itself is always measured.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any
+
+from app.config import Settings, get_settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Blocked intervals kept with their stacks for the diagnostics endpoint
+_MAX_RECENT_BLOCKS = 20
+
+# Frames of the loop thread's stack logged per block, innermost last
+_STACK_LIMIT = 30
+
+loop_lag_seconds = registry.histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop ran the lag monitor's timer",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+loop_blocked = registry.counter(
+    "event_loop_blocked_total",
+    "Times the event loop was blocked for longer than the block threshold",
+)
+
+
+class LoopMonitor:
+    """Measures event-loop lag and reports callbacks that block the loop."""
+
+    def __init__(self, settings: Settings | None = None):
+        self._settings = settings or get_settings()
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopping = threading.Event()
+        self._loop_thread_id: int | None = None
+        # Monotonic time the monitor task last woke up
+        self._heartbeat = 0.0
+        self._captured_heartbeat = 0.0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.recent_blocks: deque[dict[str, Any]] = deque(maxlen=_MAX_RECENT_BLOCKS)
+
+    @property
+    def capture_stacks(self) -> bool:
+        return self._settings.debug or self._settings.loop_monitor_capture_stacks
+
+    def start(self) -> None:
+        """Start measuring on the running loop."""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run(), name="loop-monitor")
+        if self.capture_stacks:
+            self._watchdog = threading.Thread(
+                target=self._watch, name="loop-monitor-watchdog", daemon=True
+            )
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop the monitor task and the watchdog."""
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+
+    def status(self) -> dict[str, Any]:
+        """Lag seen so far and the most recent blocks."""
+        return {
+            "running": self._task is not None,
+            "capture_stacks": self.capture_stacks,
+            "interval_seconds": self._settings.loop_monitor_interval_seconds,
+            "block_threshold_seconds": (
+                self._settings.loop_monitor_block_threshold_seconds
+            ),
+            "last_lag_seconds": self.last_lag,
+            "max_lag_seconds": self.max_lag,
+            "blocked_total": loop_blocked.value(),
+            "recent_blocks": list(self.recent_blocks),
+        }
+
+    def record(self, lag: float) -> None:
+        """Account for one measurement."""
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        loop_lag_seconds.observe(lag)
+        if lag >= self._settings.loop_monitor_block_threshold_seconds:
+            loop_blocked.inc()
+            if not self.capture_stacks:
+                logger.warning(
+                    f"[LoopMonitor] Event loop blocked for {lag * 1000:.0f} ms"
+                )
+
+    async def _run(self) -> None:
+        interval = self._settings.loop_monitor_interval_seconds
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            self._heartbeat = time.monotonic()
+            self.record(max(0.0, loop.time() - expected))
+
+    def _watch(self) -> None:
+        """Watchdog thread: capture the loop's stack while it is blocked."""
+        interval = self._settings.loop_monitor_interval_seconds
+        threshold = self._settings.loop_monitor_block_threshold_seconds
+        while not self._stopping.wait(min(threshold, interval) / 2):
+            heartbeat = self._heartbeat
+            overdue = time.monotonic() - heartbeat - interval
+            if overdue < threshold or heartbeat == self._captured_heartbeat:
+                continue
+            # Once per stall: the next capture needs a new heartbeat
+            self._captured_heartbeat = heartbeat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.format_stack(frame, limit=_STACK_LIMIT)
+            self.recent_blocks.append(
+                {"at": time.time(), "blocked_seconds": overdue, "stack": stack}
+            )
+            logger.warning(
+                f"[LoopMonitor] Event loop blocked for over {overdue * 1000:.0f} ms:\n"
+                + "".join(stack)
+            )
+
+
+# Singleton instance
+loop_monitor = LoopMonitor()
@@ -0,0 +1,205 @@
+"""Runtime memory diagnostics: tracemalloc snapshots, RSS and GC stats.
+
+Everything here is per worker process: with several uvicorn workers, each
+request is answered by whichever worker accepted it, and the ``pid`` in the
+responses tells them apart.
+"""
+
+import gc
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Literal
+
+logger = logging.getLogger(__name__)
+
+GroupBy = Literal["lineno", "filename", "traceback"]
+
+# Snapshots are large (one entry per allocation site and frame), keep few
+_MAX_SNAPSHOTS = 5
+
+# Allocations made by the profiler itself and the import machinery
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class SnapshotNotFound(LookupError):
+    """Raised when a snapshot id is unknown (or was evicted)."""
+
+
+@dataclass
+class _Snapshot:
+    id: int
+    taken_at: float
+    snapshot: tracemalloc.Snapshot
+    traced_bytes: int
+
+
+def _status_kb(field: str) -> int | None:
+    """A ``VmRSS``-style field of /proc/self/status in KiB (Linux only)."""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def rss_stats() -> dict[str, int | None]:
+    """Resident set size of this process, current and peak, in bytes."""
+    rss = _status_kb("VmRSS")
+    peak = _status_kb("VmHWM")
+    if peak is None and sys.platform != "win32":
+        import resource
+
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = maxrss // 1024 if sys.platform == "darwin" else maxrss
+    return {
+        "rss_bytes": rss * 1024 if rss is not None else None,
+        "peak_rss_bytes": peak * 1024 if peak is not None else None,
+    }
+
+
+def gc_stats() -> dict[str, Any]:
+    """Collector counters per generation and the number of tracked objects."""
+    return {
+        "enabled": gc.isenabled(),
+        "thresholds": list(gc.get_threshold()),
+        "counts": list(gc.get_count()),
+        "generations": gc.get_stats(),
+        "tracked_objects": len(gc.get_objects()),
+        "uncollectable": len(gc.garbage),
+    }
+
+
+def _statistics(stats: list[tracemalloc.StatisticDiff | tracemalloc.Statistic]):
+    rows = []
+    for stat in stats:
+        row = {
+            "size_bytes": stat.size,
+            "count": stat.count,
+            "traceback": [f"{f.filename}:{f.lineno}" for f in stat.traceback],
+        }
+        if isinstance(stat, tracemalloc.StatisticDiff):
+            row["size_diff_bytes"] = stat.size_diff
+            row["count_diff"] = stat.count_diff
+        rows.append(row)
+    return rows
+
+
+class MemoryProfiler:
+    """Controls tracemalloc and keeps a few snapshots for comparison."""
+
+    def __init__(self, max_snapshots: int = _MAX_SNAPSHOTS):
+        self.max_snapshots = max_snapshots
+        self._snapshots: dict[int, _Snapshot] = {}
+        self._next_id = 1
+        # Endpoints run in the threadpool, so calls may overlap
+        self._lock = threading.Lock()
+
+    def status(self) -> dict[str, Any]:
+        """Tracing state and the snapshots kept."""
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {
+            "pid": os.getpid(),
+            "tracing": tracing,
+            "frames": tracemalloc.get_traceback_limit() if tracing else None,
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "tracemalloc_overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+            "snapshots": [
+                {
+                    "id": s.id,
+                    "taken_at": s.taken_at,
+                    "traced_bytes": s.traced_bytes,
+                }
+                for s in self._snapshots.values()
+            ],
+        }
+
+    def start(self, frames: int = 1) -> None:
+        """Start tracing allocations, keeping ``frames`` frames per trace."""
+        with self._lock:
+            if tracemalloc.is_tracing():
+                if tracemalloc.get_traceback_limit() == frames:
+                    return
+                # The frame limit can only be changed by restarting
+                tracemalloc.stop()
+                self._snapshots.clear()
+            tracemalloc.start(frames)
+            logger.info(f"[Memory] tracemalloc started ({frames} frames)")
+
+    def stop(self) -> None:
+        """Stop tracing and drop the snapshots, freeing the traces."""
+        with self._lock:
+            tracemalloc.stop()
+            self._snapshots.clear()
+            logger.info("[Memory] tracemalloc stopped")
+
+    def take_snapshot(self) -> dict[str, Any]:
+        """Snapshot the traced allocations; the oldest snapshot is evicted."""
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not running")
+        snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+        with self._lock:
+            entry = _Snapshot(
+                id=self._next_id,
+                taken_at=time.time(),
+                snapshot=snapshot,
+                traced_bytes=tracemalloc.get_traced_memory()[0],
+            )
+            self._next_id += 1
+            self._snapshots[entry.id] = entry
+            while len(self._snapshots) > self.max_snapshots:
+                del self._snapshots[next(iter(self._snapshots))]
+        return {
+            "id": entry.id,
+            "taken_at": entry.taken_at,
+            "traced_bytes": entry.traced_bytes,
+        }
+
+    def delete_snapshot(self, snapshot_id: int) -> None:
+        with self._lock:
+            if self._snapshots.pop(snapshot_id, None) is None:
+                raise SnapshotNotFound(snapshot_id)
+
+    def top(
+        self, snapshot_id: int, group_by: GroupBy = "lineno", limit: int = 20
+    ) -> list[dict[str, Any]]:
+        """The allocation sites holding the most memory in a snapshot."""
+        stats = self._get(snapshot_id).snapshot.statistics(group_by)
+        return _statistics(stats[:limit])
+
+    def diff(
+        self,
+        snapshot_id: int,
+        base_id: int,
+        group_by: GroupBy = "lineno",
+        limit: int = 20,
+    ) -> list[dict[str, Any]]:
+        """The allocation sites that grew the most from ``base_id``."""
+        snapshot = self._get(snapshot_id).snapshot
+        base = self._get(base_id).snapshot
+        return _statistics(snapshot.compare_to(base, group_by)[:limit])
+
+    def _get(self, snapshot_id: int) -> _Snapshot:
+        entry = self._snapshots.get(snapshot_id)
+        if entry is None:
+            raise SnapshotNotFound(snapshot_id)
+        return entry
+
+
+# Singleton instance
+memory_profiler = MemoryProfiler()
@@ -0,0 +1,212 @@
+"""In-process metrics in the Prometheus text exposition format.
+
+A deliberately small registry (counters, gauges, histograms with labels) so
+the backend can expose ``/metrics`` without an extra dependency. Values are
+per worker process; Prometheus adds the instance label when scraping each
+worker, or sums them.
+"""
+
+import math
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
+
+# Default histogram buckets in seconds (latency and queue wait)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    @abstractmethod
+    def samples(self) -> list[tuple[str, str, float]]:
+        """(suffix, formatted labels, value) triples for exposition."""
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            ("", _format_labels(self.label_names, key), value) for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, set directly or read from a callback."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Iterable[str] = (),
+        callback: Callable[[], dict[LabelValues, float]] | None = None,
+    ):
+        super().__init__(name, documentation, labels)
+        self._values: dict[LabelValues, float] = {}
+        self._callback = callback
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        if self._callback is not None:
+            items = list(self._callback().items())
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        return [
+            ("", _format_labels(self.label_names, key), value) for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket..., +Inf count], sum
+        self._values: dict[LabelValues, tuple[list[int], float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        with self._lock:
+            items = [(key, (list(c), s)) for key, (c, s) in self._values.items()]
+        result = []
+        names = (*self.label_names, "le")
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                le = _format_value(bound)
+                result.append(
+                    ("_bucket", _format_labels(names, (*key, le)), cumulative)
+                )
+            labels = _format_labels(self.label_names, key)
+            result.append(("_count", labels, cumulative))
+            result.append(("_sum", labels, total))
+        return result
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels=()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels=(), callback=None) -> Gauge:
+        return self.register(Gauge(name, documentation, labels, callback))
+
+    def histogram(
+        self, name: str, documentation: str, labels=(), buckets=DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+# Singleton instance
+registry = Registry()
@@ -0,0 +1,302 @@
+"""On-demand statistical sampling profiler.
+
+A background thread samples the Python stacks of this worker every few
+milliseconds and counts identical stacks. Profiles are kept in the folded
+("collapsed") stack format used by flamegraph.pl, speedscope and most other
+flame graph tools: one line per distinct stack, frames separated by ``;``,
+then the sample count.
+
+Two kinds of profile can be taken, both per worker process:
+
+- request profiles: an admin arms the profiler for the next N requests
+  matching a method and path prefix. ``ProfilingMiddleware`` profiles them,
+  recording only the samples whose stack runs through that request (so the
+  other requests interleaved on the event loop are left out), and returns the
+  profile id in an ``X-Profile-Id`` response header.
+- window profiles: every thread of the worker for a number of seconds.
+
+The sampler only runs while a profile is being taken. It is a Python thread,
+so it samples when it gets the GIL: code that holds the GIL for long
+stretches is sampled at the end of each stretch.
+"""
+
+import itertools
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from types import FrameType
+from typing import Any
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Header carrying the id of the profile taken for a request
+PROFILE_ID_HEADER = "x-profile-id"
+
+# Finished profiles kept for download; the oldest are dropped
+_MAX_PROFILES = 20
+
+# Frames deeper than this are cut from the root side
+_MAX_DEPTH = 200
+
+# Paths stripped from file names in frame labels, longest first
+_PATH_PREFIXES = sorted(
+    {os.path.join(p or os.getcwd(), "") for p in sys.path if os.path.isdir(p or ".")},
+    key=len,
+    reverse=True,
+)
+
+
+class ProfileNotFound(LookupError):
+    """Raised when a profile id is unknown (or was evicted)."""
+
+
+def _label(frame: FrameType) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            filename = filename[len(prefix) :]
+            break
+    # ";" separates frames in the folded format
+    name = getattr(code, "co_qualname", code.co_name).replace(";", ":")
+    return f"{name} ({filename}:{code.co_firstlineno})"
+
+
+@dataclass
+class Profile:
+    """Sample counts per folded stack."""
+
+    id: int
+    kind: str
+    name: str
+    interval: float
+    started_at: float = field(default_factory=time.time)
+    duration: float | None = None
+    samples: int = 0
+    stacks: Counter = field(default_factory=Counter)
+    # Request profiles: the frame of the request in ProfilingMiddleware
+    marker: FrameType | None = None
+    _started: float = field(default_factory=time.perf_counter)
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_seconds": self.duration,
+            "interval_seconds": self.interval,
+            "samples": self.samples,
+        }
+
+    def folded(self) -> str:
+        """The profile in the folded stack format."""
+        lines = [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+@dataclass
+class _Arming:
+    method: str | None
+    path_prefix: str
+    remaining: int
+
+
+class SamplingProfiler:
+    """Samples stacks for the profiles currently being taken."""
+
+    def __init__(self, interval: float | None = None, max_profiles=_MAX_PROFILES):
+        self.interval = interval or get_settings().profiler_interval_seconds
+        self.max_profiles = max_profiles
+        self._ids = itertools.count(1)
+        self._active: dict[int, Profile] = {}
+        self._finished: dict[int, Profile] = {}
+        self._arming: _Arming | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    # --- Request profiles ---
+
+    def arm(self, path_prefix: str, count: int, method: str | None = None) -> None:
+        """Profile the next ``count`` requests matching method and path prefix."""
+        with self._lock:
+            self._arming = _Arming(method and method.upper(), path_prefix, count)
+        logger.info(
+            f"[Profiler] Armed for {count} {method or 'any'} request(s) "
+            f"under {path_prefix}"
+        )
+
+    def disarm(self) -> None:
+        with self._lock:
+            self._arming = None
+
+    def claim(self, method: str, path: str) -> bool:
+        """Whether this request should be profiled (uses up one arming)."""
+        arming = self._arming
+        if arming is None:
+            return False
+        with self._lock:
+            arming = self._arming
+            if (
+                arming is None
+                or (arming.method and arming.method != method)
+                or not path.startswith(arming.path_prefix)
+            ):
+                return False
+            arming.remaining -= 1
+            if arming.remaining <= 0:
+                self._arming = None
+            return True
+
+    def begin(self, name: str, marker: FrameType) -> Profile:
+        """Start a profile of the request running through ``marker``."""
+        return self._begin("request", name, marker)
+
+    # --- Window profiles ---
+
+    def profile_window(self, seconds: float) -> Profile:
+        """Profile every thread for ``seconds`` (blocks the calling thread)."""
+        profile = self._begin("window", f"{seconds:g}s window", None)
+        time.sleep(seconds)
+        return self.end(profile)
+
+    # --- Profiles ---
+
+    def end(self, profile: Profile) -> Profile:
+        """Stop sampling a profile and keep it for download."""
+        with self._lock:
+            self._active.pop(profile.id, None)
+            profile.duration = time.perf_counter() - profile._started
+            profile.marker = None
+            self._finished[profile.id] = profile
+            while len(self._finished) > self.max_profiles:
+                del self._finished[next(iter(self._finished))]
+        return profile
+
+    def status(self) -> dict[str, Any]:
+        arming = self._arming
+        return {
+            "pid": os.getpid(),
+            "interval_seconds": self.interval,
+            "armed": (
+                {
+                    "method": arming.method,
+                    "path_prefix": arming.path_prefix,
+                    "remaining": arming.remaining,
+                }
+                if arming is not None
+                else None
+            ),
+            "active": [p.summary() for p in list(self._active.values())],
+            "profiles": [p.summary() for p in list(self._finished.values())],
+        }
+
+    def get(self, profile_id: int) -> Profile:
+        profile = self._finished.get(profile_id)
+        if profile is None:
+            raise ProfileNotFound(profile_id)
+        return profile
+
+    def _begin(self, kind: str, name: str, marker: FrameType | None) -> Profile:
+        profile = Profile(next(self._ids), kind, name, self.interval, marker=marker)
+        with self._lock:
+            self._active[profile.id] = profile
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="sampling-profiler", daemon=True
+                )
+                self._thread.start()
+        return profile
+
+    def _run(self) -> None:
+        """Sampler thread: runs while any profile is active."""
+        own_id = threading.get_ident()
+        while True:
+            stacks = [
+                self._stack(frame)
+                for thread_id, frame in sys._current_frames().items()
+                if thread_id != own_id
+            ]
+            with self._lock:
+                if not self._active:
+                    self._thread = None
+                    return
+                for profile in self._active.values():
+                    self._sample(profile, stacks)
+            del stacks
+            time.sleep(self.interval)
+
+    @staticmethod
+    def _stack(leaf: FrameType) -> list[FrameType]:
+        frames = []
+        frame: FrameType | None = leaf
+        while frame is not None and len(frames) < _MAX_DEPTH:
+            frames.append(frame)
+            frame = frame.f_back
+        frames.reverse()
+        return frames
+
+    @staticmethod
+    def _sample(profile: Profile, stacks: list[list[FrameType]]) -> None:
+        profile.samples += 1
+        for frames in stacks:
+            if profile.marker is not None:
+                # Only the part of the stack running the profiled request
+                try:
+                    frames = frames[frames.index(profile.marker) :]
+                except ValueError:
+                    continue
+            profile.stacks[";".join(_label(f) for f in frames)] += 1
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling the requests the profiler is armed for.
+
+    Only stacks running through this middleware are kept, so it must sit
+    inside any middleware that runs the app in a new task.
+    """
+
+    def __init__(self, app: Any, profiler: SamplingProfiler | None = None):
+        self.app = app
+        self.profiler = profiler or get_profiler()
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not self.profiler.claim(
+            scope.get("method", "GET"), scope.get("path", "")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        name = f"{scope.get('method', 'GET')} {scope.get('path', '')}"
+        # This coroutine's frame is on the stack whenever the request runs
+        profile = self.profiler.begin(name, sys._getframe())
+
+        async def profiled_send(message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_ID_HEADER.encode(), str(profile.id).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, profiled_send)
+        finally:
+            self.profiler.end(profile)
+            logger.info(
+                f"[Profiler] Profile {profile.id} of {name}: {profile.samples} samples"
+            )
+
+
+def get_profiler() -> "SamplingProfiler":
+    """The application profiler."""
+    return profiler
+
+
+# Singleton instance
+profiler = SamplingProfiler()
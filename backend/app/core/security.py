@@ -2,25 +2,32 @@
 
 import base64
 from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
 
 from argon2 import PasswordHasher
 from argon2.exceptions import VerifyMismatchError
-from cryptography.fernet import Fernet
-from jose import JWTError, jwt
 
 from app.config import get_settings
 
+# jose (with its cryptography backend) and Fernet are imported on first use:
+# together they are a sizeable share of worker import time, and health
+# checks and most first requests need neither
+if TYPE_CHECKING:
+    from cryptography.fernet import Fernet
+
 # Password hasher
 _password_hasher = PasswordHasher()
 
 # Fernet instance (lazy-loaded)
-_fernet: Fernet | None = None
+_fernet: "Fernet | None" = None
 
 
-def _get_fernet() -> Fernet:
+def _get_fernet() -> "Fernet":
     """Get or create Fernet instance for encryption."""
     global _fernet
     if _fernet is None:
+        from cryptography.fernet import Fernet
+
         settings = get_settings()
         if settings.encryption_key:
             key = settings.encryption_key.encode()
@@ -56,6 +63,8 @@ def verify_password(password: str, password_hash: str) -> bool:
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     """Create a JWT access token."""
+    from jose import jwt
+
     settings = get_settings()
     to_encode = data.copy()
 
@@ -75,6 +84,8 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
 
 def decode_access_token(token: str) -> dict | None:
     """Decode and verify a JWT access token."""
+    from jose import JWTError, jwt
+
     settings = get_settings()
     try:
         payload = jwt.decode(
@@ -0,0 +1,91 @@
+"""Worker startup timing.
+
+Records how long each lifespan startup step takes and how old the worker
+process is when it becomes ready to serve, i.e. interpreter start, imports
+and startup together. The report is logged once startup finishes, exported
+as ``worker_startup_seconds`` and listed at
+``GET /api/admin/diagnostics/startup``.
+
+For a per-module import breakdown, and to measure time to the first
+answered request from the outside, run ``python -m benchmarks.startup``.
+"""
+
+import logging
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+startup_seconds = registry.gauge(
+    "worker_startup_seconds",
+    "Time spent per lifespan startup step; step=ready is the process age",
+    labels=("step",),
+)
+
+
+def process_age() -> float | None:
+    """Seconds since this process started (Linux only)."""
+    try:
+        with open("/proc/self/stat") as stat:
+            # Fields after the parenthesised command name; starttime is 22nd
+            fields = stat.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as uptime:
+            uptime_seconds = float(uptime.read().split()[0])
+    except (OSError, IndexError, ValueError):
+        return None
+    return uptime_seconds - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+
+
+class StartupReport:
+    """Durations of the startup steps of this worker."""
+
+    def __init__(self):
+        self.steps: dict[str, float] = {}
+        # Process age when app.main was imported and when startup finished
+        self.imported_after: float | None = None
+        self.ready_after: float | None = None
+        self._imported_pid: int | None = None
+
+    def imported(self) -> None:
+        """Mark the end of module imports."""
+        self.imported_after = process_age()
+        self._imported_pid = os.getpid()
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        """Time one startup step."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps[name] = time.perf_counter() - started
+            startup_seconds.set(self.steps[name], step=name)
+
+    def ready(self) -> None:
+        """Mark the worker ready and log the report."""
+        if self._imported_pid != os.getpid():
+            # Forked from a master that did the imports (e.g. gunicorn --preload)
+            self.imported_after = None
+        self.ready_after = process_age()
+        if self.ready_after is not None:
+            startup_seconds.set(self.ready_after, step="ready")
+        steps = ", ".join(f"{name} {s * 1000:.0f} ms" for name, s in self.steps.items())
+        age = f"{self.ready_after:.2f} s" if self.ready_after is not None else "?"
+        logger.info(f"[Startup] Worker {os.getpid()} ready at {age}: {steps}")
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "imported_after_seconds": self.imported_after,
+            "ready_after_seconds": self.ready_after,
+            "steps_seconds": dict(self.steps),
+        }
+
+
+# Singleton instance
+startup_report = StartupReport()
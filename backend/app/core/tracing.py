@@ -0,0 +1,419 @@
+"""Request tracing: spans across auth, database, relay and upstream phases.
+
+A slow request is broken down into spans: the HTTP request itself
+(``TracingMiddleware``), ``get_current_user``, each database query, the
+API token decryption, and each upstream JIRA call with its connect, TLS,
+send, time-to-first-byte and download phases. The current span lives in a
+context variable, so children find their parent across ``await``.
+
+W3C ``traceparent`` headers are honoured on incoming requests and added to
+upstream calls. Finished spans are batched and exported as OTLP/JSON, to a
+JSON-lines file and/or an OTLP/HTTP collector (e.g. the OpenTelemetry
+Collector or Jaeger on ``:4318/v1/traces``).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+from app.config import Settings, get_settings
+from app.core.upstream_timing import HTTPCORE_PHASES
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+TRACE_ID_HEADER = "x-trace-id"
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+# OTLP span kinds
+_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+# Finished spans kept for export; the oldest are dropped past this
+_MAX_BUFFERED_SPANS = 10_000
+
+
+@dataclass
+class Span:
+    """A timed operation within a trace."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None = None
+    kind: str = "internal"
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+    sampled: bool = True
+    _tracer: "Tracer | None" = field(default=None, repr=False)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.error = message
+
+    def end(self, end_ns: int | None = None) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = end_ns or time.time_ns()
+        if self.sampled and self._tracer is not None:
+            self._tracer._finished(self)
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns or time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Span | None:
+    """The innermost active span of this task, if any."""
+    return _current_span.get()
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str, bool] | None:
+    """(trace id, parent span id, sampled) of a W3C traceparent, or None."""
+    if not value:
+        return None
+    match = _TRACEPARENT.match(value.strip().lower())
+    if match is None:
+        return None
+    trace_id, parent_id, flags = match.groups()
+    if trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(span: Span) -> dict[str, Any]:
+    data: dict[str, Any] = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": _KINDS.get(span.kind, 1),
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [
+            {"key": key, "value": _otlp_value(value)}
+            for key, value in span.attributes.items()
+        ],
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 0},
+    }
+    if span.parent_id:
+        data["parentSpanId"] = span.parent_id
+    return data
+
+
+class Tracer:
+    """Creates spans and exports the finished ones in batches."""
+
+    def __init__(self, settings: Settings | None = None):
+        self._settings = settings or get_settings()
+        self._buffer: deque[Span] = deque(maxlen=_MAX_BUFFERED_SPANS)
+        self._task: asyncio.Task | None = None
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._settings.tracing_enabled
+
+    def start_span(
+        self,
+        name: str,
+        kind: str = "internal",
+        parent: Span | None = None,
+        remote_parent: tuple[str, str, bool] | None = None,
+        start_ns: int | None = None,
+        **attributes: Any,
+    ) -> Span:
+        """Start a span without making it current; the caller ends it.
+
+        Without an explicit parent, the current span is the parent; without
+        any, a new trace starts (sampled at ``tracing_sample_rate``).
+        """
+        parent = parent or current_span()
+        if parent is not None:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+            sampled = parent.sampled
+        elif remote_parent is not None:
+            trace_id, parent_id, sampled = remote_parent
+        else:
+            trace_id, parent_id = _new_id(16), None
+            sampled = random.random() < self._settings.tracing_sample_rate
+        return Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=_new_id(8),
+            parent_id=parent_id,
+            kind=kind,
+            start_ns=start_ns or time.time_ns(),
+            attributes=attributes,
+            sampled=sampled,
+            _tracer=self,
+        )
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attributes: Any):
+        """Run a block as the current span; exceptions mark it as failed.
+
+        Yields None when tracing is disabled.
+        """
+        if not self.enabled:
+            yield None
+            return
+        span = self.start_span(name, kind, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def _finished(self, span: Span) -> None:
+        self._buffer.append(span)
+
+    # --- Export ---
+
+    def start(self) -> None:
+        """Start exporting finished spans in the background."""
+        settings = self._settings
+        exporting = settings.tracing_export_path or settings.tracing_otlp_endpoint
+        if self.enabled and exporting and self._task is None:
+            self._task = asyncio.create_task(self._run(), name="trace-exporter")
+
+    async def stop(self) -> None:
+        """Stop the exporter after a last flush."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._settings.tracing_export_interval_seconds)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("[Tracing] Export failed")
+
+    def export_batch(self) -> dict[str, Any] | None:
+        """Take the buffered spans as an OTLP/JSON ExportTraceServiceRequest."""
+        if not self._buffer:
+            return None
+        spans = [self._buffer.popleft() for _ in range(len(self._buffer))]
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": _otlp_value(
+                                    self._settings.tracing_service_name
+                                ),
+                            },
+                            {"key": "process.pid", "value": _otlp_value(os.getpid())},
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "app.core.tracing"},
+                            "spans": [_otlp_span(span) for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    async def flush(self) -> None:
+        """Export the buffered spans to the configured file and collector."""
+        batch = self.export_batch()
+        if batch is None:
+            return
+        settings = self._settings
+        if settings.tracing_export_path:
+            line = json.dumps(batch, separators=(",", ":")) + "\n"
+            await asyncio.to_thread(self._append, settings.tracing_export_path, line)
+        if settings.tracing_otlp_endpoint:
+            if self._client is None:
+                self._client = httpx.AsyncClient(timeout=10.0)
+            response = await self._client.post(
+                settings.tracing_otlp_endpoint, json=batch
+            )
+            if response.status_code >= 400:
+                logger.warning(
+                    f"[Tracing] Collector answered {response.status_code}: "
+                    f"{response.text[:200]}"
+                )
+
+    @staticmethod
+    def _append(path: str, line: str) -> None:
+        with open(path, "a", encoding="utf-8") as output:
+            output.write(line)
+
+    # --- Instrumentation helpers ---
+
+    def httpcore_trace(self, parent: Span | None):
+        """An httpx ``trace`` extension recording upstream phase spans."""
+        if parent is None:
+            return None
+        started: dict[str, int] = {}
+
+        async def trace(event_name: str, info: dict[str, Any]) -> None:
+            prefix, _, stage = event_name.rpartition(".")
+            phase = HTTPCORE_PHASES.get(prefix)
+            if phase is None:
+                return
+            if stage == "started":
+                # Headers and body are sent back to back: one "send" phase
+                started.setdefault(phase, time.time_ns())
+            elif stage in ("complete", "failed") and phase in started:
+                if prefix.endswith("send_request_headers"):
+                    return
+                span = self.start_span(
+                    f"upstream.{phase}", parent=parent, start_ns=started.pop(phase)
+                )
+                if stage == "failed":
+                    span.set_error(repr(info.get("exception")))
+                span.end()
+
+        return trace
+
+    def instrument_engine(self, engine: Any) -> None:
+        """Record a span per database statement of a SQLAlchemy engine."""
+        from sqlalchemy import event
+
+        sync_engine = getattr(engine, "sync_engine", engine)
+        system = sync_engine.dialect.name
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, params, context, many):
+            if not self.enabled or context is None:
+                return
+            context._trace_span = self.start_span(
+                "db.query",
+                kind="client",
+                **{
+                    "db.system": system,
+                    "db.operation": statement.split(None, 1)[0].upper(),
+                    "db.statement": statement[:1000],
+                },
+            )
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, params, context, many):
+            span = getattr(context, "_trace_span", None)
+            if span is not None:
+                if cursor.rowcount is not None and cursor.rowcount >= 0:
+                    span.set_attribute("db.rowcount", cursor.rowcount)
+                span.end()
+
+        @event.listens_for(sync_engine, "handle_error")
+        def handle_error(exception_context):
+            context = exception_context.execution_context
+            span = getattr(context, "_trace_span", None)
+            if span is not None:
+                span.set_error(repr(exception_context.original_exception))
+                span.end()
+
+
+def get_tracer() -> "Tracer":
+    """The application tracer."""
+    return tracer
+
+
+class TracingMiddleware:
+    """ASGI middleware running each HTTP request in a server span."""
+
+    def __init__(self, app: Any, tracer: Tracer | None = None):
+        self.app = app
+        self.tracer = tracer or get_tracer()
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        remote = None
+        for name, value in scope.get("headers", []):
+            if name == b"traceparent":
+                remote = parse_traceparent(value.decode("latin-1"))
+                break
+        method = scope.get("method", "GET")
+        span = self.tracer.start_span(
+            f"{method} {scope.get('path', '')}",
+            kind="server",
+            remote_parent=remote,
+            **{"http.method": method, "http.target": scope.get("path", "")},
+        )
+        token = _current_span.set(span)
+
+        async def traced_send(message) -> None:
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.set_error(f"HTTP {message['status']}")
+                headers = list(message.get("headers", []))
+                headers.append((TRACE_ID_HEADER.encode(), span.trace_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, traced_send)
+        except BaseException as e:
+            span.set_error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            route = scope.get("route")
+            if route is not None and getattr(route, "path", None):
+                span.name = f"{method} {route.path}"
+                span.set_attribute("http.route", route.path)
+            _current_span.reset(token)
+            span.end()
+
+
+# Singleton instance
+tracer = Tracer()
@@ -0,0 +1,104 @@
+"""Phase timings of upstream JIRA requests.
+
+httpcore reports the steps of a request through the ``trace`` request
+extension. ``UpstreamTiming.trace`` turns those events into per-phase
+durations: ``connect`` (DNS resolution and TCP connect; httpcore does both
+in one step), ``tls``, ``send`` (request headers and body), ``ttfb`` (waiting
+for the response headers, i.e. JIRA's processing time plus one round trip)
+and ``download`` (reading the body). A reused keep-alive connection has no
+``connect`` or ``tls`` phase.
+
+Durations are aggregated per JIRA origin in ``upstream_phase_seconds`` and
+returned to the client in a ``Server-Timing`` header, so a slow network can
+be told apart from a slow JIRA.
+"""
+
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlsplit
+
+from app.core.metrics import registry
+
+# httpcore trace event prefixes by phase
+HTTPCORE_PHASES = {
+    "connection.connect_tcp": "connect",  # Includes DNS resolution
+    "connection.start_tls": "tls",
+    "http11.send_request_headers": "send",
+    "http11.send_request_body": "send",
+    "http2.send_request_headers": "send",
+    "http2.send_request_body": "send",
+    "http11.receive_response_headers": "ttfb",
+    "http2.receive_response_headers": "ttfb",
+    "http11.receive_response_body": "download",
+    "http2.receive_response_body": "download",
+}
+
+PHASES = ("connect", "tls", "send", "ttfb", "download")
+
+TraceCallback = Callable[[str, dict[str, Any]], Awaitable[None]]
+
+upstream_phase_seconds = registry.histogram(
+    "upstream_phase_seconds",
+    "Upstream JIRA request time per phase",
+    labels=("origin", "phase"),
+)
+
+
+def origin_of(url: str) -> str:
+    """``scheme://host[:port]`` of a URL, the metric label for a JIRA site."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+@dataclass
+class UpstreamTiming:
+    """Phase durations of one upstream request, in seconds."""
+
+    origin: str
+    phases: dict[str, float] = field(default_factory=dict)
+    total: float | None = None
+
+    def trace(self, chain: TraceCallback | None = None) -> TraceCallback:
+        """An httpcore trace callback recording into this timing."""
+        started: dict[str, float] = {}
+
+        async def trace(event_name: str, info: dict[str, Any]) -> None:
+            prefix, _, stage = event_name.rpartition(".")
+            phase = HTTPCORE_PHASES.get(prefix)
+            if phase is not None:
+                if stage == "started":
+                    # Headers and body are sent back to back: one "send" phase
+                    started.setdefault(phase, time.perf_counter())
+                elif (
+                    stage in ("complete", "failed")
+                    and phase in started
+                    and not prefix.endswith("send_request_headers")
+                ):
+                    elapsed = time.perf_counter() - started.pop(phase)
+                    self.phases[phase] = self.phases.get(phase, 0.0) + elapsed
+            if chain is not None:
+                await chain(event_name, info)
+
+        return trace
+
+    def observe(self) -> None:
+        """Add the phases to the per-origin histograms."""
+        for phase, seconds in self.phases.items():
+            upstream_phase_seconds.observe(seconds, origin=self.origin, phase=phase)
+
+    def server_timing(self) -> str:
+        """The phases as a ``Server-Timing`` header value, in milliseconds."""
+        metrics = [
+            f"upstream-{phase};dur={self.phases[phase] * 1000:.1f}"
+            for phase in PHASES
+            if phase in self.phases
+        ]
+        if self.total is not None:
+            metrics.append(f"upstream;dur={self.total * 1000:.1f}")
+        return ", ".join(metrics)
+
+    def as_dict(self) -> dict[str, float]:
+        """Phase durations in milliseconds, for logs."""
+        return {phase: round(s * 1000, 1) for phase, s in self.phases.items()}
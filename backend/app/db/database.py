@@ -1,10 +1,171 @@
-"""Database configuration and session management."""
+"""Database configuration, session management and query instrumentation.
+
+Every statement run through the engine is timed. Inside ``track_queries``
+(which ``QueryStatsMiddleware`` opens for each HTTP request) the statements
+are also counted per normalised SQL, so a request that runs the same query
+over and over, typically an N+1 loop, is logged with the offending SQL.
+"""
+
+import logging
+import re
+import time
+from collections import Counter, deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
 
 from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
 from app.config import get_settings
+from app.core.metrics import registry
+from app.core.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Slow statements kept per request and process-wide
+_MAX_SLOW_SAMPLES = 5
+_MAX_RECENT_SLOW = 50
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\$\d+|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+query_duration_seconds = registry.histogram(
+    "db_query_duration_seconds",
+    "Database statement execution time",
+    labels=("operation",),
+)
+request_queries = registry.histogram(
+    "http_request_db_queries",
+    "Database statements run per HTTP request",
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250),
+)
+repeated_queries = registry.counter(
+    "db_repeated_queries_total",
+    "Requests that ran one statement at least db_repeated_query_threshold times",
+)
+
+# Slow statements of any request or background job, newest last
+recent_slow_queries: deque[dict[str, Any]] = deque(maxlen=_MAX_RECENT_SLOW)
+
+
+def normalize_sql(statement: str) -> str:
+    """SQL with literals and placeholders as ``?`` and IN lists collapsed."""
+    sql = _LITERALS.sub("?", statement)
+    sql = _IN_LISTS.sub("(?)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+@dataclass
+class QueryStats:
+    """Statements run within one ``track_queries`` scope."""
+
+    name: str
+    count: int = 0
+    total_seconds: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+    slow: list[dict[str, Any]] = field(default_factory=list)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Normalised statements run at least ``threshold`` times."""
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> QueryStats | None:
+    """Statistics of the current request, if it is being tracked."""
+    return _query_stats.get()
+
+
+@contextmanager
+def track_queries(name: str) -> Iterator[QueryStats]:
+    """Collect the statements run inside the block and report repeats."""
+    stats = QueryStats(name)
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+        _report(stats)
+
+
+def _report(stats: QueryStats) -> None:
+    settings = get_settings()
+    request_queries.observe(stats.count)
+    repeated = stats.repeated(settings.db_repeated_query_threshold)
+    if repeated:
+        repeated_queries.inc()
+        sql, times = repeated[0]
+        logger.warning(
+            f"[DB] {stats.name} ran the same query {times} times "
+            f"({stats.count} queries, {stats.total_seconds * 1000:.1f} ms): {sql}"
+        )
+    elif stats.count:
+        logger.debug(
+            f"[DB] {stats.name}: {stats.count} queries in "
+            f"{stats.total_seconds * 1000:.1f} ms"
+        )
+
+
+def instrument_query_stats(engine: Any) -> None:
+    """Time every statement of an engine and feed ``track_queries`` scopes."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, params, context, many):
+        if context is not None:
+            context._query_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, params, context, many):
+        started = getattr(context, "_query_started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        operation = statement.split(None, 1)[0].upper() if statement else ""
+        query_duration_seconds.observe(elapsed, operation=operation)
+
+        stats = _query_stats.get()
+        slow = elapsed >= get_settings().db_slow_query_seconds
+        if stats is None and not slow:
+            return
+        sql = normalize_sql(statement)
+        if stats is not None:
+            stats.count += 1
+            stats.total_seconds += elapsed
+            stats.statements[sql] += 1
+        if slow:
+            sample = {
+                "at": time.time(),
+                "duration_ms": round(elapsed * 1000, 2),
+                "scope": stats.name if stats is not None else None,
+                "sql": sql,
+            }
+            recent_slow_queries.append(sample)
+            if stats is not None and len(stats.slow) < _MAX_SLOW_SAMPLES:
+                stats.slow.append(sample)
+            logger.warning(f"[DB] Slow query ({elapsed * 1000:.1f} ms): {sql}")
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware tracking the queries of each HTTP request."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        name = f"{scope.get('method', 'GET')} {scope.get('path', '')}"
+        with track_queries(name):
+            await self.app(scope, receive, send)
 
 
 class Base(DeclarativeBase):
@@ -19,6 +180,8 @@ engine = create_async_engine(
     echo=False,
     future=True,
 )
+tracer.instrument_engine(engine)
+instrument_query_stats(engine)
 
 
 # Enable foreign keys for SQLite only (PostgreSQL has them enabled by default)
@@ -65,6 +228,7 @@ def _run_migrations(conn) -> None:
 
     settings = get_settings()
     if settings.database_type != "sqlite":
+        _run_postgres_migrations(conn)
         return
 
     inspector = inspect(conn)
@@ -90,6 +254,39 @@ ADD COLUMN
                 # Another worker already added the column - race condition handled
                 pass
 
+        # Migration: Add last_used_at column to jira_connections if missing
+        if "last_used_at" not in columns:
+            try:
+                conn.execute(
+                    text(
+                        """
+ALTER TABLE
+    jira_connections
+ADD COLUMN
+    last_used_at DATETIME
+"""
+                    )
+                )
+                print("Migration: Added last_used_at column to jira_connections")
+            except OperationalError:
+                pass
+
+
+def _run_postgres_migrations(conn) -> None:
+    """Add columns introduced after the first PostgreSQL deployments."""
+    from sqlalchemy import text
+
+    conn.execute(
+        text(
+            """
+ALTER TABLE
+    jira_connections
+ADD COLUMN IF NOT EXISTS
+    last_used_at TIMESTAMP WITH TIME ZONE
+"""
+        )
+    )
+
 
 async def close_db() -> None:
     """Close database connections."""
@@ -1,11 +1,22 @@
-"""Database repositories for User and JiraConnection."""
+"""Database repositories for users, connections, the search index and outbox."""
 
-from sqlalchemy import select
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Literal
+
+from sqlalchemy import and_, delete, func, or_, select, text, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.connection import JiraConnection
+from app.models.outbox import OutboxOperation
+from app.models.search_index import PG_DOCUMENT_EXPRESSION, IssueSearchEntry
 from app.models.user import User
 
+if TYPE_CHECKING:
+    from app.services.search_index import IssueDocument
+
 
 class UserRepository:
     """Repository for User database operations."""
@@ -100,9 +111,487 @@ class ConnectionRepository:
         await self.session.delete(connection)
         await self.session.commit()
 
+    async def touch_last_used(self, connection_id: str) -> None:
+        """Record that a connection was just used through the relay."""
+        await self.session.execute(
+            update(JiraConnection)
+            .where(JiraConnection.id == connection_id)
+            .values(last_used_at=datetime.now(timezone.utc))
+        )
+        await self.session.commit()
+
+    async def get_recently_used(
+        self, since: datetime, limit: int
+    ) -> list[JiraConnection]:
+        """Get connections used since a point in time, most recent first."""
+        result = await self.session.execute(
+            select(JiraConnection)
+            .where(JiraConnection.last_used_at >= since)
+            .order_by(JiraConnection.last_used_at.desc())
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
     async def clear_default(self, user_id: str) -> None:
         """Clear the default flag for all user's connections."""
         connections = await self.get_by_user_id(user_id)
         for conn in connections:
             conn.is_default = False
         await self.session.commit()
+
+
+@dataclass
+class IssueSearchHit:
+    """A single ranked search result."""
+
+    issue_key: str
+    issue_id: str | None
+    summary: str
+    updated: str | None
+    score: float
+
+
+class IssueSearchRepository:
+    """Repository for the per-connection issue full-text index."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @property
+    def _dialect(self) -> str:
+        return self.session.bind.dialect.name
+
+    def _insert(self):
+        """Get the dialect-specific INSERT construct supporting upserts."""
+        # Imported here so SQLite deployments never load the PostgreSQL dialect
+        if self._dialect == "postgresql":
+            from sqlalchemy.dialects import postgresql
+
+            return postgresql.insert(IssueSearchEntry)
+        from sqlalchemy.dialects import sqlite
+
+        return sqlite.insert(IssueSearchEntry)
+
+    async def upsert_many(
+        self, connection_id: str, documents: list["IssueDocument"]
+    ) -> None:
+        """Insert or update search documents for a connection.
+
+        Existing entries only get the fields present in a document (not
+        None); new entries get empty text for the missing ones.
+        """
+        if not documents:
+            return
+        columns = ("issue_id", "summary", "description", "comments", "updated")
+        # Documents with the same fields present share one upsert statement
+        groups: dict[tuple[str, ...], dict[str, dict[str, Any]]] = {}
+        for doc in documents:
+            present = tuple(c for c in columns if getattr(doc, c) is not None)
+            for rows in groups.values():
+                rows.pop(doc.issue_key, None)
+            groups.setdefault(present, {})[doc.issue_key] = {
+                "connection_id": connection_id,
+                "issue_key": doc.issue_key,
+                "issue_id": doc.issue_id,
+                "summary": doc.summary or "",
+                "description": doc.description or "",
+                "comments": doc.comments or "",
+                "updated": doc.updated,
+            }
+        for present, rows in groups.items():
+            values = list(rows.values())
+            # Chunk to stay well below the bound-parameter limits of both drivers
+            for start in range(0, len(values), 500):
+                stmt = self._insert().values(values[start : start + 500])
+                if present:
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=["connection_id", "issue_key"],
+                        set_={c: getattr(stmt.excluded, c) for c in present},
+                    )
+                else:
+                    stmt = stmt.on_conflict_do_nothing(
+                        index_elements=["connection_id", "issue_key"]
+                    )
+                await self.session.execute(stmt)
+        await self.session.commit()
+
+    async def set_comments(
+        self, connection_id: str, issue_key: str, comments: str
+    ) -> None:
+        """Replace the comment text of an issue, creating the entry if needed."""
+        stmt = self._insert().values(
+            connection_id=connection_id,
+            issue_key=issue_key,
+            summary="",
+            description="",
+            comments=comments,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["connection_id", "issue_key"],
+            set_={"comments": stmt.excluded.comments},
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
+
+    async def delete(self, connection_id: str, issue_key: str) -> None:
+        """Remove an issue from the index."""
+        result = await self.session.execute(
+            select(IssueSearchEntry).where(
+                IssueSearchEntry.connection_id == connection_id,
+                IssueSearchEntry.issue_key == issue_key,
+            )
+        )
+        entry = result.scalar_one_or_none()
+        if entry is not None:
+            await self.session.delete(entry)
+            await self.session.commit()
+
+    async def count(self, connection_id: str) -> int:
+        """Count indexed issues for a connection."""
+        result = await self.session.execute(
+            select(func.count())
+            .select_from(IssueSearchEntry)
+            .where(IssueSearchEntry.connection_id == connection_id)
+        )
+        return result.scalar_one()
+
+    async def search(
+        self,
+        connection_id: str,
+        query: str,
+        scope: Literal["text", "summary"] = "text",
+        limit: int = 50,
+        offset: int = 0,
+    ) -> tuple[int, list[IssueSearchHit]]:
+        """Run a ranked full-text search, returning (total, page of hits).
+
+        The last query term is matched as a prefix so the endpoint can be
+        used for search-as-you-type.
+        """
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return 0, []
+        if self._dialect == "postgresql":
+            return await self._search_postgresql(
+                connection_id, terms, scope, limit, offset
+            )
+        return await self._search_sqlite(connection_id, terms, scope, limit, offset)
+
+    async def _search_sqlite(
+        self,
+        connection_id: str,
+        terms: list[str],
+        scope: str,
+        limit: int,
+        offset: int,
+    ) -> tuple[int, list[IssueSearchHit]]:
+        """Search using the FTS5 table with bm25 ranking."""
+        match = " ".join(f'"{t}"' for t in terms[:-1])
+        match = f'{match} "{terms[-1]}"*'.strip()
+        if scope == "summary":
+            match = f"summary : ({match})"
+        params = {"match": match, "connection_id": connection_id}
+        where = """
+FROM issue_search_fts
+JOIN issue_search_entries e ON e.id = issue_search_fts.rowid
+WHERE issue_search_fts MATCH :match AND e.connection_id = :connection_id
+"""
+        total = (
+            await self.session.execute(text(f"SELECT count(*) {where}"), params)
+        ).scalar_one()
+        if total == 0:
+            return 0, []
+        rows = await self.session.execute(
+            text(
+                "SELECT e.issue_key, e.issue_id, e.summary, e.updated, "
+                "-bm25(issue_search_fts, 10.0, 4.0, 1.0) AS score "
+                f"{where} ORDER BY score DESC LIMIT :limit OFFSET :offset"
+            ),
+            {**params, "limit": limit, "offset": offset},
+        )
+        return total, [IssueSearchHit(*row) for row in rows]
+
+    async def _search_postgresql(
+        self,
+        connection_id: str,
+        terms: list[str],
+        scope: str,
+        limit: int,
+        offset: int,
+    ) -> tuple[int, list[IssueSearchHit]]:
+        """Search using the weighted tsvector GIN index with ts_rank."""
+        weights = "A" if scope == "summary" else ""
+        tsquery = " & ".join(
+            [f"{t}:{weights}" if weights else t for t in terms[:-1]]
+            + [f"{terms[-1]}:*{weights}"]
+        )
+        params = {"tsquery": tsquery.lower(), "connection_id": connection_id}
+        where = f"""
+FROM issue_search_entries
+WHERE connection_id = :connection_id
+  AND ({PG_DOCUMENT_EXPRESSION}) @@ to_tsquery('simple', :tsquery)
+"""
+        total = (
+            await self.session.execute(text(f"SELECT count(*) {where}"), params)
+        ).scalar_one()
+        if total == 0:
+            return 0, []
+        rows = await self.session.execute(
+            text(
+                "SELECT issue_key, issue_id, summary, updated, "
+                f"ts_rank(({PG_DOCUMENT_EXPRESSION}), "
+                "to_tsquery('simple', :tsquery)) AS score "
+                f"{where} ORDER BY score DESC LIMIT :limit OFFSET :offset"
+            ),
+            {**params, "limit": limit, "offset": offset},
+        )
+        return total, [IssueSearchHit(*row) for row in rows]
+
+
+class OutboxRepository:
+    """Repository for queued outbox operations."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def enqueue(
+        self, user_id: str, connection_id: str, items: list[dict[str, Any]]
+    ) -> list[OutboxOperation]:
+        """Queue operations in order, skipping already uploaded client op IDs.
+
+        Returns the operations in upload order; re-uploaded ones are returned
+        as they are, so clients can retry an upload safely. If a concurrent
+        upload queues one of the client op IDs first, the upload is retried
+        once against the now existing operations; raises ``IntegrityError``
+        if that conflicts again.
+        """
+        try:
+            return await self._enqueue(user_id, connection_id, items)
+        except IntegrityError:
+            await self.session.rollback()
+            return await self._enqueue(user_id, connection_id, items)
+
+    async def _existing_client_ops(
+        self, connection_id: str, client_ids: list[str]
+    ) -> dict[str, OutboxOperation]:
+        if not client_ids:
+            return {}
+        result = await self.session.execute(
+            select(OutboxOperation).where(
+                OutboxOperation.connection_id == connection_id,
+                OutboxOperation.client_op_id.in_(client_ids),
+            )
+        )
+        return {op.client_op_id: op for op in result.scalars()}
+
+    async def _enqueue(
+        self, user_id: str, connection_id: str, items: list[dict[str, Any]]
+    ) -> list[OutboxOperation]:
+        client_ids = [i["client_op_id"] for i in items if i.get("client_op_id")]
+        existing = await self._existing_client_ops(connection_id, client_ids)
+
+        operations = []
+        for item in items:
+            op = existing.get(item.get("client_op_id"))
+            if op is None:
+                op = OutboxOperation(
+                    user_id=user_id,
+                    connection_id=connection_id,
+                    client_op_id=item.get("client_op_id"),
+                    entity_key=item["entity_key"],
+                    kind=item["kind"],
+                    payload=item["payload"],
+                )
+                self.session.add(op)
+                if op.client_op_id:
+                    existing[op.client_op_id] = op
+            operations.append(op)
+        await self.session.commit()
+        return operations
+
+    async def get(self, connection_id: str, op_id: int) -> OutboxOperation | None:
+        """Get an operation of a connection by ID."""
+        result = await self.session.execute(
+            select(OutboxOperation).where(
+                OutboxOperation.connection_id == connection_id,
+                OutboxOperation.id == op_id,
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def list_for_connection(
+        self,
+        connection_id: str,
+        ids: list[int] | None = None,
+        status: str | None = None,
+        after_id: int = 0,
+        limit: int = 500,
+    ) -> list[OutboxOperation]:
+        """List operations of a connection in queue order."""
+        query = select(OutboxOperation).where(
+            OutboxOperation.connection_id == connection_id,
+            OutboxOperation.id > after_id,
+        )
+        if ids:
+            query = query.where(OutboxOperation.id.in_(ids))
+        if status:
+            query = query.where(OutboxOperation.status == status)
+        result = await self.session.execute(
+            query.order_by(OutboxOperation.id).limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def delete(self, operation: OutboxOperation) -> None:
+        """Delete (cancel or acknowledge) an operation."""
+        await self.session.delete(operation)
+        await self.session.commit()
+
+    async def claim_ready(
+        self,
+        now: datetime,
+        lease_until: datetime,
+        limit: int,
+        exclude_connections: set[str] | None = None,
+    ) -> list[OutboxOperation]:
+        """Claim runnable operations for this worker.
+
+        Only the oldest unfinished operation of each issue is eligible, which
+        keeps per-issue ordering while different issues run concurrently.
+        Operations whose worker lease expired (e.g. the worker died) are
+        eligible again. Each claim is a conditional UPDATE, so concurrent
+        workers never run the same operation twice.
+        """
+        heads = (
+            select(func.min(OutboxOperation.id))
+            .where(OutboxOperation.status.in_(("pending", "running")))
+            .group_by(OutboxOperation.connection_id, OutboxOperation.entity_key)
+        )
+        ready = or_(
+            and_(
+                OutboxOperation.status == "pending",
+                OutboxOperation.next_attempt_at <= now,
+            ),
+            and_(
+                OutboxOperation.status == "running",
+                OutboxOperation.locked_until < now,
+            ),
+        )
+        query = select(OutboxOperation.id).where(OutboxOperation.id.in_(heads), ready)
+        if exclude_connections:
+            query = query.where(
+                OutboxOperation.connection_id.not_in(exclude_connections)
+            )
+        result = await self.session.execute(
+            query.order_by(OutboxOperation.id).limit(limit)
+        )
+        candidates = list(result.scalars().all())
+
+        claimed = []
+        for op_id in candidates:
+            result = await self.session.execute(
+                update(OutboxOperation)
+                .where(OutboxOperation.id == op_id, ready)
+                .values(status="running", locked_until=lease_until, updated_at=now)
+            )
+            if result.rowcount == 1:
+                claimed.append(op_id)
+        await self.session.commit()
+        if not claimed:
+            return []
+
+        result = await self.session.execute(
+            select(OutboxOperation)
+            .where(OutboxOperation.id.in_(claimed))
+            .order_by(OutboxOperation.id)
+            .execution_options(populate_existing=True)
+        )
+        return list(result.scalars().all())
+
+    async def finish(
+        self,
+        op_id: int,
+        status: Literal["succeeded", "failed"],
+        response_status: int | None,
+        result: Any = None,
+        error: str | None = None,
+        new_entity_key: str | None = None,
+    ) -> None:
+        """Record the final outcome of an operation.
+
+        ``new_entity_key`` points the queued operations on the same issue at
+        the key JIRA assigned to a created issue. When a create fails, the
+        operations queued on its temporary key fail with it instead of each
+        getting a 404 from JIRA. Either happens in the same transaction, so no
+        worker can claim a follow-up in between.
+        """
+        now = datetime.now(timezone.utc)
+        operation = None
+        if status == "failed" or new_entity_key is not None:
+            operation = await self.session.get(OutboxOperation, op_id)
+        if operation is not None:
+            follow_ups = update(OutboxOperation).where(
+                OutboxOperation.connection_id == operation.connection_id,
+                OutboxOperation.entity_key == operation.entity_key,
+                OutboxOperation.status == "pending",
+                OutboxOperation.id != op_id,
+            )
+            if status == "failed" and operation.kind == "create":
+                await self.session.execute(
+                    follow_ups.values(
+                        status="failed",
+                        last_error=f"Depends on failed operation {op_id}",
+                        locked_until=None,
+                        updated_at=now,
+                    )
+                )
+            elif new_entity_key is not None and operation.entity_key != new_entity_key:
+                await self.session.execute(follow_ups.values(entity_key=new_entity_key))
+        await self.session.execute(
+            update(OutboxOperation)
+            .where(OutboxOperation.id == op_id)
+            .values(
+                status=status,
+                attempts=OutboxOperation.attempts + 1,
+                response_status=response_status,
+                result=result,
+                last_error=error,
+                locked_until=None,
+                updated_at=now,
+            )
+        )
+        await self.session.commit()
+
+    async def retry_later(
+        self,
+        op_id: int,
+        at: datetime,
+        response_status: int | None,
+        error: str,
+        count_attempt: bool = True,
+    ) -> None:
+        """Put an operation back in the queue after a retryable failure."""
+        await self.session.execute(
+            update(OutboxOperation)
+            .where(OutboxOperation.id == op_id)
+            .values(
+                status="pending",
+                attempts=OutboxOperation.attempts + (1 if count_attempt else 0),
+                next_attempt_at=at,
+                response_status=response_status,
+                last_error=error,
+                locked_until=None,
+                updated_at=datetime.now(timezone.utc),
+            )
+        )
+        await self.session.commit()
+
+    async def purge_finished(self, before: datetime) -> int:
+        """Delete finished operations last updated before a point in time."""
+        result = await self.session.execute(
+            delete(OutboxOperation).where(
+                OutboxOperation.status.in_(("succeeded", "failed")),
+                OutboxOperation.updated_at < before,
+            )
+        )
+        await self.session.commit()
+        return result.rowcount
@@ -1,20 +1,34 @@
 """FastAPI dependencies for dependency injection."""
 
+import json
+from datetime import datetime
 from typing import Annotated
 
 from fastapi import Depends
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.exceptions import AuthenticationError
+from app.config import get_settings
+from app.core.cache import Cache
+from app.core.exceptions import AuthenticationError, ForbiddenError, NotFoundError
 from app.core.security import decode_access_token
+from app.core.tracing import tracer
 from app.db.database import get_session
-from app.db.repositories import ConnectionRepository, UserRepository
+from app.db.repositories import (
+    ConnectionRepository,
+    IssueSearchRepository,
+    OutboxRepository,
+    UserRepository,
+)
+from app.models.connection import JiraConnection
 from app.models.user import User
 
 # OAuth2 scheme for token extraction
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# Authenticated users, shared across workers to skip a DB lookup per request
+_principal_cache = Cache("principal")
+
 
 # Database session dependency
 async def get_db_session() -> AsyncSession:
@@ -38,29 +52,110 @@ async def get_connection_repository(
     return ConnectionRepository(session)
 
 
+async def get_search_repository(
+    session: Annotated[AsyncSession, Depends(get_db_session)],
+) -> IssueSearchRepository:
+    """Get issue search index repository."""
+    return IssueSearchRepository(session)
+
+
+async def get_outbox_repository(
+    session: Annotated[AsyncSession, Depends(get_db_session)],
+) -> OutboxRepository:
+    """Get outbox repository."""
+    return OutboxRepository(session)
+
+
 # Current user dependency
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
     user_repo: Annotated[UserRepository, Depends(get_user_repository)],
 ) -> User:
     """Get the current authenticated user from JWT token."""
-    payload = decode_access_token(token)
-    if payload is None:
-        raise AuthenticationError()
+    with tracer.span("auth.get_current_user") as span:
+        payload = decode_access_token(token)
+        if payload is None:
+            raise AuthenticationError()
+
+        user_id: str | None = payload.get("sub")
+        if user_id is None:
+            raise AuthenticationError()
 
-    user_id: str | None = payload.get("sub")
-    if user_id is None:
-        raise AuthenticationError()
+        user = await _get_cached_principal(user_id)
+        if span is not None:
+            span.set_attribute("auth.principal_cached", user is not None)
+        if user is None:
+            user = await user_repo.get_by_id(user_id)
+            if user is None:
+                raise AuthenticationError()
+            await _cache_principal(user)
 
-    user = await user_repo.get_by_id(user_id)
-    if user is None:
-        raise AuthenticationError()
+        return user
 
-    return user
+
+async def get_admin_user(
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> User:
+    """Get the current user, who must be listed in admin_usernames."""
+    admins = {name.strip() for name in get_settings().admin_usernames.split(",")}
+    admins.discard("")
+    if current_user.username not in admins:
+        raise ForbiddenError("Admin access required")
+    return current_user
+
+
+async def get_owned_connection(
+    connection_id: str,
+    current_user: Annotated[User, Depends(get_current_user)],
+    connection_repo: Annotated[
+        ConnectionRepository, Depends(get_connection_repository)
+    ],
+) -> JiraConnection:
+    """Get the connection named in the path, which must be the current user's."""
+    connection = await connection_repo.get_by_id(connection_id)
+    if not connection:
+        raise NotFoundError("Connection")
+    if connection.user_id != current_user.id:
+        raise ForbiddenError("Not authorized to use this connection")
+    return connection
+
+
+async def _get_cached_principal(user_id: str) -> User | None:
+    """Rebuild a detached User from the principal cache."""
+    if get_settings().principal_cache_ttl_seconds <= 0:
+        return None
+    raw = await _principal_cache.get(user_id)
+    if raw is None:
+        return None
+    data = json.loads(raw)
+    # The password hash is deliberately never cached
+    return User(
+        id=data["id"],
+        username=data["username"],
+        password_hash="",
+        created_at=datetime.fromisoformat(data["created_at"]),
+    )
+
+
+async def _cache_principal(user: User) -> None:
+    """Store the non-sensitive fields of an authenticated user."""
+    ttl = get_settings().principal_cache_ttl_seconds
+    if ttl <= 0:
+        return
+    data = {
+        "id": user.id,
+        "username": user.username,
+        "created_at": user.created_at.isoformat(),
+    }
+    await _principal_cache.set(user.id, json.dumps(data).encode(), ttl=ttl)
 
 
 # Type aliases for cleaner annotations
 DbSession = Annotated[AsyncSession, Depends(get_db_session)]
 UserRepo = Annotated[UserRepository, Depends(get_user_repository)]
 ConnectionRepo = Annotated[ConnectionRepository, Depends(get_connection_repository)]
+SearchRepo = Annotated[IssueSearchRepository, Depends(get_search_repository)]
+OutboxRepo = Annotated[OutboxRepository, Depends(get_outbox_repository)]
 CurrentUser = Annotated[User, Depends(get_current_user)]
+AdminUser = Annotated[User, Depends(get_admin_user)]
+OwnedConnection = Annotated[JiraConnection, Depends(get_owned_connection)]
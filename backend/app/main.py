@@ -4,15 +4,27 @@ import logging
 import os
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.router import api_router
 from app.config import get_settings
-from app.db.database import close_db, init_db
+from app.core.admission import AdmissionMiddleware
+from app.core.cache import close_cache
+from app.core.deadline import DeadlineMiddleware
+from app.core.disconnect import DisconnectMiddleware
+from app.core.loop_monitor import loop_monitor
+from app.core.metrics import registry
+from app.core.profiler import ProfilingMiddleware
+from app.core.startup import startup_report
+from app.core.tracing import TracingMiddleware, tracer
+from app.db.database import QueryStatsMiddleware, close_db, init_db
 from app.db.repositories import ConnectionRepository, UserRepository
 from app.services.demo_init import initialize_demo_data
 from app.services.mock_jira import mock_jira_router
+from app.services.outbox import outbox_worker
+from app.services.prewarm import prewarm_scheduler
+from app.services.relay_service import relay_service
 
 # Configure logging to show all levels
 logging.basicConfig(level=logging.WARNING)
@@ -22,19 +34,38 @@ logging.basicConfig(level=logging.WARNING)
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     # Startup
-    await init_db()
+    with startup_report.step("init_db"):
+        await init_db()
 
     # Initialize demo data
     from app.db.database import get_session
 
-    async for session in get_session():
-        user_repo = UserRepository(session)
-        conn_repo = ConnectionRepository(session)
-        await initialize_demo_data(user_repo, conn_repo)
-        break
+    with startup_report.step("demo_data"):
+        async for session in get_session():
+            user_repo = UserRepository(session)
+            conn_repo = ConnectionRepository(session)
+            await initialize_demo_data(user_repo, conn_repo)
+            break
+
+    settings = get_settings()
+    with startup_report.step("background_services"):
+        if settings.prewarm_enabled:
+            prewarm_scheduler.start()
+        if settings.outbox_enabled:
+            outbox_worker.start()
+        tracer.start()
+        if settings.loop_monitor_enabled:
+            loop_monitor.start()
+    startup_report.ready()
 
     yield
     # Shutdown
+    await loop_monitor.stop()
+    await outbox_worker.stop()
+    await prewarm_scheduler.stop()
+    await relay_service.aclose()
+    await tracer.stop()
+    await close_cache()
     await close_db()
 
 
@@ -61,6 +92,17 @@ def create_app() -> FastAPI:
     extra_origins = os.getenv("CORS_ORIGINS", "").split(",")
     cors_origins.extend([o.strip() for o in extra_origins if o.strip()])
 
+    # Innermost: the deadline and disconnect middlewares run the app in new
+    # tasks, and request profiles only keep stacks under this middleware
+    app.add_middleware(ProfilingMiddleware)
+    # Deadlines sit inside CORS so 504s still carry CORS headers
+    app.add_middleware(DisconnectMiddleware)
+    app.add_middleware(DeadlineMiddleware)
+    # Shed load before any other work is done for a request
+    app.add_middleware(AdmissionMiddleware, scheduler=relay_service.scheduler)
+    app.add_middleware(QueryStatsMiddleware)
+    # The request span covers everything inside CORS, shed requests included
+    app.add_middleware(TracingMiddleware)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=cors_origins,
@@ -88,11 +130,18 @@ def create_app() -> FastAPI:
     async def health_check():
         return {"status": "healthy"}
 
+    if settings.metrics_enabled:
+
+        @app.get("/metrics", include_in_schema=False)
+        async def metrics():
+            return Response(registry.render(), media_type="text/plain; version=0.0.4")
+
     return app
 
 
 # Create the app instance
 app = create_app()
+startup_report.imported()
 
 
 if __name__ == "__main__":
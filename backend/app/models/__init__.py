@@ -1,21 +1,37 @@
 # SQLAlchemy and Pydantic models
 from app.models.connection import JiraConnection
+from app.models.outbox import OutboxOperation
 from app.models.schemas import (
     ErrorResponse,
+    IssueIndexRequest,
+    IssueIndexResponse,
+    IssueSearchHit,
+    IssueSearchResponse,
     JiraConnectionCreate,
     JiraConnectionResponse,
     JiraConnectionUpdate,
+    OutboxOperationCreate,
+    OutboxOperationList,
+    OutboxOperationResponse,
+    OutboxUploadRequest,
+    RelayBatchItem,
+    RelayBatchRequest,
+    RelayBatchResponse,
+    RelayBatchResult,
     Token,
     TokenData,
     UserCreate,
     UserLogin,
     UserResponse,
 )
+from app.models.search_index import IssueSearchEntry
 from app.models.user import User
 
 __all__ = [
     "User",
     "JiraConnection",
+    "IssueSearchEntry",
+    "OutboxOperation",
     "UserCreate",
     "UserLogin",
     "UserResponse",
@@ -24,5 +40,17 @@ __all__ = [
     "JiraConnectionCreate",
     "JiraConnectionUpdate",
     "JiraConnectionResponse",
+    "IssueSearchHit",
+    "IssueSearchResponse",
+    "IssueIndexRequest",
+    "IssueIndexResponse",
+    "OutboxOperationCreate",
+    "OutboxUploadRequest",
+    "OutboxOperationResponse",
+    "OutboxOperationList",
+    "RelayBatchItem",
+    "RelayBatchRequest",
+    "RelayBatchResponse",
+    "RelayBatchResult",
     "ErrorResponse",
 ]
@@ -0,0 +1,76 @@
+"""Server-side outbox of pending local edits waiting to be pushed to JIRA."""
+
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import (
+    JSON,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.database import Base
+
+OUTBOX_KINDS = ("create", "update", "transition", "comment")
+
+
+class OutboxOperation(Base):
+    """A single queued write against a JIRA issue.
+
+    Operations on the same issue (``entity_key``) run strictly in ``id``
+    order; operations on different issues run concurrently. For creates the
+    entity key is the client's temporary key until JIRA assigns a real one.
+    """
+
+    __tablename__ = "outbox_operations"
+    __table_args__ = (
+        UniqueConstraint("connection_id", "client_op_id", name="uq_outbox_client_op"),
+        Index("ix_outbox_ready", "status", "next_attempt_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    connection_id: Mapped[str] = mapped_column(
+        String(36),
+        ForeignKey("jira_connections.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    client_op_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    entity_key: Mapped[str] = mapped_column(String(64), nullable=False)
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    # pending -> running -> succeeded | failed (running goes back to pending
+    # on a retryable error)
+    status: Mapped[str] = mapped_column(String(20), default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+    # Lease of the worker running the operation; expired leases are re-claimed
+    locked_until: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    response_status: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    result: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<OutboxOperation(id={self.id}, kind={self.kind}, "
+            f"key={self.entity_key}, status={self.status})>"
+        )
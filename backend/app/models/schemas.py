@@ -1,6 +1,7 @@
 """Pydantic schemas for request/response validation."""
 
 from datetime import datetime
+from typing import Any, Literal
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -84,6 +85,123 @@ class JiraConnectionResponse(BaseModel):
     created_at: datetime
 
 
+# --- Search Schemas ---
+
+
+class IssueSearchHit(BaseModel):
+    """Schema for a single ranked issue search result."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    key: str = Field(validation_alias="issue_key")
+    id: str | None = Field(default=None, validation_alias="issue_id")
+    summary: str
+    updated: str | None = None
+    score: float
+
+
+class IssueSearchResponse(BaseModel):
+    """Schema for a page of issue search results."""
+
+    query: str
+    total: int
+    offset: int
+    limit: int
+    results: list[IssueSearchHit]
+
+
+class IssueIndexRequest(BaseModel):
+    """Schema for pushing synced issues into the search index."""
+
+    issues: list[dict[str, Any]] = Field(..., max_length=1000)
+
+
+class IssueIndexResponse(BaseModel):
+    """Schema for the result of an index upload."""
+
+    indexed: int
+
+
+# --- Relay Batch Schemas ---
+
+
+class RelayBatchItem(BaseModel):
+    """Schema for one sub-request of a relay batch."""
+
+    id: str | None = None
+    method: Literal["GET", "POST", "PUT", "DELETE", "PATCH"] = "GET"
+    path: str = Field(..., description="JIRA API path, e.g. /rest/api/3/issue/T-1")
+    query: dict[str, str] | None = None
+    body: Any | None = None
+
+
+class RelayBatchRequest(BaseModel):
+    """Schema for a batch of relay sub-requests."""
+
+    requests: list[RelayBatchItem] = Field(..., min_length=1)
+
+
+class RelayBatchResult(BaseModel):
+    """Schema for the outcome of one sub-request."""
+
+    id: str | None = None
+    status: int
+    headers: dict[str, str] = {}
+    body: Any | None = None
+
+
+class RelayBatchResponse(BaseModel):
+    """Schema for batch results, in request order."""
+
+    results: list[RelayBatchResult]
+
+
+# --- Outbox Schemas ---
+
+
+class OutboxOperationCreate(BaseModel):
+    """Schema for one pending local edit uploaded to the outbox."""
+
+    client_op_id: str | None = Field(default=None, max_length=64)
+    kind: Literal["create", "update", "transition", "comment"]
+    # Issue key, or the client's temporary key for creates
+    issue_key: str = Field(
+        ..., min_length=1, max_length=64, pattern=r"^[A-Za-z0-9_.-]+$"
+    )
+    payload: dict[str, Any]
+
+
+class OutboxUploadRequest(BaseModel):
+    """Schema for uploading a batch of pending operations."""
+
+    operations: list[OutboxOperationCreate] = Field(..., min_length=1, max_length=500)
+
+
+class OutboxOperationResponse(BaseModel):
+    """Schema for the state of a queued operation."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    client_op_id: str | None
+    kind: str
+    issue_key: str = Field(validation_alias="entity_key")
+    status: str
+    attempts: int
+    next_attempt_at: datetime
+    response_status: int | None
+    result: Any | None
+    last_error: str | None
+    created_at: datetime
+    updated_at: datetime
+
+
+class OutboxOperationList(BaseModel):
+    """Schema for a list of queued operations."""
+
+    operations: list[OutboxOperationResponse]
+
+
 # --- Error Schemas ---
 
 
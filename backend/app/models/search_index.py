@@ -0,0 +1,112 @@
+"""Full-text search index model for issues seen through the relay or sync."""
+
+from sqlalchemy import DDL, ForeignKey, Integer, String, Text, UniqueConstraint, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.database import Base
+
+
+class IssueSearchEntry(Base):
+    """Searchable text of a single issue, scoped to a JIRA connection.
+
+    The rows hold plain text only. The actual full-text index lives next to
+    the table and is dialect specific: an external-content FTS5 table kept in
+    sync by triggers on SQLite, and a GIN expression index on PostgreSQL.
+    """
+
+    __tablename__ = "issue_search_entries"
+    __table_args__ = (
+        UniqueConstraint("connection_id", "issue_key", name="uq_issue_search_key"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    connection_id: Mapped[str] = mapped_column(
+        String(36),
+        ForeignKey("jira_connections.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    issue_key: Mapped[str] = mapped_column(String(64), nullable=False)
+    issue_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    summary: Mapped[str] = mapped_column(Text, default="")
+    description: Mapped[str] = mapped_column(Text, default="")
+    comments: Mapped[str] = mapped_column(Text, default="")
+    updated: Mapped[str | None] = mapped_column(String(40), nullable=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"<IssueSearchEntry(connection_id={self.connection_id}, "
+            f"key={self.issue_key})>"
+        )
+
+
+# Weighted document expression shared by the PostgreSQL index and queries.
+# Summary matches rank above description matches, which rank above comments.
+PG_DOCUMENT_EXPRESSION = (
+    "setweight(to_tsvector('simple', coalesce(summary, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(comments, '')), 'C')"
+)
+
+_SQLITE_DDL = [
+    """
+CREATE VIRTUAL TABLE IF NOT EXISTS issue_search_fts USING fts5(
+    summary,
+    description,
+    comments,
+    content='issue_search_entries',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+)
+""",
+    """
+CREATE TRIGGER IF NOT EXISTS issue_search_entries_ai
+AFTER INSERT ON issue_search_entries BEGIN
+    INSERT INTO issue_search_fts(rowid, summary, description, comments)
+    VALUES (new.id, new.summary, new.description, new.comments);
+END
+""",
+    """
+CREATE TRIGGER IF NOT EXISTS issue_search_entries_ad
+AFTER DELETE ON issue_search_entries BEGIN
+    INSERT INTO issue_search_fts(issue_search_fts, rowid, summary, description, comments)
+    VALUES ('delete', old.id, old.summary, old.description, old.comments);
+END
+""",  # noqa: E501
+    """
+CREATE TRIGGER IF NOT EXISTS issue_search_entries_au
+AFTER UPDATE ON issue_search_entries BEGIN
+    INSERT INTO issue_search_fts(issue_search_fts, rowid, summary, description, comments)
+    VALUES ('delete', old.id, old.summary, old.description, old.comments);
+    INSERT INTO issue_search_fts(rowid, summary, description, comments)
+    VALUES (new.id, new.summary, new.description, new.comments);
+END
+""",  # noqa: E501
+]
+
+_POSTGRES_DDL = [
+    f"""
+CREATE INDEX IF NOT EXISTS ix_issue_search_entries_document
+ON issue_search_entries USING GIN (({PG_DOCUMENT_EXPRESSION}))
+""",
+]
+
+for _statement in _SQLITE_DDL:
+    event.listen(
+        IssueSearchEntry.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="sqlite"),
+    )
+for _statement in _POSTGRES_DDL:
+    event.listen(
+        IssueSearchEntry.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="postgresql"),
+    )
+
+# The FTS5 shadow table is not owned by SQLAlchemy, so drop it explicitly
+event.listen(
+    IssueSearchEntry.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS issue_search_fts").execute_if(dialect="sqlite"),
+)
@@ -0,0 +1,265 @@
+"""Content-addressed on-disk cache for attachments and avatars.
+
+Blobs are stored once per SHA-256 digest under ``blobs/``; lookup keys
+(connection + upstream path) map to a digest through small JSON files under
+``keys/``. The directory is shared by all workers on a host. Eviction is
+least-recently-used by file mtime, which is bumped on every hit.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Evict down to this fraction of the budget to avoid evicting on every write
+_LOW_WATERMARK = 0.9
+
+# Streamed chunks are buffered and handed to a worker thread in batches
+_FLUSH_BYTES = 256 * 1024
+
+
+@dataclass
+class CachedBlob:
+    """A cache hit, ready to be served from disk."""
+
+    path: Path
+    content_type: str
+    size: int
+    content_disposition: str | None = None
+
+
+class BlobWriter:
+    """Incrementally writes a blob to a temp file while hashing it.
+
+    Chunks are buffered and written (and hashed) in a worker thread, so
+    streaming a large attachment does not block the event loop.
+    """
+
+    def __init__(
+        self,
+        cache: "BlobCache",
+        key: str,
+        content_type: str,
+        content_disposition: str | None,
+    ):
+        self._cache = cache
+        self._key = key
+        self._content_type = content_type
+        self._content_disposition = content_disposition
+        self._hash = hashlib.sha256()
+        self._tmp_path = cache.root / "tmp" / uuid.uuid4().hex
+        self._file = None
+        self._buffer = bytearray()
+        self.size = 0
+        self.aborted = False
+
+    async def write(self, chunk: bytes) -> None:
+        """Append a chunk, giving up on caching if the blob grows too large."""
+        if self.aborted:
+            return
+        self.size += len(chunk)
+        if self.size > self._cache.max_item_bytes:
+            await self.abort()
+            return
+        self._buffer += chunk
+        if len(self._buffer) >= _FLUSH_BYTES:
+            data, self._buffer = self._buffer, bytearray()
+            await asyncio.to_thread(self._write_file, data)
+
+    async def commit(self) -> CachedBlob | None:
+        """Move the finished blob into place and record the key mapping."""
+        if self.aborted:
+            return None
+        data, self._buffer = self._buffer, bytearray()
+        return await asyncio.to_thread(self._finish, data)
+
+    async def abort(self) -> None:
+        """Discard the partially written blob."""
+        if self.aborted:
+            return
+        self.aborted = True
+        self._buffer = bytearray()
+        await asyncio.to_thread(self._discard)
+
+    def _write_file(self, data: bytes | bytearray) -> None:
+        if self._file is None:
+            self._tmp_path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self._tmp_path, "wb")
+        self._hash.update(data)
+        self._file.write(data)
+
+    def _finish(self, data: bytes | bytearray) -> CachedBlob:
+        """Write the rest and publish the blob (runs in a worker thread)."""
+        self._write_file(data)
+        self._file.close()
+        return self._cache._store(
+            self._key,
+            self._tmp_path,
+            self._hash.hexdigest(),
+            self.size,
+            self._content_type,
+            self._content_disposition,
+        )
+
+    def _discard(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._tmp_path.unlink(missing_ok=True)
+
+
+class BlobCache:
+    """Size-bounded, content-addressed blob cache on local disk."""
+
+    def __init__(self, root: Path, max_bytes: int, max_item_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes
+        self._total_bytes: int | None = None
+
+    def _key_path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return self.root / "keys" / digest[:2] / f"{digest}.json"
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / "blobs" / digest[:2] / digest
+
+    async def lookup(self, key: str, max_age: float | None = None) -> CachedBlob | None:
+        """Find a cached blob for a key, optionally rejecting stale entries."""
+        return await asyncio.to_thread(self._lookup, key, max_age)
+
+    def _lookup(self, key: str, max_age: float | None) -> CachedBlob | None:
+        key_path = self._key_path(key)
+        try:
+            meta = json.loads(key_path.read_text())
+        except (OSError, ValueError):
+            return None
+
+        if max_age is not None and time.time() - meta.get("stored_at", 0) > max_age:
+            return None
+
+        blob_path = self._blob_path(meta["digest"])
+        try:
+            # Bump mtime so LRU eviction keeps recently served blobs
+            os.utime(blob_path)
+        except FileNotFoundError:
+            # Blob was evicted; drop the dangling key
+            key_path.unlink(missing_ok=True)
+            return None
+
+        return CachedBlob(
+            path=blob_path,
+            content_type=meta.get("content_type", "application/octet-stream"),
+            size=meta.get("size", 0),
+            content_disposition=meta.get("content_disposition"),
+        )
+
+    def open_writer(
+        self,
+        key: str,
+        content_type: str,
+        content_disposition: str | None = None,
+    ) -> BlobWriter:
+        """Start writing a new blob for a key."""
+        return BlobWriter(self, key, content_type, content_disposition)
+
+    def _store(
+        self,
+        key: str,
+        tmp_path: Path,
+        digest: str,
+        size: int,
+        content_type: str,
+        content_disposition: str | None,
+    ) -> CachedBlob:
+        """Publish a finished temp file (runs in a worker thread)."""
+        blob_path = self._blob_path(digest)
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        if blob_path.exists():
+            # Identical content already cached under another key
+            tmp_path.unlink(missing_ok=True)
+            os.utime(blob_path)
+        else:
+            os.replace(tmp_path, blob_path)
+            self._total_bytes = self._current_total() + size
+
+        key_path = self._key_path(key)
+        key_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_key = key_path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        tmp_key.write_text(
+            json.dumps(
+                {
+                    "digest": digest,
+                    "size": size,
+                    "content_type": content_type,
+                    "content_disposition": content_disposition,
+                    "stored_at": time.time(),
+                }
+            )
+        )
+        os.replace(tmp_key, key_path)
+
+        if self._current_total() > self.max_bytes:
+            self._evict()
+
+        return CachedBlob(blob_path, content_type, size, content_disposition)
+
+    def _current_total(self) -> int:
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, _, size in self._scan_blobs())
+        return self._total_bytes
+
+    def _scan_blobs(self) -> list[tuple[float, Path, int]]:
+        """List (mtime, path, size) for every stored blob."""
+        blobs = []
+        blobs_root = self.root / "blobs"
+        if not blobs_root.exists():
+            return blobs
+        for entry in blobs_root.glob("*/*"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            blobs.append((stat.st_mtime, entry, stat.st_size))
+        return blobs
+
+    def _evict(self) -> None:
+        """Delete least recently used blobs until under the low watermark.
+
+        Rescans the directory so the total also accounts for blobs written
+        by other workers since the last scan.
+        """
+        blobs = sorted(self._scan_blobs())
+        total = sum(size for _, _, size in blobs)
+        target = self.max_bytes * _LOW_WATERMARK
+        evicted = 0
+        for _, path, size in blobs:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+        self._total_bytes = total
+        if evicted:
+            logger.info(f"[BlobCache] Evicted {evicted} blobs, {total} bytes remain")
+
+
+def _create_blob_cache() -> BlobCache:
+    settings = get_settings()
+    return BlobCache(
+        root=settings.blob_cache_dir,
+        max_bytes=settings.blob_cache_max_bytes,
+        max_item_bytes=settings.blob_cache_max_item_bytes,
+    )
+
+
+# Singleton instance
+blob_cache = _create_blob_cache()
@@ -235,11 +235,7 @@ def _seed_demo_issues() -> None:
 
     # Clear existing issues and seed with demo data
     _issues.clear()
-    for issue in demo_issues:
-        key = issue["key"]
-        issue_id = issue["id"]
-        _issues[key] = issue
-        _issues[issue_id] = issue
+    _issues.add_many(demo_issues)
 
     logger.info(f"Seeded {len(demo_issues)} demo issues into mock JIRA")
 
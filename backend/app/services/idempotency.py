@@ -0,0 +1,218 @@
+"""Idempotency-Key support for mutating relay requests.
+
+The first response for a (user, key) pair is stored in the shared cache and
+replayed for retries, so a client retrying ``POST /issue`` after a timeout
+does not create a duplicate issue. While the first request is in flight, a
+short-lived lock entry makes duplicates wait for its result instead of
+executing upstream again: within a worker they await the same future, other
+workers poll the shared cache.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from fastapi import HTTPException, Response
+
+from app.config import get_settings
+from app.core.cache import Cache
+
+# Longest accepted Idempotency-Key header value
+MAX_KEY_LENGTH = 255
+
+# Added to the longest request deadline for the in-flight lock TTL; the lock
+# expires after that so a crashed worker can't block a key forever
+_LOCK_MARGIN_SECONDS = 10.0
+
+# How often duplicates in other workers check for the first result
+_POLL_INTERVAL_SECONDS = 0.1
+
+# Larger responses are not stored; retries of those execute again
+_MAX_STORED_BODY_BYTES = 1024 * 1024
+
+# Headers recomputed for every response, never replayed
+_SKIP_HEADERS = {"content-length", "transfer-encoding", "connection", "server-timing"}
+
+
+def request_fingerprint(method: str, path: str, query: str, body: bytes) -> str:
+    """Identify a request so a key reused for a different request is caught."""
+    digest = hashlib.sha256()
+    for part in (method.upper().encode(), path.encode(), query.encode(), body):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+@dataclass
+class StoredResponse:
+    """A response recorded for an idempotency key."""
+
+    fingerprint: str
+    status_code: int
+    headers: dict[str, str]
+    body: bytes
+
+    def to_response(self) -> Response:
+        """Build the replayed HTTP response."""
+        return Response(
+            content=self.body,
+            status_code=self.status_code,
+            headers={**self.headers, "Idempotent-Replayed": "true"},
+        )
+
+
+@dataclass
+class Reservation:
+    """Outcome of reserving a key: either a response to replay, or ownership.
+
+    The owner executes the request and calls :meth:`save`; if it doesn't
+    (e.g. the request raised), a retry with the same key runs again.
+    """
+
+    store: "IdempotencyStore"
+    scope: str
+    fingerprint: str
+    replay: StoredResponse | None = None
+
+    async def save(self, response: Response) -> None:
+        """Store the owner's response for replay.
+
+        Only final outcomes (2xx and 4xx) are stored: a redirect or 5xx is
+        not the result of the request, so a retry executes it again.
+        """
+        body = bytes(response.body)
+        final = 200 <= response.status_code < 300 or 400 <= response.status_code < 500
+        if not final or len(body) > _MAX_STORED_BODY_BYTES:
+            return
+        headers = {
+            key: value
+            for key, value in response.headers.items()
+            if key.lower() not in _SKIP_HEADERS
+        }
+        await self.store._save(
+            self.scope,
+            StoredResponse(self.fingerprint, response.status_code, headers, body),
+        )
+
+
+class IdempotencyStore:
+    """Bounded, TTL-limited store of first responses per (user, key)."""
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        responses: Cache | None = None,
+        locks: Cache | None = None,
+        lock_ttl_seconds: float | None = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        # An in-flight request can't outlive the longest request deadline
+        self.lock_ttl_seconds = lock_ttl_seconds or (
+            get_settings().request_max_timeout_seconds + _LOCK_MARGIN_SECONDS
+        )
+        self._responses = responses or Cache("idempotency")
+        self._locks = locks or Cache("idempotency-lock")
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    @asynccontextmanager
+    async def reserve(
+        self, user_id: str, key: str, fingerprint: str
+    ) -> AsyncIterator[Reservation]:
+        """Reserve a key for a request, or get the response to replay.
+
+        Raises:
+            HTTPException: 422 if the key was used for a different request,
+                409 if the first request is still running after the lock TTL
+        """
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters",
+            )
+        scope = f"{user_id}|{key}"
+        reservation = await self._acquire(scope, fingerprint)
+        try:
+            yield reservation
+        finally:
+            if reservation.replay is None:
+                await self._release(scope)
+
+    async def _acquire(self, scope: str, fingerprint: str) -> Reservation:
+        deadline = time.monotonic() + self.lock_ttl_seconds
+        while True:
+            inflight = self._inflight.get(scope)
+            if inflight is not None:
+                # Same worker: wait for the owner instead of polling
+                await asyncio.shield(inflight)
+                continue
+
+            stored = await self._load(scope)
+            if stored is not None:
+                self._check_fingerprint(stored.fingerprint, fingerprint)
+                return Reservation(self, scope, fingerprint, replay=stored)
+
+            if await self._locks.add(
+                scope, fingerprint.encode(), self.lock_ttl_seconds
+            ):
+                self._inflight[scope] = asyncio.get_running_loop().create_future()
+                return Reservation(self, scope, fingerprint)
+
+            # Another worker owns the key
+            lock = await self._locks.get(scope)
+            if lock is not None:
+                self._check_fingerprint(lock.decode(), fingerprint)
+            if time.monotonic() > deadline:
+                raise HTTPException(
+                    status_code=409,
+                    detail="A request with this Idempotency-Key is in progress",
+                )
+            await asyncio.sleep(_POLL_INTERVAL_SECONDS)
+
+    @staticmethod
+    def _check_fingerprint(stored: str, fingerprint: str) -> None:
+        if stored != fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used for a different request",
+            )
+
+    async def _load(self, scope: str) -> StoredResponse | None:
+        raw = await self._responses.get(scope)
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        return StoredResponse(
+            fingerprint=data["fingerprint"],
+            status_code=data["status_code"],
+            headers=data["headers"],
+            body=base64.b64decode(data["body"]),
+        )
+
+    async def _save(self, scope: str, stored: StoredResponse) -> None:
+        raw = json.dumps(
+            {
+                "fingerprint": stored.fingerprint,
+                "status_code": stored.status_code,
+                "headers": stored.headers,
+                "body": base64.b64encode(stored.body).decode(),
+            }
+        )
+        await self._responses.set(scope, raw.encode(), ttl=self.ttl_seconds)
+
+    async def _release(self, scope: str) -> None:
+        """Drop the lock and wake local duplicates (they re-check the store)."""
+        try:
+            await self._locks.delete(scope)
+        finally:
+            future = self._inflight.pop(scope, None)
+            if future is not None and not future.done():
+                future.set_result(None)
+
+
+# Singleton instance
+idempotency_store = IdempotencyStore(ttl_seconds=get_settings().idempotency_ttl_seconds)
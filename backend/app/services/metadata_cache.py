@@ -0,0 +1,111 @@
+"""Short-lived cache for slowly changing JIRA metadata responses.
+
+Fields, statuses, priorities, issue types and similar lookups rarely change
+but are requested on every app start. Successful relay GETs for these paths
+are cached per connection, and the prewarm scheduler refreshes them ahead of
+the first request of the day.
+"""
+
+import base64
+import json
+import re
+from dataclasses import dataclass
+
+from app.config import get_settings
+from app.core.cache import Cache
+
+# Metadata endpoints (relative to /rest/api/{version}/) that are safe to cache
+METADATA_PATHS = (
+    "field",
+    "issuetype",
+    "priority",
+    "resolution",
+    "status",
+    "statuscategory",
+    "issueLinkType",
+    "project",
+    "project/search",
+    "myself",
+    "serverInfo",
+)
+
+_METADATA_PATH = re.compile(
+    r"^/rest/api/\d+/(" + "|".join(re.escape(p) for p in METADATA_PATHS) + r")$"
+)
+
+_API_VERSION = re.compile(r"^/rest/api/\d+/")
+
+
+@dataclass
+class CachedResponse:
+    """A cached upstream response."""
+
+    status_code: int
+    headers: dict[str, str]
+    body: bytes | None
+
+
+class MetadataCache:
+    """Per-connection TTL cache for JIRA metadata responses.
+
+    Entries live in the shared cache backend, so a response fetched (or
+    prewarmed) by one gunicorn worker is served by all of them.
+    """
+
+    def __init__(self, ttl_seconds: float, cache: Cache | None = None):
+        self.ttl_seconds = ttl_seconds
+        self._cache = cache or Cache("metadata")
+
+    @staticmethod
+    def is_cacheable(path: str) -> bool:
+        """Check whether a full relay path is a cacheable metadata endpoint."""
+        return bool(_METADATA_PATH.match(path))
+
+    @staticmethod
+    def _key(connection_id: str, path: str, query: str) -> str:
+        # The relay rewrites the API version to the connection's own version,
+        # so /rest/api/2/field and /rest/api/3/field return the same data
+        path = _API_VERSION.sub("/rest/api/", path, count=1)
+        return f"{connection_id}|{path}|{query}"
+
+    async def get(
+        self, connection_id: str, path: str, query: str = ""
+    ) -> CachedResponse | None:
+        """Get a fresh cached response, if any."""
+        raw = await self._cache.get(self._key(connection_id, path, query))
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        body = base64.b64decode(entry["body"]) if entry["body"] is not None else None
+        return CachedResponse(entry["status_code"], entry["headers"], body)
+
+    async def put(
+        self,
+        connection_id: str,
+        path: str,
+        query: str,
+        status_code: int,
+        headers: dict[str, str],
+        body: bytes | None,
+    ) -> None:
+        """Store a successful response."""
+        if status_code != 200:
+            return
+        raw = json.dumps(
+            {
+                "status_code": status_code,
+                "headers": headers,
+                "body": base64.b64encode(body).decode() if body is not None else None,
+            }
+        )
+        await self._cache.set(
+            self._key(connection_id, path, query), raw.encode(), ttl=self.ttl_seconds
+        )
+
+    async def invalidate_connection(self, connection_id: str) -> None:
+        """Drop every entry of a connection (e.g. after its settings change)."""
+        await self._cache.delete_prefix(f"{connection_id}|")
+
+
+# Singleton instance
+metadata_cache = MetadataCache(ttl_seconds=get_settings().metadata_cache_ttl_seconds)
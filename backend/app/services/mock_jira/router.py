@@ -13,6 +13,7 @@ from app.services.mock_jira.models import (
     CommentCreate,
     TransitionRequest,
 )
+from app.services.mock_jira.store import IssueStore
 
 logger = logging.getLogger(__name__)
 
@@ -27,14 +28,15 @@ def _now_iso() -> str:
 router = APIRouter(tags=["mock-jira"])
 
 # In-memory storage
-_issues: dict[str, dict[str, Any]] = {}
+_issues = IssueStore()
 
 
 def _get_issue(issue_id_or_key: str) -> dict[str, Any]:
     """Get an issue by ID or key, raising 404 if not found."""
-    if issue_id_or_key not in _issues:
+    issue = _issues.get(issue_id_or_key)
+    if issue is None:
         raise HTTPException(status_code=404, detail="Issue not found")
-    return _issues[issue_id_or_key]
+    return issue
 
 
 # Create routes for both API versions
@@ -59,8 +61,8 @@ async def create_issue(request: Request) -> dict[str, Any]:
         issuetype = fields.get("issuetype", {"name": "Task"})
         project = fields.get("project", {"key": "TEST"})
 
-        key = f"TEST-{len(_issues) // 2 + 1}"
-        issue_id = str(len(_issues) // 2 + 1)
+        key = f"TEST-{len(_issues) + 1}"
+        issue_id = str(len(_issues) + 1)
         now = _now_iso()
 
         new_issue = {
@@ -92,9 +94,7 @@ async def create_issue(request: Request) -> dict[str, Any]:
             },
         }
 
-        # Store by both key and ID for lookup flexibility
-        _issues[key] = new_issue
-        _issues[issue_id] = new_issue
+        _issues.add(new_issue)
 
         return new_issue
     except json.JSONDecodeError:
@@ -131,12 +131,13 @@ async def update_issue(issue_id_or_key: str, request: Request) -> Response:
 
             if "fields" in update:
                 fields = update["fields"]
+                changes: dict[str, Any] = {}
                 if fields.get("summary"):
-                    issue["fields"]["summary"] = fields["summary"]
+                    changes["summary"] = fields["summary"]
                 if fields.get("description") is not None:
-                    issue["fields"]["description"] = fields["description"]
+                    changes["description"] = fields["description"]
                 # Update the timestamp to enable conflict detection
-                issue["fields"]["updated"] = _now_iso()
+                _issues.update_fields(issue, **changes, updated=_now_iso())
                 logger.info(f"[MockJIRA] Updated issue {issue_id_or_key}")
     except json.JSONDecodeError as e:
         logger.error(f"[MockJIRA] JSON decode error: {e}")
@@ -188,7 +189,7 @@ async def add_comment(issue_id_or_key: str, comment: CommentCreate) -> dict[str,
     issue["fields"]["comment"]["comments"].append(new_comment)
     issue["fields"]["comment"]["total"] = len(issue["fields"]["comment"]["comments"])
     # Update issue timestamp when comment is added
-    issue["fields"]["updated"] = now
+    _issues.update_fields(issue, updated=now)
 
     logger.info(f"[MockJIRA] Added comment {new_comment['id']} to {issue_id_or_key}")
     return new_comment
@@ -213,9 +214,8 @@ async def transition_issue(
     if not target_status:
         raise HTTPException(status_code=400, detail="Invalid transition ID")
 
-    issue["fields"]["status"] = target_status
     # Update timestamp on status change
-    issue["fields"]["updated"] = _now_iso()
+    _issues.update_fields(issue, status=target_status, updated=_now_iso())
     return Response(status_code=204)
 
 
@@ -235,36 +235,27 @@ async def search_issues(
     fields: str | None = None,
     nextPageToken: str | None = None,
 ) -> dict[str, Any]:
-    """Search for issues using JQL (simplified implementation)."""
-    # Get unique issues (since we store by both key and id)
-    seen_ids = set()
-    unique_issues = []
-    for issue in _issues.values():
-        if issue["id"] not in seen_ids:
-            seen_ids.add(issue["id"])
-            unique_issues.append(issue)
-
-    # Sort by updated timestamp (descending by default, but JQL can override)
-    if "order by" in jql.lower():
-        if "asc" in jql.lower():
-            unique_issues.sort(
-                key=lambda x: x["fields"].get("updated", ""), reverse=False
-            )
-        else:
-            unique_issues.sort(
-                key=lambda x: x["fields"].get("updated", ""), reverse=True
-            )
-
-    # Simple pagination (no actual nextPageToken implementation for mock)
-    total = len(unique_issues)
-    issues = unique_issues[:maxResults]
-
-    return {
-        "startAt": 0,
+    """Search for issues using JQL (simplified implementation).
+
+    Filters on status, project, assignee, labels and updated, and orders by
+    updated; see ``IssueStore.search``. ``nextPageToken`` is an offset.
+    """
+    try:
+        offset = int(nextPageToken or 0)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid nextPageToken")
+    issues, total = _issues.search(jql, limit=maxResults, offset=offset)
+
+    result: dict[str, Any] = {
+        "startAt": offset,
         "maxResults": maxResults,
         "total": total,
         "issues": issues,
+        "isLast": not issues or offset + len(issues) >= total,
     }
+    if not result["isLast"]:
+        result["nextPageToken"] = str(offset + len(issues))
+    return result
 
 
 def reset_storage() -> None:
@@ -0,0 +1,284 @@
+"""Indexed in-memory issue store for the mock JIRA server.
+
+Issues are kept once, by id, with a key to id map and secondary indexes on
+status, project, assignee and labels (sets of ids per lowercased value) plus
+a list of ``(updated, id)`` pairs kept sorted for ordering and date ranges.
+A search intersects the smallest index sets first and walks the sorted index
+only as far as the requested page, so it does not scan the whole store.
+Without ``ORDER BY updated``, issues come least recently updated first.
+
+The indexes only stay correct if indexed fields are changed through
+``update_fields``; other fields (comments, description, ...) can be changed
+on the issue dict directly.
+"""
+
+import re
+from bisect import bisect_left, insort
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Any
+
+# Fields with an equality index, as named in JQL
+INDEXED_FIELDS = ("status", "project", "assignee", "labels")
+
+_CLAUSE = re.compile(
+    r"^(?P<field>\w+)\s*(?P<op>=|!=|>=|<=|>|<|\bin\b)\s*(?P<value>.+)$", re.I
+)
+_ORDER_BY = re.compile(r"\border\s+by\s+(\w+)(?:\s+(asc|desc))?", re.I)
+_AND = re.compile(r"\s+and\s+", re.I)
+_OR = re.compile(r"\bor\b", re.I)
+_RELATIVE = re.compile(r"^([-+]?\d+)([mhdw])$")
+_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+
+# Sort the matches instead of walking the updated index when they are this
+# many times fewer than the issues in the updated range
+_SORT_RATIO = 8
+
+
+def _unquote(value: str) -> str:
+    return value.strip().strip("\"'")
+
+
+def _jql_date(value: str) -> str:
+    """A JQL date (``2025-01-31``, ``2025-01-31 10:00``, ``-1w``) as ISO text."""
+    value = _unquote(value)
+    relative = _RELATIVE.match(value)
+    if relative:
+        amount, unit = relative.groups()
+        moment = datetime.now(timezone.utc) + timedelta(**{_UNITS[unit]: int(amount)})
+        return moment.isoformat(timespec="milliseconds")
+    return value.replace(" ", "T").replace("/", "-")
+
+
+@dataclass
+class Query:
+    """The part of a JQL query the store can answer from its indexes."""
+
+    # (indexed field, lowercased accepted values), all of which must match
+    equals: list[tuple[str, set[str]]] = field(default_factory=list)
+    # Bounds on updated (from inclusive, to exclusive), compared as ISO text,
+    # so a bare date stands for midnight UTC
+    updated_from: str | None = None
+    updated_to: str | None = None
+    order_by_updated: bool = False
+    descending: bool = False
+
+    @classmethod
+    def parse(cls, jql: str) -> "Query":
+        """Parse AND-ed clauses on indexed fields and ``ORDER BY updated``.
+
+        Clauses the mock does not understand are ignored, and so is the whole
+        filter when it uses OR, so the mock errs on returning too much.
+        """
+        query = cls()
+        where = jql
+        order = _ORDER_BY.search(jql)
+        if order:
+            where = jql[: order.start()]
+            if order.group(1).lower() == "updated":
+                query.order_by_updated = True
+                query.descending = (order.group(2) or "asc").lower() == "desc"
+        if _OR.search(where):
+            return query
+        for clause in _AND.split(where.replace("(", " ").replace(")", " ")):
+            match = _CLAUSE.match(clause.strip())
+            if match:
+                query._add(match["field"].lower(), match["op"].lower(), match["value"])
+        return query
+
+    def _add(self, name: str, op: str, value: str) -> None:
+        if name in INDEXED_FIELDS and op in ("=", "in"):
+            self.equals.append((name, {_unquote(v).lower() for v in value.split(",")}))
+        elif name == "updated" and op in (">=", ">"):
+            self.updated_from = _jql_date(value)
+        elif name == "updated" and op in ("<=", "<"):
+            self.updated_to = _jql_date(value)
+
+
+class IssueStore:
+    """Mock JIRA issues with secondary indexes."""
+
+    def __init__(self):
+        self._issues: dict[str, dict[str, Any]] = {}
+        self._ids_by_key: dict[str, str] = {}
+        self._indexes: dict[str, defaultdict[str, set[str]]] = {
+            name: defaultdict(set) for name in INDEXED_FIELDS
+        }
+        self._by_updated: list[tuple[str, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._issues)
+
+    def __contains__(self, id_or_key: object) -> bool:
+        return id_or_key in self._issues or id_or_key in self._ids_by_key
+
+    def get(self, id_or_key: str) -> dict[str, Any] | None:
+        """An issue by id or key."""
+        issue = self._issues.get(id_or_key)
+        if issue is None and id_or_key in self._ids_by_key:
+            issue = self._issues[self._ids_by_key[id_or_key]]
+        return issue
+
+    def values(self) -> Iterator[dict[str, Any]]:
+        """Issues in insertion order."""
+        return iter(self._issues.values())
+
+    def add(self, issue: dict[str, Any]) -> None:
+        """Store an issue, replacing any with the same id."""
+        self._add(issue)
+        insort(self._by_updated, self._sort_key(issue))
+
+    def add_many(self, issues: Iterable[dict[str, Any]]) -> None:
+        """Store many issues, sorting the updated index once at the end."""
+        for issue in issues:
+            self._add(issue)
+            self._by_updated.append(self._sort_key(issue))
+        self._by_updated.sort()
+
+    def update_fields(self, issue: dict[str, Any], **fields: Any) -> None:
+        """Set fields of a stored issue and reindex it."""
+        self._unindex(issue)
+        self._remove_sort_key(issue)
+        issue["fields"].update(fields)
+        self._index(issue)
+        insort(self._by_updated, self._sort_key(issue))
+
+    def clear(self) -> None:
+        self._issues.clear()
+        self._ids_by_key.clear()
+        for index in self._indexes.values():
+            index.clear()
+        self._by_updated.clear()
+
+    def search(
+        self, jql: str, limit: int, offset: int = 0
+    ) -> tuple[list[dict[str, Any]], int]:
+        """One page of the issues matching ``jql``, and the total match count."""
+        query = Query.parse(jql)
+        lo, hi = self._updated_range(query)
+        positions = range(lo, hi)
+        if query.descending:
+            positions = positions[::-1]
+        candidates = self._candidates(query)
+
+        if candidates is None:
+            page = positions[offset : offset + limit]
+            return [self._issues[self._by_updated[i][1]] for i in page], len(positions)
+
+        ranged = len(positions) < len(self._by_updated)
+        if len(candidates) * _SORT_RATIO < len(positions):
+            # Few matches: sorting them beats walking the updated index
+            matches = sorted(
+                (
+                    issue
+                    for issue in map(self._issues.__getitem__, candidates)
+                    if not ranged or self._in_range(issue, query)
+                ),
+                key=self._sort_key,
+                reverse=query.descending,
+            )
+            return matches[offset : offset + limit], len(matches)
+
+        matching = (
+            issue_id
+            for issue_id in (self._by_updated[i][1] for i in positions)
+            if issue_id in candidates
+        )
+        page = [self._issues[i] for i in islice(matching, offset, offset + limit)]
+        if not ranged:
+            total = len(candidates)
+        elif len(candidates) < len(positions):
+            total = sum(
+                self._in_range(self._issues[issue_id], query) for issue_id in candidates
+            )
+        else:
+            total = sum(self._by_updated[i][1] in candidates for i in positions)
+        return page, total
+
+    # --- Indexes ---
+
+    @staticmethod
+    def _sort_key(issue: dict[str, Any]) -> tuple[str, str]:
+        return issue["fields"].get("updated") or "", issue["id"]
+
+    @staticmethod
+    def _index_values(issue: dict[str, Any]) -> Iterator[tuple[str, str]]:
+        fields = issue["fields"]
+        status = fields.get("status") or {}
+        project = fields.get("project") or {}
+        assignee = fields.get("assignee") or {}
+        if status.get("name"):
+            yield "status", status["name"].lower()
+        if project.get("key"):
+            yield "project", project["key"].lower()
+        for name in ("displayName", "name", "accountId"):
+            if assignee.get(name):
+                yield "assignee", assignee[name].lower()
+        for label in fields.get("labels") or ():
+            yield "labels", label.lower()
+
+    def _add(self, issue: dict[str, Any]) -> None:
+        existing = self._issues.get(issue["id"])
+        if existing is not None:
+            self._unindex(existing)
+            self._remove_sort_key(existing)
+            self._ids_by_key.pop(existing["key"], None)
+        self._issues[issue["id"]] = issue
+        self._ids_by_key[issue["key"]] = issue["id"]
+        self._index(issue)
+
+    def _index(self, issue: dict[str, Any]) -> None:
+        for name, value in self._index_values(issue):
+            self._indexes[name][value].add(issue["id"])
+
+    def _unindex(self, issue: dict[str, Any]) -> None:
+        for name, value in self._index_values(issue):
+            ids = self._indexes[name].get(value)
+            if ids is not None:
+                ids.discard(issue["id"])
+                if not ids:
+                    del self._indexes[name][value]
+
+    def _remove_sort_key(self, issue: dict[str, Any]) -> None:
+        key = self._sort_key(issue)
+        position = bisect_left(self._by_updated, key)
+        if position < len(self._by_updated) and self._by_updated[position] == key:
+            del self._by_updated[position]
+
+    # --- Search ---
+
+    def _candidates(self, query: Query) -> set[str] | None:
+        """Ids matching every equality clause, or None if there are none."""
+        if not query.equals:
+            return None
+        groups = []
+        for name, values in query.equals:
+            index = self._indexes[name]
+            ids = [index[v] for v in values if v in index]
+            groups.append(set().union(*ids) if len(ids) != 1 else ids[0])
+        groups.sort(key=len)
+        # Index sets are shared: build new sets instead of updating them
+        candidates = groups[0]
+        for ids in groups[1:]:
+            candidates = candidates & ids
+        return candidates
+
+    def _updated_range(self, query: Query) -> tuple[int, int]:
+        """Positions in the updated index within the query's bounds."""
+        lo, hi = 0, len(self._by_updated)
+        # A 1-tuple sorts before every pair starting with the same text
+        if query.updated_from is not None:
+            lo = bisect_left(self._by_updated, (query.updated_from,))
+        if query.updated_to is not None:
+            hi = bisect_left(self._by_updated, (query.updated_to,))
+        return lo, max(lo, hi)
+
+    @staticmethod
+    def _in_range(issue: dict[str, Any], query: Query) -> bool:
+        updated = issue["fields"].get("updated") or ""
+        return (query.updated_from is None or updated >= query.updated_from) and (
+            query.updated_to is None or updated < query.updated_to
+        )
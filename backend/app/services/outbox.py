@@ -0,0 +1,321 @@
+"""Background worker that pushes queued outbox operations to JIRA.
+
+Clients upload their pending local edits in one call and can close the tab;
+every worker process polls the outbox table and claims runnable operations
+with a conditional UPDATE, so no leader election is needed. Operations on the
+same issue run in upload order, different issues run concurrently. Transient
+failures are retried with exponential backoff, and a 429 pauses the whole
+connection for the time JIRA asks for.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+from app.config import Settings, get_settings
+from app.core.lanes import lane_scope
+from app.db.database import async_session_factory
+from app.db.repositories import ConnectionRepository, OutboxRepository
+from app.models.connection import JiraConnection
+from app.models.outbox import OutboxOperation
+from app.services.relay_service import RelayResponse, RelayService, relay_service
+
+logger = logging.getLogger(__name__)
+
+# How long a claimed operation stays reserved for the worker running it
+_LEASE_SECONDS = 300
+
+# Backoff between attempts: base * 2^attempts, capped, with jitter
+_BACKOFF_BASE_SECONDS = 2.0
+_BACKOFF_MAX_SECONDS = 300.0
+
+# Fallback pause after a 429 without a usable Retry-After header
+_DEFAULT_RATE_LIMIT_SECONDS = 30.0
+
+# Finished operations are purged at most this often
+_PURGE_INTERVAL_SECONDS = 3600.0
+
+
+def build_jira_request(
+    operation: OutboxOperation, api_version: int
+) -> tuple[str, str, dict[str, Any]]:
+    """Map an outbox operation to (method, path, body) of a JIRA REST call."""
+    base = f"/rest/api/{api_version}"
+    key = operation.entity_key
+    if operation.kind == "create":
+        return "POST", f"{base}/issue", operation.payload
+    if operation.kind == "update":
+        return "PUT", f"{base}/issue/{key}", operation.payload
+    if operation.kind == "transition":
+        return "POST", f"{base}/issue/{key}/transitions", operation.payload
+    if operation.kind == "comment":
+        return "POST", f"{base}/issue/{key}/comment", operation.payload
+    raise ValueError(f"Unknown outbox operation kind: {operation.kind}")
+
+
+def _retry_after_seconds(headers: dict[str, str]) -> float:
+    """Read Retry-After (seconds or HTTP date) from upstream headers."""
+    value = next((v for k, v in headers.items() if k.lower() == "retry-after"), None)
+    if not value:
+        return _DEFAULT_RATE_LIMIT_SECONDS
+    try:
+        return max(float(value), 1.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return _DEFAULT_RATE_LIMIT_SECONDS
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 1.0)
+
+
+def _backoff_seconds(attempts: int) -> float:
+    delay = min(_BACKOFF_BASE_SECONDS * 2**attempts, _BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _decode_result(response: RelayResponse) -> Any:
+    if not response.body:
+        return None
+    try:
+        return json.loads(response.body)
+    except ValueError:
+        return {"text": response.body.decode("utf-8", errors="replace")[:2000]}
+
+
+class OutboxWorker:
+    """Polls the outbox and executes claimed operations against JIRA."""
+
+    def __init__(
+        self,
+        session_factory: Any = async_session_factory,
+        relay: RelayService = relay_service,
+        settings: Settings | None = None,
+    ):
+        self._session_factory = session_factory
+        self._relay = relay
+        self._settings = settings or get_settings()
+        self._paused_until: dict[str, float] = {}
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._last_purge = 0.0
+
+    def start(self) -> None:
+        """Start the worker loop in the background."""
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="outbox-worker")
+
+    async def stop(self) -> None:
+        """Stop the worker loop; claimed operations are re-run after the lease."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def notify(self) -> None:
+        """Wake the worker up after new operations were queued."""
+        self._wake.set()
+
+    async def _run(self) -> None:
+        while True:
+            processed = 0
+            try:
+                processed = await self.run_once()
+                await self._maybe_purge()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("[Outbox] Worker round failed")
+            if processed:
+                # Finishing an operation may unblock the next one of its issue
+                continue
+            try:
+                await asyncio.wait_for(
+                    self._wake.wait(), self._settings.outbox_poll_interval_seconds
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def run_once(self) -> int:
+        """Claim and execute one round of runnable operations.
+
+        Returns:
+            Number of operations executed
+        """
+        settings = self._settings
+        now = datetime.now(timezone.utc)
+        monotonic_now = time.monotonic()
+        paused = {
+            connection_id
+            for connection_id, until in self._paused_until.items()
+            if until > monotonic_now
+        }
+        async with self._session_factory() as session:
+            operations = await OutboxRepository(session).claim_ready(
+                now,
+                now + timedelta(seconds=_LEASE_SECONDS),
+                limit=settings.outbox_concurrency * 4,
+                exclude_connections=paused,
+            )
+            connections: dict[str, JiraConnection | None] = {}
+            conn_repo = ConnectionRepository(session)
+            for operation in operations:
+                if operation.connection_id not in connections:
+                    connections[operation.connection_id] = await conn_repo.get_by_id(
+                        operation.connection_id
+                    )
+        if not operations:
+            return 0
+
+        semaphore = asyncio.Semaphore(settings.outbox_concurrency)
+
+        async def run(operation: OutboxOperation) -> None:
+            async with semaphore:
+                await self._execute(operation, connections[operation.connection_id])
+
+        await asyncio.gather(*(run(op) for op in operations))
+        return len(operations)
+
+    async def _execute(
+        self, operation: OutboxOperation, connection: JiraConnection | None
+    ) -> None:
+        """Run one operation and record its outcome."""
+        if connection is None:
+            # The connection was deleted; its operations cascade away with it
+            return
+
+        if self._paused_until.get(connection.id, 0.0) > time.monotonic():
+            # Another operation of this round hit the rate limit
+            await self._retry(
+                operation,
+                self._paused_until[connection.id] - time.monotonic(),
+                None,
+                "Rate limited",
+                count_attempt=False,
+            )
+            return
+
+        try:
+            method, path, body = build_jira_request(operation, connection.api_version)
+        except ValueError as e:
+            await self._finish(operation, "failed", None, error=str(e))
+            return
+
+        try:
+            with lane_scope("background"):
+                response = await self._relay.forward_request(
+                    connection=connection, method=method, path=path, body=body
+                )
+        except Exception as e:
+            logger.warning(f"[Outbox] Operation {operation.id} failed: {e}")
+            await self._retry_or_fail(operation, None, f"Relay error: {e}")
+            return
+
+        status = response.status_code
+        if 200 <= status < 300:
+            result = _decode_result(response)
+            # Queued follow-ups on a new issue target its real key from now on
+            new_key = (
+                result.get("key")
+                if operation.kind == "create" and isinstance(result, dict)
+                else None
+            )
+            await self._finish(
+                operation, "succeeded", status, result=result, new_entity_key=new_key
+            )
+            logger.info(f"[Outbox] {operation.kind} {operation.entity_key} -> {status}")
+        elif status == 429:
+            delay = _retry_after_seconds(response.headers)
+            self._paused_until[connection.id] = time.monotonic() + delay
+            logger.info(f"[Outbox] Connection {connection.id} rate limited {delay}s")
+            await self._retry(
+                operation, delay, status, "Rate limited by JIRA", count_attempt=False
+            )
+        elif status >= 500 or status == 408:
+            await self._retry_or_fail(
+                operation, status, f"JIRA returned {status}", _decode_result(response)
+            )
+        else:
+            # Other client errors (validation, permissions, ...) won't heal
+            await self._finish(
+                operation,
+                "failed",
+                status,
+                result=_decode_result(response),
+                error=f"JIRA returned {status}",
+            )
+
+    async def _retry_or_fail(
+        self,
+        operation: OutboxOperation,
+        status: int | None,
+        error: str,
+        result: Any = None,
+    ) -> None:
+        if operation.attempts + 1 >= self._settings.outbox_max_attempts:
+            await self._finish(operation, "failed", status, result=result, error=error)
+        else:
+            await self._retry(
+                operation, _backoff_seconds(operation.attempts), status, error
+            )
+
+    async def _retry(
+        self,
+        operation: OutboxOperation,
+        delay: float,
+        status: int | None,
+        error: str,
+        count_attempt: bool = True,
+    ) -> None:
+        at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+        async with self._session_factory() as session:
+            await OutboxRepository(session).retry_later(
+                operation.id, at, status, error, count_attempt=count_attempt
+            )
+
+    async def _finish(
+        self,
+        operation: OutboxOperation,
+        status: str,
+        response_status: int | None,
+        result: Any = None,
+        error: str | None = None,
+        new_entity_key: str | None = None,
+    ) -> None:
+        async with self._session_factory() as session:
+            await OutboxRepository(session).finish(
+                operation.id,
+                status,
+                response_status,
+                result=result,
+                error=error,
+                new_entity_key=new_entity_key,
+            )
+
+    async def _maybe_purge(self) -> None:
+        """Drop finished operations past the retention period."""
+        now = time.monotonic()
+        if now - self._last_purge < _PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = now
+        before = datetime.now(timezone.utc) - timedelta(
+            hours=self._settings.outbox_retention_hours
+        )
+        async with self._session_factory() as session:
+            purged = await OutboxRepository(session).purge_finished(before)
+        if purged:
+            logger.info(f"[Outbox] Purged {purged} finished operations")
+
+
+# Singleton instance
+outbox_worker = OutboxWorker()
@@ -0,0 +1,231 @@
+"""Background prewarm scheduler for frequently used connections.
+
+Keeps caches warm for connections people actually use, so the first load of
+the day does not pay for cold metadata lookups and an empty search index.
+Connections are ranked by ``last_used_at``: the hottest ones are refreshed
+every cycle, colder ones progressively less often, and a single cycle never
+spends more than the configured number of upstream calls.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from app.config import Settings, get_settings
+from app.core.lanes import lane_scope
+from app.db.database import async_session_factory
+from app.db.repositories import ConnectionRepository, IssueSearchRepository
+from app.models.connection import JiraConnection
+from app.services.metadata_cache import METADATA_PATHS, MetadataCache, metadata_cache
+from app.services.relay_service import RelayError, RelayService, relay_service
+from app.services.search_index import comments_to_text, extract_issue_documents
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no flock
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between last_used_at writes for one connection per worker
+_USAGE_RECORD_INTERVAL = 300.0
+
+# Connections per refresh tier; each tier down is refreshed one cycle less often
+_TIER_SIZE = 5
+
+# Upstream statuses after which we stop refreshing a connection this cycle
+_STOP_STATUSES = {401, 403, 429}
+
+_last_recorded_use: dict[str, float] = {}
+
+
+def should_record_use(connection_id: str) -> bool:
+    """Throttle last_used_at writes so busy connections don't write per call."""
+    now = time.monotonic()
+    last = _last_recorded_use.get(connection_id)
+    if last is not None and now - last < _USAGE_RECORD_INTERVAL:
+        return False
+    _last_recorded_use[connection_id] = now
+    return True
+
+
+class _StopRefresh(Exception):
+    """Raised to end the refresh of a connection early."""
+
+
+class PrewarmScheduler:
+    """Periodically refreshes metadata, recent issues and comments."""
+
+    def __init__(
+        self,
+        session_factory: Any = async_session_factory,
+        relay: RelayService = relay_service,
+        cache: MetadataCache = metadata_cache,
+        settings: Settings | None = None,
+    ):
+        self._session_factory = session_factory
+        self._relay = relay
+        self._cache = cache
+        self._settings = settings or get_settings()
+        self._next_due: dict[str, float] = {}
+        self._task: asyncio.Task | None = None
+        self._lock_file = None
+
+    def start(self) -> None:
+        """Start the scheduler loop in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="prewarm-scheduler")
+
+    async def stop(self) -> None:
+        """Stop the scheduler loop and release leadership."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if self._acquire_leadership():
+                    calls = await self.run_cycle()
+                    logger.info(f"[Prewarm] Cycle finished, {calls} upstream calls")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("[Prewarm] Cycle failed")
+            await asyncio.sleep(self._settings.prewarm_interval_seconds)
+
+    def _acquire_leadership(self) -> bool:
+        """Make sure only one worker per host runs the prewarm loop.
+
+        Gunicorn workers share the data directory, so an exclusive flock on a
+        file there elects a leader; the OS releases it if the leader dies.
+        """
+        if fcntl is None or self._lock_file is not None:
+            return True
+        lock_path = self._settings.database_path.parent / "prewarm.lock"
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        logger.info("[Prewarm] This worker is the prewarm leader")
+        return True
+
+    async def run_cycle(self) -> int:
+        """Refresh every due connection in rank order within the budget.
+
+        Returns:
+            Number of upstream calls made
+        """
+        settings = self._settings
+        since = datetime.now(timezone.utc) - timedelta(
+            hours=settings.prewarm_lookback_hours
+        )
+        async with self._session_factory() as session:
+            connections = await ConnectionRepository(session).get_recently_used(
+                since, settings.prewarm_max_connections
+            )
+
+        interval = settings.prewarm_interval_seconds
+        cycle_start = time.monotonic()
+        used = 0
+        for rank, connection in enumerate(connections):
+            if connection.jira_url == "demo://local":
+                continue
+            if self._next_due.get(connection.id, 0.0) > cycle_start:
+                continue
+            remaining = settings.prewarm_upstream_budget - used
+            if remaining <= 0:
+                logger.info("[Prewarm] Upstream budget exhausted for this cycle")
+                break
+
+            used += await self.refresh_connection(connection, remaining)
+            # Half an interval of slack so a tier is due on its intended cycle
+            period = interval * (1 + rank // _TIER_SIZE)
+            self._next_due[connection.id] = cycle_start + period - interval / 2
+        return used
+
+    async def refresh_connection(self, connection: JiraConnection, budget: int) -> int:
+        """Refresh one connection, spending at most ``budget`` upstream calls."""
+        calls = 0
+
+        def spend() -> None:
+            nonlocal calls
+            if calls >= budget:
+                raise _StopRefresh()
+            calls += 1
+
+        try:
+            with lane_scope("prefetch"):
+                await self._refresh_metadata(connection, spend)
+                issues = await self._refresh_recent_issues(connection, spend)
+                await self._refresh_comments(connection, issues, spend)
+        except _StopRefresh:
+            pass
+        except Exception as e:
+            logger.warning(f"[Prewarm] Refresh of {connection.id} stopped: {e}")
+        return calls
+
+    async def _refresh_metadata(self, connection: JiraConnection, spend) -> None:
+        for name in METADATA_PATHS:
+            spend()
+            path = f"/rest/api/{connection.api_version}/{name}"
+            response = await self._relay.forward_request(
+                connection=connection, method="GET", path=path
+            )
+            if response.status_code in _STOP_STATUSES:
+                raise RelayError(response.status_code, response.body)
+            await self._cache.put(
+                connection.id,
+                path,
+                "",
+                response.status_code,
+                response.headers,
+                response.body,
+            )
+
+    async def _refresh_recent_issues(
+        self, connection: JiraConnection, spend
+    ) -> list[dict[str, Any]]:
+        spend()
+        hours = self._settings.prewarm_issue_window_hours
+        page = await self._relay.search_issues(
+            connection=connection,
+            jql=f"updated >= -{hours}h ORDER BY updated DESC",
+            max_results=100,
+            fields=["summary", "description", "comment", "updated"],
+        )
+        async with self._session_factory() as session:
+            await IssueSearchRepository(session).upsert_many(
+                connection.id, extract_issue_documents(page)
+            )
+        return page.get("issues", [])
+
+    async def _refresh_comments(
+        self, connection: JiraConnection, issues: list[dict[str, Any]], spend
+    ) -> None:
+        for issue in issues[: self._settings.prewarm_comment_issues]:
+            spend()
+            result = await self._relay.get_comments(connection, issue["key"])
+            async with self._session_factory() as session:
+                await IssueSearchRepository(session).set_comments(
+                    connection.id,
+                    issue["key"],
+                    comments_to_text(result.get("comments", [])),
+                )
+
+
+# Singleton instance
+prewarm_scheduler = PrewarmScheduler()
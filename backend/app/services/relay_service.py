@@ -1,17 +1,69 @@
 """Relay service for forwarding requests to JIRA servers."""
 
+import asyncio
 import base64
 import logging
+import re
+import time
 from dataclasses import dataclass
 from typing import Any
 
 import httpx
 
+from app.config import get_settings
+from app.core import deadline
+from app.core.lanes import LaneScheduler, parse_user_weights
+from app.core.metrics import registry
 from app.core.security import decrypt_api_token
+from app.core.tracing import TRACEPARENT_HEADER, tracer
+from app.core.upstream_timing import UpstreamTiming, origin_of
 from app.models.connection import JiraConnection
 
 logger = logging.getLogger(__name__)
 
+# Connections with this URL are served by the in-process mock JIRA
+DEMO_JIRA_URL = "demo://local"
+
+# Latency samples needed before a connection's timeout adapts
+_MIN_LATENCY_SAMPLES = 5
+
+# Read timeout as a multiple of the smoothed latency bound (srtt + 4 * rttvar)
+_TIMEOUT_SAFETY_FACTOR = 3.0
+
+# A timeout this close to the request deadline is reported as a deadline miss
+_DEADLINE_SLACK = 0.05
+
+_SEARCH_PATH = re.compile(r"^/rest/api/\d+/search(/|$)")
+_READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def endpoint_class(method: str, path: str) -> str:
+    """Latency class of a JIRA request: ``search``, ``write`` or ``read``.
+
+    Searches (JQL) and writes (attachment uploads, ...) take much longer than
+    issue and metadata reads, so their latency is not estimated together.
+    """
+    if _SEARCH_PATH.match(path):
+        return "search"
+    if method.upper() not in _READ_METHODS:
+        return "write"
+    return "read"
+
+
+async def _log_request(request: httpx.Request) -> None:
+    """Log outgoing request headers with credentials masked."""
+    safe_req_headers = {
+        k: "***" if k.lower() == "authorization" else v
+        for k, v in request.headers.items()
+    }
+    logger.info(f"[RelayService] httpx OUTGOING request headers: {safe_req_headers}")
+
+
+def _deadline_error() -> "RelayError":
+    return RelayError(
+        504, b'{"errorMessages": ["Request deadline exceeded before JIRA answered"]}'
+    )
+
 
 @dataclass
 class RelayResponse:
@@ -20,17 +72,164 @@ class RelayResponse:
     status_code: int
     headers: dict[str, str]
     body: bytes | None
+    # Phase timings when the response came from a JIRA server
+    timing: UpstreamTiming | None = None
+
+
+@dataclass
+class RelayStream:
+    """An open streaming response from JIRA; must be closed by the caller."""
+
+    response: httpx.Response
+    client: httpx.AsyncClient
+
+    async def aclose(self) -> None:
+        """Close the upstream response and its client."""
+        await self.response.aclose()
+        await self.client.aclose()
+
+
+@dataclass
+class LatencyEstimate:
+    """Smoothed upstream latency of one connection and endpoint class.
+
+    Uses the RFC 6298 estimator.
+    """
+
+    srtt: float
+    rttvar: float
+    samples: int = 1
 
 
 class RelayService:
-    """Service for proxying requests to JIRA servers."""
+    """Service for proxying requests to JIRA servers.
 
-    def __init__(self, timeout: float = 30.0):
+    Requests share one pooled HTTP client. Each request's timeouts are the
+    tighter of the request deadline (see ``app.core.deadline``) and the
+    connection's adaptive read timeout, derived from its observed latency
+    per endpoint class (see ``endpoint_class``).
+    Upstream slots are granted by priority lane (see ``app.core.lanes``).
+    """
+
+    def __init__(
+        self,
+        timeout: float = 30.0,
+        connect_timeout: float = 10.0,
+        pool_timeout: float = 5.0,
+        min_timeout: float = 5.0,
+        limits: httpx.Limits | None = None,
+        scheduler: LaneScheduler | None = None,
+    ):
         self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.pool_timeout = pool_timeout
+        self.min_timeout = min_timeout
+        self._limits = limits or httpx.Limits()
+        self.scheduler = scheduler or LaneScheduler(
+            total=self._limits.max_connections or 100
+        )
+        self._latency: dict[tuple[str, str], LatencyEstimate] = {}
+        self._client: httpx.AsyncClient | None = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+        self._mock_app = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the shared client, creating it for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop != loop:
+            self._client = httpx.AsyncClient(
+                limits=self._limits, event_hooks={"request": [_log_request]}
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the shared client (called on application shutdown)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def read_timeout(self, connection_id: str, endpoint: str = "read") -> float:
+        """Adaptive read timeout for a connection and endpoint class.
+
+        Falls back to the fixed timeout until enough samples were seen;
+        afterwards a generous multiple of the latency bound, so slow JIRA
+        instances keep working while a hung request fails fast. Writes
+        always get the fixed timeout: their duration depends on the body
+        (attachment uploads) and a timed out write may still be applied.
+        """
+        if endpoint == "write":
+            return self.timeout
+        estimate = self._latency.get((connection_id, endpoint))
+        if estimate is None or estimate.samples < _MIN_LATENCY_SAMPLES:
+            return self.timeout
+        bound = estimate.srtt + 4 * estimate.rttvar
+        return min(max(bound * _TIMEOUT_SAFETY_FACTOR, self.min_timeout), self.timeout)
+
+    def _timeouts(self, connection_id: str, endpoint: str = "read") -> httpx.Timeout:
+        """Upstream timeouts bounded by the current request deadline."""
+        read = self.read_timeout(connection_id, endpoint)
+        connect = self.connect_timeout
+        pool = self.pool_timeout
+        left = deadline.remaining()
+        if left is not None:
+            if left <= 0:
+                raise _deadline_error()
+            read, connect, pool = min(read, left), min(connect, left), min(pool, left)
+        return httpx.Timeout(connect=connect, read=read, write=read, pool=pool)
+
+    def _record_latency(
+        self, connection_id: str, elapsed: float, endpoint: str = "read"
+    ) -> None:
+        estimate = self._latency.get((connection_id, endpoint))
+        if estimate is None:
+            self._latency[connection_id, endpoint] = LatencyEstimate(
+                elapsed, elapsed / 2
+            )
+            return
+        estimate.rttvar = 0.75 * estimate.rttvar + 0.25 * abs(estimate.srtt - elapsed)
+        estimate.srtt = 0.875 * estimate.srtt + 0.125 * elapsed
+        estimate.samples += 1
+
+    def _record_timeout(self, connection_id: str, endpoint: str = "read") -> None:
+        """Back off after a timeout so a slowing server gets more time."""
+        estimate = self._latency.get((connection_id, endpoint))
+        if estimate is not None:
+            estimate.srtt = min(estimate.srtt * 2, self.timeout)
+
+    async def _forward_to_mock(
+        self,
+        method: str,
+        path: str,
+        body: Any | None,
+        query_params: dict[str, str] | None,
+    ) -> RelayResponse:
+        """Serve a demo connection request from the mock JIRA, in-process."""
+        if self._mock_app is None:
+            from fastapi import FastAPI
+
+            from app.services.mock_jira import mock_jira_router
+
+            self._mock_app = FastAPI()
+            self._mock_app.include_router(mock_jira_router)
+
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=self._mock_app), base_url="http://demo"
+        ) as client:
+            response = await client.request(
+                method.upper(), path, json=body, params=query_params
+            )
+        headers = {
+            key: value
+            for key, value in response.headers.items()
+            if key.lower() not in ("content-length", "content-encoding")
+        }
+        return RelayResponse(response.status_code, headers, response.content or None)
 
     def _get_auth_header(self, connection: JiraConnection) -> str:
         """Generate Basic Auth header for JIRA connection."""
-        api_token = decrypt_api_token(connection.api_token_encrypted)
+        with tracer.span("crypto.decrypt_api_token"):
+            api_token = decrypt_api_token(connection.api_token_encrypted)
         credentials = f"{connection.email}:{api_token}"
         encoded = base64.b64encode(credentials.encode()).decode()
         return f"Basic {encoded}"
@@ -71,6 +270,9 @@ class RelayService:
         Returns:
             RelayResponse containing status, headers, and body
         """
+        if connection.jira_url == DEMO_JIRA_URL:
+            return await self._forward_to_mock(method, path, body, query_params)
+
         logger.info("=" * 60)
         logger.info("[RelayService] forward_request called (NEW CODE LOADED)")
         logger.info("=" * 60)
@@ -114,59 +316,136 @@ class RelayService:
         if query_params:
             logger.info(f"[RelayService] Query params: {query_params}")
 
-        # Add event hook to log actual outgoing request
-        async def log_request(request):
-            safe_req_headers = {
-                k: "***" if k.lower() == "authorization" else v
-                for k, v in request.headers.items()
-            }
-            logger.info(
-                f"[RelayService] httpx OUTGOING request headers: {safe_req_headers}"
-            )
-            return request
+        # Wait for a slot of the request's lane; the deadline keeps running
+        async with self.scheduler.slot(
+            user=connection.user_id, connection=connection.id
+        ):
+            endpoint = endpoint_class(method, path)
+            timeout = self._timeouts(connection.id, endpoint)
+            client = self._get_client()
+            timing = UpstreamTiming(origin_of(base_url))
+            started = time.monotonic()
+            with tracer.span(
+                "relay.upstream",
+                kind="client",
+                **{"http.method": method.upper(), "http.url": url},
+            ) as span:
+                if span is not None:
+                    request_headers[TRACEPARENT_HEADER] = span.traceparent
+                try:
+                    response = await client.request(
+                        method=method.upper(),
+                        url=url,
+                        json=body,
+                        params=query_params,
+                        headers=request_headers,
+                        timeout=timeout,
+                        extensions={"trace": timing.trace(tracer.httpcore_trace(span))},
+                    )
+                except httpx.TimeoutException:
+                    self._record_timeout(connection.id, endpoint)
+                    left = deadline.remaining()
+                    if left is not None and left <= _DEADLINE_SLACK:
+                        raise _deadline_error()
+                    raise
+                if span is not None:
+                    span.set_attribute("http.status_code", response.status_code)
+            timing.total = time.monotonic() - started
+            self._record_latency(connection.id, timing.total, endpoint)
+        timing.observe()
+
+        # Log response
+        logger.info(
+            f"[RelayService] Response status: {response.status_code} "
+            f"in {timing.total * 1000:.1f} ms {timing.as_dict()}"
+        )
+        if response.status_code >= 400:
+            logger.error(f"[RelayService] Response body: {response.text}")
+
+        # Extract response headers (forward all except hop-by-hop headers)
+        # Hop-by-hop headers that should NOT be forwarded:
+        hop_by_hop_headers = {
+            "connection",
+            "keep-alive",
+            "proxy-authenticate",
+            "proxy-authorization",
+            "te",
+            "trailers",
+            "transfer-encoding",
+            "upgrade",
+            "content-length",  # Let FastAPI recalculate this
+            "content-encoding",  # httpx already decompresses; don't tell browser to decompress again  # noqa: E501
+            "authorization",  # Don't leak auth headers
+        }
 
-        async with httpx.AsyncClient(
-            timeout=self.timeout, event_hooks={"request": [log_request]}
-        ) as client:
-            response = await client.request(
-                method=method.upper(),
-                url=url,
-                json=body,
-                params=query_params,
-                headers=request_headers,
-            )
+        response_headers = {}
+        for key, value in response.headers.items():
+            if key.lower() not in hop_by_hop_headers:
+                response_headers[key] = value
 
-            # Log response
-            logger.info(f"[RelayService] Response status: {response.status_code}")
-            if response.status_code >= 400:
-                logger.error(f"[RelayService] Response body: {response.text}")
-
-            # Extract response headers (forward all except hop-by-hop headers)
-            # Hop-by-hop headers that should NOT be forwarded:
-            hop_by_hop_headers = {
-                "connection",
-                "keep-alive",
-                "proxy-authenticate",
-                "proxy-authorization",
-                "te",
-                "trailers",
-                "transfer-encoding",
-                "upgrade",
-                "content-length",  # Let FastAPI recalculate this
-                "content-encoding",  # httpx already decompresses; don't tell browser to decompress again  # noqa: E501
-                "authorization",  # Don't leak auth headers
-            }
-
-            response_headers = {}
-            for key, value in response.headers.items():
-                if key.lower() not in hop_by_hop_headers:
-                    response_headers[key] = value
-
-            return RelayResponse(
-                status_code=response.status_code,
-                headers=response_headers,
-                body=response.content if response.content else None,
-            )
+        return RelayResponse(
+            status_code=response.status_code,
+            headers=response_headers,
+            body=response.content if response.content else None,
+            timing=timing,
+        )
+
+    async def open_stream(
+        self,
+        connection: JiraConnection,
+        path: str,
+        headers: dict[str, str] | None = None,
+    ) -> RelayStream:
+        """
+        Open a streaming GET for binary content (attachments, avatars).
+
+        Unlike forward_request, the body is not buffered and no JSON
+        content type is forced. Redirects are followed; httpx drops the
+        Authorization header when a redirect leaves the JIRA origin (e.g. to
+        the Atlassian media API).
+
+        Args:
+            connection: The JIRA connection to use
+            path: Absolute path on the JIRA host, including any query string
+            headers: Optional extra headers (e.g. Range)
+
+        Returns:
+            RelayStream whose response body has not been read yet
+        """
+        url = f"{connection.jira_url.rstrip('/')}{path}"
+        request_headers = {
+            "Authorization": self._get_auth_header(connection),
+            "Accept": "*/*",
+            "X-Atlassian-Token": "no-check",
+        }
+        if headers:
+            request_headers.update(headers)
+
+        logger.info(f"[RelayService] STREAM GET {url}")
+        # Bound connecting by the deadline; the body may stream for longer
+        timeout = self._timeouts(connection.id)
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(self.timeout, connect=timeout.connect),
+            follow_redirects=True,
+        )
+        try:
+            with tracer.span(
+                "relay.upstream_stream", kind="client", **{"http.url": url}
+            ) as span:
+                extensions = {}
+                if span is not None:
+                    request_headers[TRACEPARENT_HEADER] = span.traceparent
+                    extensions["trace"] = tracer.httpcore_trace(span)
+                request = client.build_request(
+                    "GET", url, headers=request_headers, extensions=extensions
+                )
+                response = await client.send(request, stream=True)
+                if span is not None:
+                    span.set_attribute("http.status_code", response.status_code)
+        except BaseException:
+            await client.aclose()
+            raise
+        return RelayStream(response=response, client=client)
 
     async def search_issues(
         self,
@@ -276,5 +555,48 @@ class RelayError(Exception):
         super().__init__(message)
 
 
+def _create_relay_service() -> RelayService:
+    settings = get_settings()
+    return RelayService(
+        timeout=settings.relay_timeout_seconds,
+        connect_timeout=settings.relay_connect_timeout_seconds,
+        pool_timeout=settings.relay_pool_timeout_seconds,
+        min_timeout=settings.relay_min_timeout_seconds,
+        limits=httpx.Limits(
+            max_connections=settings.relay_max_connections,
+            max_keepalive_connections=settings.relay_max_keepalive_connections,
+        ),
+        scheduler=LaneScheduler(
+            total=settings.relay_max_connections,
+            limits={
+                "sync": settings.relay_sync_concurrency,
+                "prefetch": settings.relay_prefetch_concurrency,
+                "background": settings.relay_background_concurrency,
+            },
+            user_limit=settings.relay_user_max_concurrency,
+            weights=parse_user_weights(settings.relay_user_weights),
+        ),
+    )
+
+
 # Singleton instance
-relay_service = RelayService()
+relay_service = _create_relay_service()
+
+registry.gauge(
+    "relay_upstream_active",
+    "Upstream JIRA calls in flight per priority lane",
+    labels=("lane",),
+    callback=lambda: {
+        (lane,): stats["active"]
+        for lane, stats in relay_service.scheduler.stats().items()
+    },
+)
+registry.gauge(
+    "relay_upstream_waiting",
+    "Relay requests queued for an upstream slot per priority lane",
+    labels=("lane",),
+    callback=lambda: {
+        (lane,): stats["waiting"]
+        for lane, stats in relay_service.scheduler.stats().items()
+    },
+)
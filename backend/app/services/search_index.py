@@ -0,0 +1,184 @@
+"""Issue full-text indexing service.
+
+Turns JIRA issue payloads into plain-text search documents and keeps the
+per-connection search index up to date as issues pass through the relay or
+are pushed by the frontend sync engine.
+"""
+
+import json
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any
+
+from app.config import get_settings
+from app.db.database import async_session_factory
+from app.db.repositories import IssueSearchRepository
+
+logger = logging.getLogger(__name__)
+
+# ADF block nodes that should be separated by a line break in plain text
+_ADF_BLOCK_TYPES = {
+    "paragraph",
+    "heading",
+    "blockquote",
+    "codeBlock",
+    "listItem",
+    "tableCell",
+    "tableHeader",
+    "panel",
+    "rule",
+}
+
+# Relay paths whose responses carry issues or comments worth indexing
+_SEARCH_PATH = re.compile(r"^/rest/api/\d+/search(/jql)?$")
+_ISSUE_PATH = re.compile(r"^/rest/api/\d+/issue/(?P<key>[^/]+)$")
+_COMMENTS_PATH = re.compile(r"^/rest/api/\d+/issue/(?P<key>[^/]+)/comment$")
+
+
+@dataclass
+class IssueDocument:
+    """Plain-text representation of an issue for the search index.
+
+    Fields the payload left out (e.g. a search that did not request
+    ``comment``) are None, so indexing it keeps the text already indexed.
+    """
+
+    issue_key: str
+    issue_id: str | None
+    summary: str | None
+    description: str | None
+    comments: str | None
+    updated: str | None
+
+
+def adf_to_text(node: Any) -> str:
+    """Extract plain text from an ADF document (or pass through v2 strings)."""
+    if node is None:
+        return ""
+    if isinstance(node, str):
+        return node
+    parts: list[str] = []
+    _collect_adf_text(node, parts)
+    return re.sub(r"\n{2,}", "\n", "".join(parts)).strip()
+
+
+def _collect_adf_text(node: Any, parts: list[str]) -> None:
+    """Walk an ADF node tree, appending text fragments to ``parts``."""
+    if isinstance(node, list):
+        for child in node:
+            _collect_adf_text(child, parts)
+        return
+    if not isinstance(node, dict):
+        return
+
+    node_type = node.get("type")
+    attrs = node.get("attrs") or {}
+    if node_type == "text":
+        parts.append(node.get("text", ""))
+    elif node_type == "hardBreak":
+        parts.append("\n")
+    elif node_type == "mention":
+        parts.append(attrs.get("text", ""))
+    elif node_type == "emoji":
+        parts.append(attrs.get("shortName", ""))
+    elif node_type in ("inlineCard", "blockCard"):
+        parts.append(attrs.get("url", ""))
+
+    _collect_adf_text(node.get("content", []), parts)
+    if node_type in _ADF_BLOCK_TYPES:
+        parts.append("\n")
+
+
+def comments_to_text(comments: list[dict[str, Any]]) -> str:
+    """Join the bodies of a list of JIRA comments into one text blob."""
+    return "\n".join(
+        text for text in (adf_to_text(c.get("body")) for c in comments) if text
+    )
+
+
+def build_issue_document(issue: dict[str, Any]) -> IssueDocument | None:
+    """Build a search document from a JIRA issue payload."""
+    key = issue.get("key")
+    if not key:
+        return None
+    fields = issue.get("fields") or {}
+    comments = None
+    if "comment" in fields:
+        comments = comments_to_text((fields["comment"] or {}).get("comments", []))
+    return IssueDocument(
+        issue_key=key,
+        issue_id=str(issue["id"]) if issue.get("id") is not None else None,
+        summary=(fields.get("summary") or "") if "summary" in fields else None,
+        description=(
+            adf_to_text(fields["description"]) if "description" in fields else None
+        ),
+        comments=comments,
+        updated=fields.get("updated"),
+    )
+
+
+def extract_issue_documents(payload: Any) -> list[IssueDocument]:
+    """Build search documents from a search page or a single issue payload."""
+    if not isinstance(payload, dict):
+        return []
+    if isinstance(payload.get("issues"), list):
+        issues = payload["issues"]
+    elif "key" in payload and "fields" in payload:
+        issues = [payload]
+    else:
+        return []
+    documents = []
+    for issue in issues:
+        if isinstance(issue, dict):
+            document = build_issue_document(issue)
+            if document is not None:
+                documents.append(document)
+    return documents
+
+
+async def index_payload(connection_id: str, payload: Any) -> None:
+    """Index the issues of an already decoded search page or issue payload."""
+    if not get_settings().search_index_enabled:
+        return
+    try:
+        documents = extract_issue_documents(payload)
+        if documents:
+            async with async_session_factory() as session:
+                await IssueSearchRepository(session).upsert_many(
+                    connection_id, documents
+                )
+    except Exception as e:
+        logger.warning(f"[SearchIndex] Failed to index payload: {e}")
+
+
+async def index_relay_response(connection_id: str, path: str, body: bytes) -> None:
+    """Index issues or comments contained in a successful relay GET response.
+
+    Runs as a background task after the response has been sent, so failures
+    are logged and swallowed rather than surfaced to the client.
+    """
+    if not get_settings().search_index_enabled or not body:
+        return
+
+    is_search = _SEARCH_PATH.match(path)
+    issue_match = _ISSUE_PATH.match(path)
+    comments_match = _COMMENTS_PATH.match(path)
+    if not (is_search or issue_match or comments_match):
+        return
+
+    try:
+        payload = json.loads(body)
+        async with async_session_factory() as session:
+            repo = IssueSearchRepository(session)
+            if comments_match:
+                comments = (
+                    payload.get("comments", []) if isinstance(payload, dict) else []
+                )
+                await repo.set_comments(
+                    connection_id, comments_match["key"], comments_to_text(comments)
+                )
+            else:
+                await repo.upsert_many(connection_id, extract_issue_documents(payload))
+    except Exception as e:
+        logger.warning(f"[SearchIndex] Failed to index {path}: {e}")
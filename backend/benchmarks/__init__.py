@@ -0,0 +1 @@
+"""Load tests and benchmarks for the backend (not part of the app)."""
@@ -0,0 +1,293 @@
+"""Authentication throughput benchmark and capacity report.
+
+Measures, per Argon2 parameter set:
+
+- ``hash``/``verify`` throughput on a thread pool at several concurrencies
+  (argon2-cffi releases the GIL, so threads show how it scales over cores),
+- ``/api/auth/register`` and ``/api/auth/login`` through the ASGI app on one
+  event loop, i.e. what a single worker process serves,
+
+and once the per-request JWT cost (``create_access_token`` on login,
+``decode_access_token`` on every authenticated request, ``/api/auth/me``).
+It ends with a capacity table: logins/s per core and per worker.
+
+Usage:
+    python -m benchmarks.auth --params default,owasp --concurrency 1,2,4
+    python -m benchmarks.auth --params t=2,m=19456,p=1 --json auth.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import Any
+
+import httpx
+from argon2 import Parameters, PasswordHasher, profiles
+
+from app.core import security
+
+PASSWORD = "correct horse battery"
+
+PARAMETER_SETS = {
+    # PasswordHasher() defaults, what the app uses
+    "default": profiles.RFC_9106_LOW_MEMORY,
+    # OWASP minimum: 19 MiB, 2 iterations, 1 lane
+    "owasp": replace(
+        profiles.RFC_9106_LOW_MEMORY, time_cost=2, memory_cost=19456, parallelism=1
+    ),
+    "pre_21_2": profiles.PRE_21_2,
+    "high_memory": profiles.RFC_9106_HIGH_MEMORY,
+}
+
+
+def parse_parameters(spec: str) -> tuple[str, Parameters]:
+    """A named parameter set, or ``t=TIME,m=MEMORY_KIB,p=LANES``."""
+    if spec in PARAMETER_SETS:
+        return spec, PARAMETER_SETS[spec]
+    values = dict(part.split("=", 1) for part in spec.split(","))
+    try:
+        return spec, replace(
+            profiles.RFC_9106_LOW_MEMORY,
+            time_cost=int(values["t"]),
+            memory_cost=int(values["m"]),
+            parallelism=int(values["p"]),
+        )
+    except (KeyError, ValueError):
+        raise ValueError(f"Invalid Argon2 parameters: {spec!r}") from None
+
+
+def _summarize(latencies: list[float], elapsed: float) -> dict[str, float]:
+    ordered = sorted(latencies)
+
+    def at(p: float) -> float:
+        return round(ordered[min(int(len(ordered) * p), len(ordered) - 1)] * 1000, 2)
+
+    return {
+        "ops": len(ordered),
+        "ops_per_second": round(len(ordered) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2),
+        "p50_ms": at(0.5),
+        "p99_ms": at(0.99),
+    }
+
+
+def _threaded(fn: Callable[[], Any], concurrency: int, duration: float) -> dict:
+    """Call ``fn`` from ``concurrency`` threads for ``duration`` seconds."""
+    stop_at = time.perf_counter() + duration
+
+    def worker() -> list[float]:
+        samples = []
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - start)
+        return samples
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(lambda _: worker(), range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return _summarize([s for samples in results for s in samples], elapsed)
+
+
+def primitives(params: Parameters, concurrency: list[int], duration: float):
+    """Hash and verify throughput at each thread count."""
+    hasher = PasswordHasher.from_parameters(params)
+    stored = hasher.hash(PASSWORD)
+    return {
+        "hash": {
+            str(c): _threaded(lambda: hasher.hash(PASSWORD), c, duration)
+            for c in concurrency
+        },
+        "verify": {
+            str(c): _threaded(lambda: hasher.verify(stored, PASSWORD), c, duration)
+            for c in concurrency
+        },
+    }
+
+
+def jwt_costs(duration: float) -> dict:
+    """Single-threaded cost of issuing and verifying an access token."""
+    token = security.create_access_token({"sub": "bench-user"})
+    return {
+        "create_access_token": _threaded(
+            lambda: security.create_access_token({"sub": "bench-user"}), 1, duration
+        ),
+        "decode_access_token": _threaded(
+            lambda: security.decode_access_token(token), 1, duration
+        ),
+    }
+
+
+async def _drive(send: Callable[[int], Any], concurrency: int, duration: float) -> dict:
+    """Closed-loop ASGI requests from ``concurrency`` tasks."""
+    latencies: list[float] = []
+    errors = 0
+    counter = 0
+    stop_at = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors, counter
+        while time.perf_counter() < stop_at:
+            counter += 1
+            start = time.perf_counter()
+            response = await send(counter)
+            if response.status_code >= 400:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    summary = _summarize(latencies, time.perf_counter() - start)
+    summary["errors"] = errors
+    return summary
+
+
+async def endpoints(
+    params: Parameters | None, concurrency: list[int], duration: float
+) -> dict:
+    """Auth endpoints through the ASGI app, as one worker serves them."""
+    # Imported here: the database engine reads settings on import
+    from fastapi import FastAPI
+
+    from app.api.auth import router as auth_router
+    from app.db.database import close_db, init_db
+
+    app = FastAPI()
+    app.include_router(auth_router, prefix="/api")
+    await init_db()
+    app_hasher = security._password_hasher
+    if params is not None:
+        security._password_hasher = PasswordHasher.from_parameters(params)
+
+    transport = httpx.ASGITransport(app=app)
+    results: dict[str, dict] = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://app") as c:
+        prefix = f"u{time.monotonic_ns()}"
+        response = await c.post(
+            "/api/auth/register", json={"username": prefix, "password": PASSWORD}
+        )
+        response.raise_for_status()
+        login = {"username": prefix, "password": PASSWORD}
+        token = (await c.post("/api/auth/login", data=login)).json()["access_token"]
+
+        if params is None:
+            me_headers = {"Authorization": f"Bearer {token}"}
+            results["me"] = {
+                str(n): await _drive(
+                    lambda _: c.get("/api/auth/me", headers=me_headers), n, duration
+                )
+                for n in concurrency
+            }
+        else:
+            results["register"] = {
+                str(n): await _drive(
+                    lambda i: c.post(
+                        "/api/auth/register",
+                        json={"username": f"{prefix}-{n}-{i}", "password": PASSWORD},
+                    ),
+                    n,
+                    duration,
+                )
+                for n in concurrency
+            }
+            results["login"] = {
+                str(n): await _drive(
+                    lambda _: c.post("/api/auth/login", data=login), n, duration
+                )
+                for n in concurrency
+            }
+    security._password_hasher = app_hasher
+    await close_db()
+    return results
+
+
+def capacity_table(report: dict) -> list[str]:
+    """Human-readable sizing summary of a report."""
+    cores = os.cpu_count() or 1
+    lines = [
+        f"Capacity ({cores} CPU cores visible)",
+        f"{'parameters':<22}{'verify ms':>10}{'logins/s/core':>15}"
+        f"{'logins/s/worker':>17}{'threads best':>14}",
+    ]
+    for name, result in report["argon2"].items():
+        single = result["primitives"]["verify"]["1"]
+        best = max(
+            result["primitives"]["verify"].values(), key=lambda s: s["ops_per_second"]
+        )
+        worker = max(
+            result["endpoints"]["login"].values(), key=lambda s: s["ops_per_second"]
+        )
+        lines.append(
+            f"{name:<22}{single['mean_ms']:>10.1f}{single['ops_per_second']:>15.1f}"
+            f"{worker['ops_per_second']:>17.1f}{best['ops_per_second']:>14.1f}"
+        )
+    jwt = report["jwt"]["decode_access_token"]
+    lines.append(
+        f"JWT verification: {jwt['mean_ms'] * 1000:.0f} us/request "
+        f"(~{jwt['ops_per_second']:.0f} requests/s per core)"
+    )
+    me = max(report["me"]["me"].values(), key=lambda s: s["ops_per_second"])
+    lines.append(f"/api/auth/me: {me['ops_per_second']:.0f} requests/s per worker")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--params",
+        default="default,owasp",
+        help=f"Comma-separated sets ({', '.join(PARAMETER_SETS)}) or t=,m=,p= "
+        "specs separated by ';'",
+    )
+    parser.add_argument("--concurrency", default="1,2,4", help="Threads / clients")
+    parser.add_argument(
+        "--duration", type=float, default=3.0, help="Seconds per measurement"
+    )
+    parser.add_argument("--json", type=Path, help="Also write the report here")
+    args = parser.parse_args()
+
+    specs = args.params.split(";") if "=" in args.params else args.params.split(",")
+    parameter_sets = [parse_parameters(spec) for spec in specs]
+    concurrency = [int(c) for c in args.concurrency.split(",")]
+
+    with tempfile.TemporaryDirectory(prefix="auth-bench-") as tmp:
+        os.environ.update(
+            {
+                "DATABASE_PATH": f"{tmp}/app.db",
+                "CACHE_PATH": f"{tmp}/cache.db",
+                "BLOB_CACHE_DIR": f"{tmp}/blobs",
+            }
+        )
+        report: dict[str, Any] = {"cpu_count": os.cpu_count(), "argon2": {}}
+        for name, params in parameter_sets:
+            print(f"== Argon2 {name}: {params}", flush=True)
+            report["argon2"][name] = {
+                "parameters": {
+                    "time_cost": params.time_cost,
+                    "memory_kib": params.memory_cost,
+                    "parallelism": params.parallelism,
+                },
+                "primitives": primitives(params, concurrency, args.duration),
+                "endpoints": asyncio.run(endpoints(params, concurrency, args.duration)),
+            }
+        print("== JWT", flush=True)
+        report["jwt"] = jwt_costs(args.duration)
+        report["me"] = asyncio.run(endpoints(None, concurrency, args.duration))
+
+    report["capacity"] = capacity_table(report)
+    print("\n".join(report["capacity"]))
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Compare two micro-benchmark result files.
+
+Usage:
+    python -m benchmarks.compare .benchmarks/base.json .benchmarks/new.json
+
+Compares median per-call times and exits with status 1 when any benchmark
+got slower by more than ``--threshold`` percent.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+
+def _format(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def compare(
+    base: dict[str, Any], new: dict[str, Any], threshold: float
+) -> tuple[list[tuple[str, str, str, str]], list[str]]:
+    """Table rows (name, base, new, change) and the names that regressed."""
+    rows, regressions = [], []
+    names = sorted(set(base["benchmarks"]) | set(new["benchmarks"]))
+    for name in names:
+        old = base["benchmarks"].get(name)
+        cur = new["benchmarks"].get(name)
+        if old is None or cur is None:
+            rows.append(
+                (
+                    name,
+                    _format(old["median"]) if old else "-",
+                    _format(cur["median"]) if cur else "-",
+                    "new" if old is None else "removed",
+                )
+            )
+            continue
+        change = (cur["median"] - old["median"]) / old["median"] * 100
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        rows.append(
+            (
+                name,
+                _format(old["median"]),
+                _format(cur["median"]),
+                f"{change:+.1f}%{flag}",
+            )
+        )
+    return rows, regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base", type=Path)
+    parser.add_argument("new", type=Path)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="Slowdown in percent reported as a regression",
+    )
+    args = parser.parse_args()
+
+    base = json.loads(args.base.read_text())
+    new = json.loads(args.new.read_text())
+    rows, regressions = compare(base, new, args.threshold)
+
+    header = ("benchmark", base.get("commit", "base"), new.get("commit", "new"), "")
+    widths = [max(len(row[i]) for row in [header, *rows]) for i in range(3)]
+    for row in [header, *rows]:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)), row[3])
+    if base.get("machine") != new.get("machine"):
+        print("\nNote: results come from different machines or Python versions")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Micro-benchmark harness: a ``bench`` fixture writing results as JSON.
+
+Run with ``pytest benchmarks`` (they are not part of the default test run).
+Each benchmark is calibrated to rounds of at least ``MIN_ROUND_SECONDS``
+and repeated, and the per-call timings of all benchmarks are written to
+``--bench-json`` (default ``.benchmarks/<commit>.json``) for
+``python -m benchmarks.compare``.
+"""
+
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+MIN_ROUND_SECONDS = 0.05
+ROUNDS = 7
+
+_results_key = pytest.StashKey[dict]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--bench-json",
+        type=Path,
+        help="Where to write benchmark results (default .benchmarks/<commit>.json)",
+    )
+    parser.addoption(
+        "--bench-rounds", type=int, default=ROUNDS, help="Timed rounds per benchmark"
+    )
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class Bench:
+    """Times a callable and records per-call statistics under a name."""
+
+    def __init__(self, name: str, rounds: int, results: dict[str, Any]):
+        self.name = name
+        self.rounds = rounds
+        self._results = results
+
+    def __call__(self, fn: Callable[[], Any]) -> Any:
+        number = 1
+        while True:
+            elapsed = self._time(fn, number)
+            if elapsed >= MIN_ROUND_SECONDS:
+                break
+            number *= 10 if elapsed < MIN_ROUND_SECONDS / 10 else 2
+        timings = [elapsed / number]
+        timings += [self._time(fn, number) / number for _ in range(self.rounds - 1)]
+        self._results[self.name] = {
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "mean": statistics.fmean(timings),
+            "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+            "rounds": len(timings),
+            "iterations": number,
+        }
+        return fn()
+
+    def coroutine(self, make: Callable[[], Any]) -> Any:
+        """Time a coroutine function on a private event loop."""
+        loop = asyncio.new_event_loop()
+        try:
+            return self(lambda: loop.run_until_complete(make()))
+        finally:
+            loop.close()
+
+    @staticmethod
+    def _time(fn: Callable[[], Any], number: int) -> float:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        return time.perf_counter() - start
+
+
+@pytest.fixture(scope="session")
+def bench_results(request: pytest.FixtureRequest) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    request.config.stash[_results_key] = results
+    return results
+
+
+@pytest.fixture
+def bench(request: pytest.FixtureRequest, bench_results: dict[str, Any]) -> Bench:
+    """Benchmark the given callable, e.g. ``bench(lambda: parse(data))``."""
+    return Bench(
+        request.node.name, request.config.getoption("--bench-rounds"), bench_results
+    )
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    results = session.config.stash.get(_results_key, None)
+    if not results:
+        return
+    commit = _commit()
+    path = session.config.getoption("--bench-json") or (
+        BACKEND_DIR / ".benchmarks" / f"{commit}.json"
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "commit": commit,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": {
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "processor": platform.machine(),
+        },
+        "unit": "seconds per call",
+        "benchmarks": dict(sorted(results.items())),
+    }
+    path.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\nBenchmark results written to {path}")
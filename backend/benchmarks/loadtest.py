@@ -0,0 +1,358 @@
+"""Open-loop load test of the relay against the stub JIRA server.
+
+Starts the stub JIRA (``benchmarks.stub_jira``) and the real app with
+uvicorn workers in a scratch data directory, registers a user with a
+connection pointing at the stub, then sends requests through
+``/api/jira/{connection_id}/rest/api/3/...`` at a fixed arrival rate.
+
+Arrivals follow the schedule, not the responses (open loop): a slow server
+does not slow the load down, and each latency is measured from the moment
+the request was due, so queueing shows up in the percentiles instead of
+being hidden (no coordinated omission).
+
+Usage:
+    python -m benchmarks.loadtest --rps 100 --duration 30 --workers 2 \\
+        --latency lognormal:120,0.6 --error-rate 0.01 --json results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import httpx
+from cryptography.fernet import Fernet
+
+from benchmarks.stub_jira import add_arguments
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Importing app.main registers every model before create_all runs
+_INIT_DB = """
+import asyncio
+import app.main
+from app.db.database import close_db, init_db
+
+async def main():
+    await init_db()
+    await close_db()
+
+asyncio.run(main())
+"""
+
+# Request mix keys -> relay path below /rest/api/3
+_REQUESTS = {
+    "issue": lambda: f"/issue/LOAD-{random.randrange(1000)}",
+    "search": lambda: "/search/jql?jql=project%3DLOAD&maxResults=50",
+    "myself": lambda: "/myself",
+}
+
+
+@dataclass
+class Results:
+    """Outcome of a load test run."""
+
+    scheduled: int = 0
+    latencies: list[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: Counter = field(default_factory=Counter)
+    late_starts: int = 0  # Requests the generator itself sent late (>10 ms)
+    elapsed: float = 0.0
+    rss: dict[int, dict[str, int]] = field(default_factory=dict)
+
+    def percentile(self, p: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)]
+
+    def summary(self) -> dict[str, Any]:
+        completed = len(self.latencies)
+        return {
+            "scheduled": self.scheduled,
+            "completed": completed,
+            "throughput_rps": round(completed / self.elapsed, 1) if self.elapsed else 0,
+            "latency_ms": {
+                name: round(self.percentile(p) * 1000, 1)
+                for name, p in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100))
+            },
+            "statuses": dict(sorted(self.statuses.items())),
+            "errors": dict(self.errors),
+            "late_starts": self.late_starts,
+            "worker_rss_mb": {
+                str(pid): {k: round(v / 1024, 1) for k, v in rss.items()}
+                for pid, rss in self.rss.items()
+            },
+        }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _rss_kb(pid: int) -> int | None:
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def _process_tree(pid: int) -> list[int]:
+    """The server process and its (uvicorn worker) children, Linux only."""
+    pids = [pid]
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as children:
+                pids.extend(int(child) for child in children.read().split())
+    except OSError:
+        pass
+    return pids
+
+
+async def _sample_memory(pid: int, results: Results, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        for child in _process_tree(pid):
+            rss = _rss_kb(child)
+            if rss is None:
+                continue
+            entry = results.rss.setdefault(child, {"start": rss, "peak": rss})
+            entry["peak"] = max(entry["peak"], rss)
+            entry["end"] = rss
+        try:
+            await asyncio.wait_for(stop.wait(), 0.5)
+        except asyncio.TimeoutError:
+            pass
+
+
+def _parse_mix(spec: str) -> tuple[list[str], list[float]]:
+    names, weights = [], []
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in _REQUESTS:
+            raise ValueError(f"Unknown request kind {name!r} in --mix")
+        names.append(name)
+        weights.append(float(weight or 1))
+    return names, weights
+
+
+async def _wait_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                if (await client.get(url)).status_code < 500:
+                    return
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{url} did not come up within {timeout}s")
+            await asyncio.sleep(0.2)
+
+
+async def _setup(base_url: str, stub_url: str) -> tuple[str, str]:
+    """Create a user and a connection to the stub; returns (token, id)."""
+    username = f"load-{random.randrange(1 << 30)}"
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        response = await client.post(
+            "/api/auth/register", json={"username": username, "password": "loadtest1"}
+        )
+        response.raise_for_status()
+        response = await client.post(
+            "/api/auth/login", data={"username": username, "password": "loadtest1"}
+        )
+        response.raise_for_status()
+        token = response.json()["access_token"]
+        response = await client.post(
+            "/api/users/connections",
+            headers={"Authorization": f"Bearer {token}"},
+            json={
+                "name": "Load test stub",
+                "jira_url": stub_url,
+                "email": "load@example.com",
+                "api_token": "stub-token",
+            },
+        )
+        response.raise_for_status()
+        return token, response.json()["id"]
+
+
+async def run_load(
+    results: Results,
+    base_url: str,
+    token: str,
+    connection_id: str,
+    rps: float,
+    duration: float,
+    mix: str,
+    poisson: bool,
+    priority: str | None,
+) -> None:
+    """Drive open-loop traffic, recording per-request outcomes."""
+    names, weights = _parse_mix(mix)
+    headers = {"Authorization": f"Bearer {token}"}
+    if priority:
+        headers["X-Request-Priority"] = priority
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=200)
+    prefix = f"/api/jira/{connection_id}/rest/api/3"
+
+    async with httpx.AsyncClient(
+        base_url=base_url, headers=headers, limits=limits, timeout=130
+    ) as client:
+
+        async def one(due: float, path: str) -> None:
+            try:
+                response = await client.get(prefix + path)
+                results.statuses[response.status_code] += 1
+            except httpx.HTTPError as e:
+                results.errors[type(e).__name__] += 1
+                return
+            results.latencies.append(time.perf_counter() - due)
+
+        tasks = []
+        start = time.perf_counter()
+        due = start
+        while due - start < duration:
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif delay < -0.01:
+                results.late_starts += 1
+            kind = random.choices(names, weights)[0]
+            tasks.append(asyncio.create_task(one(due, _REQUESTS[kind]())))
+            results.scheduled += 1
+            due += random.expovariate(rps) if poisson else 1 / rps
+        await asyncio.gather(*tasks)
+        results.elapsed = time.perf_counter() - start
+
+
+def _start(args: list[str], env: dict[str, str], log: Path) -> subprocess.Popen:
+    with open(log, "ab") as output:
+        return subprocess.Popen(
+            [sys.executable, *args],
+            cwd=BACKEND_DIR,
+            env={**os.environ, **env},
+            stdout=output,
+            stderr=subprocess.STDOUT,
+        )
+
+
+async def main_async(args: argparse.Namespace) -> dict[str, Any]:
+    stub_port, app_port = _free_port(), _free_port()
+    stub_url = f"http://127.0.0.1:{stub_port}"
+    base_url = f"http://127.0.0.1:{app_port}"
+    stub_args = [
+        "--latency", args.latency,
+        "--error-rate", str(args.error_rate),
+        "--rate-limit-rate", str(args.rate_limit_rate),
+        "--page-size", str(args.page_size),
+        "--description-bytes", str(args.description_bytes),
+        "--total-issues", str(args.total_issues),
+    ]  # fmt: skip
+
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as data_dir:
+        env = {
+            "DATABASE_PATH": f"{data_dir}/app.db",
+            "CACHE_PATH": f"{data_dir}/cache.db",
+            "BLOB_CACHE_DIR": f"{data_dir}/blobs",
+            # Workers must agree on keys to accept each other's tokens
+            "SECRET_KEY": "loadtest-secret",
+            "ENCRYPTION_KEY": Fernet.generate_key().decode(),
+            "PREWARM_ENABLED": "false",
+            "OUTBOX_ENABLED": "false",
+        }
+        # Create the schema once; workers racing on create_all would fail
+        subprocess.run(
+            [sys.executable, "-c", _INIT_DB],
+            cwd=BACKEND_DIR,
+            env={**os.environ, **env},
+            check=True,
+        )
+        log = Path(args.log or f"{data_dir}/servers.log")
+        stub_args = ["-m", "benchmarks.stub_jira", "--port", str(stub_port), *stub_args]
+        processes = [
+            _start(stub_args, {}, log),
+            _start(
+                [
+                    "-m", "uvicorn", "app.main:app",
+                    "--port", str(app_port),
+                    "--workers", str(args.workers),
+                    "--log-level", "warning",
+                ],
+                env,
+                log,
+            ),
+        ]  # fmt: skip
+        try:
+            await _wait_ready(f"{stub_url}/rest/api/3/myself")
+            await _wait_ready(f"{base_url}/health")
+            token, connection_id = await _setup(base_url, stub_url)
+
+            results = Results()
+            stop = asyncio.Event()
+            sampler = asyncio.create_task(
+                _sample_memory(processes[1].pid, results, stop)
+            )
+            await run_load(
+                results,
+                base_url,
+                token,
+                connection_id,
+                args.rps,
+                args.duration,
+                args.mix,
+                args.poisson,
+                args.priority,
+            )
+            stop.set()
+            await sampler
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.wait(timeout=10)
+    return results.summary()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rps", type=float, default=50, help="Target arrival rate")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds")
+    parser.add_argument("--workers", type=int, default=1, help="App workers")
+    parser.add_argument(
+        "--mix",
+        default="issue=6,search=3,myself=1",
+        help="Weighted request kinds: issue, search, myself",
+    )
+    parser.add_argument(
+        "--poisson", action="store_true", help="Poisson instead of even arrivals"
+    )
+    parser.add_argument("--priority", help="X-Request-Priority for all requests")
+    parser.add_argument("--json", type=Path, help="Also write the summary here")
+    parser.add_argument("--log", help="Server output file (default: discarded)")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    summary = asyncio.run(main_async(args))
+    print(json.dumps(summary, indent=2))
+    if args.json:
+        args.json.write_text(json.dumps(summary, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""Scale benchmark of the mock JIRA with synthetic datasets.
+
+Fills the mock JIRA store with synthetic issues (ADF descriptions, labels,
+comment threads) and measures, for each store size, the memory the issues
+take and the latency of create, get, update, search (all issues, and filtered
+on status, label and updated) and comment requests through the ASGI stack
+(routing and JSON serialization included).
+
+Usage:
+    python -m benchmarks.mock_jira_scale --sizes 10000,100000 --json scale.json
+    python -m benchmarks.mock_jira_scale --sizes 1000000 --search-ops 5
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+import httpx
+from fastapi import FastAPI
+
+from app.services.mock_jira import mock_jira_router, reset_storage
+from app.services.mock_jira import router as mock_jira
+from app.services.mock_jira.models import DEFAULT_TRANSITIONS
+
+BASE_URL = "http://mock/rest/api/3"
+
+_WORDS = (
+    "sync offline board issue sprint release backend frontend cache token "
+    "relay search index conflict merge draft review deploy migration schema "
+    "latency timeout retry user connection project label comment status "
+    "priority assignee reporter epic story bug task subtask estimate"
+).split()
+_LABELS = [f"{area}-{n}" for area in ("team", "area", "customer") for n in range(20)]
+_PEOPLE = [f"User {n}" for n in range(50)]
+_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    text = " ".join(rng.choice(_WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def _adf(rng: random.Random, paragraphs: int) -> dict[str, Any]:
+    """An ADF document with paragraphs and, sometimes, a bullet list."""
+    content: list[dict[str, Any]] = [
+        {
+            "type": "paragraph",
+            "content": [{"type": "text", "text": _sentence(rng, rng.randint(8, 40))}],
+        }
+        for _ in range(paragraphs)
+    ]
+    if rng.random() < 0.3:
+        content.append(
+            {
+                "type": "bulletList",
+                "content": [
+                    {
+                        "type": "listItem",
+                        "content": [
+                            {
+                                "type": "paragraph",
+                                "content": [
+                                    {"type": "text", "text": _sentence(rng, 6)}
+                                ],
+                            }
+                        ],
+                    }
+                    for _ in range(rng.randint(2, 5))
+                ],
+            }
+        )
+    return {"type": "doc", "version": 1, "content": content}
+
+
+def _timestamp(moment: datetime) -> str:
+    return moment.isoformat(timespec="milliseconds")
+
+
+def synthetic_issue(number: int, rng: random.Random) -> dict[str, Any]:
+    """A mock JIRA issue shaped like the ones create_issue stores."""
+    created = _EPOCH + timedelta(minutes=rng.randrange(365 * 24 * 60))
+    updated = created + timedelta(minutes=rng.randrange(30 * 24 * 60))
+    comments = []
+    for n in range(min(int(rng.expovariate(1 / 2)), 20)):
+        moment = _timestamp(created + timedelta(hours=n + 1))
+        comments.append(
+            {
+                "id": str(number * 100 + n),
+                "body": _adf(rng, rng.randint(1, 2)),
+                "author": {"displayName": rng.choice(_PEOPLE)},
+                "created": moment,
+                "updated": moment,
+            }
+        )
+    key = f"TEST-{number}"
+    return {
+        "id": str(number),
+        "key": key,
+        "self": f"http://localhost:8000/rest/api/3/issue/{key}",
+        "fields": {
+            "summary": _sentence(rng, rng.randint(4, 12)),
+            "description": _adf(rng, rng.randint(1, 6)),
+            "issuetype": {"name": rng.choice(["Task", "Bug", "Story"])},
+            "project": {"key": "TEST"},
+            "status": rng.choice(DEFAULT_TRANSITIONS)["to"],
+            "priority": {"name": rng.choice(["Low", "Medium", "High"])},
+            "assignee": {"displayName": rng.choice(_PEOPLE)}
+            if rng.random() < 0.7
+            else None,
+            "reporter": {"displayName": rng.choice(_PEOPLE)},
+            "labels": rng.sample(_LABELS, rng.randint(0, 4)),
+            "created": _timestamp(created),
+            "updated": _timestamp(updated),
+            "comment": {"comments": comments, "total": len(comments)},
+        },
+    }
+
+
+def fill_store(count: int, seed: int = 0) -> None:
+    """Replace the mock JIRA store with ``count`` synthetic issues."""
+    reset_storage()
+    rng = random.Random(seed)
+    mock_jira._issues.add_many(
+        synthetic_issue(number, rng) for number in range(1, count + 1)
+    )
+
+
+def _rss_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def _summarize(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+
+    def at(p: float) -> float:
+        return round(ordered[min(int(len(ordered) * p), len(ordered) - 1)] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": at(0.5),
+        "p99_ms": at(0.99),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+async def _measure(
+    client: httpx.AsyncClient,
+    count: int,
+    ops: int,
+    search_ops: int,
+    rng: random.Random,
+) -> dict[str, dict[str, float]]:
+    def key() -> str:
+        return f"TEST-{rng.randint(1, count)}"
+
+    requests = {
+        "get": lambda: client.get(f"/issue/{key()}"),
+        "update": lambda: client.put(
+            f"/issue/{key()}",
+            json={
+                "fields": {
+                    "summary": _sentence(rng, 6),
+                    "description": _adf(rng, 2),
+                }
+            },
+        ),
+        "comment": lambda: client.post(
+            f"/issue/{key()}/comment", json={"body": _adf(rng, 1)}
+        ),
+        "search": lambda: client.get(
+            "/search/jql",
+            params={"jql": "project = TEST ORDER BY updated DESC", "maxResults": 50},
+        ),
+        "search_filtered": lambda: client.get(
+            "/search/jql",
+            params={
+                "jql": 'status = "In Progress" AND labels = team-1 '
+                'AND updated >= "2024-06-01" ORDER BY updated ASC',
+                "maxResults": 50,
+            },
+        ),
+        "create": lambda: client.post(
+            "/issue",
+            json={
+                "fields": {
+                    "summary": _sentence(rng, 6),
+                    "description": _adf(rng, 3),
+                    "project": {"key": "TEST"},
+                }
+            },
+        ),
+    }
+    results = {}
+    for name, send in requests.items():
+        samples = []
+        for _ in range(search_ops if name.startswith("search") else ops):
+            start = time.perf_counter()
+            response = await send()
+            samples.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{name} failed: {response.status_code}")
+        results[name] = _summarize(samples)
+    return results
+
+
+async def run_size(
+    count: int, ops: int, search_ops: int, trace: bool, seed: int
+) -> dict[str, Any]:
+    """Fill the store with ``count`` issues, then measure memory and latency."""
+    reset_storage()
+    gc.collect()
+    rss_before = _rss_bytes()
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    fill_store(count, seed)
+    fill_seconds = time.perf_counter() - start
+    gc.collect()
+    memory: dict[str, Any] = {}
+    if trace:
+        traced, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        memory["traced_bytes_per_issue"] = round(traced / count)
+    rss_after = _rss_bytes()
+    if rss_before is not None and rss_after is not None:
+        memory["rss_delta_mb"] = round((rss_after - rss_before) / 2**20, 1)
+        memory["rss_bytes_per_issue"] = round((rss_after - rss_before) / count)
+
+    app = FastAPI()
+    app.include_router(mock_jira_router)
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url=BASE_URL
+    ) as client:
+        operations = await _measure(
+            client, count, ops, search_ops, random.Random(seed + 1)
+        )
+    reset_storage()
+    return {
+        "issues": count,
+        "fill_seconds": round(fill_seconds, 2),
+        "memory": memory,
+        "operations": operations,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        default="10000,100000",
+        help="Comma-separated store sizes, e.g. 10000,100000,1000000",
+    )
+    parser.add_argument("--ops", type=int, default=200, help="Requests per operation")
+    parser.add_argument(
+        "--search-ops", type=int, default=20, help="Search requests per size"
+    )
+    parser.add_argument(
+        "--tracemalloc",
+        action="store_true",
+        help="Also count traced Python allocations (slower; inflates the RSS figures)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="Also write the results here")
+    args = parser.parse_args()
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        result = asyncio.run(
+            run_size(size, args.ops, args.search_ops, args.tracemalloc, args.seed)
+        )
+        print(json.dumps(result), flush=True)
+        results.append(result)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Worker startup report: import time per module and time to first response.
+
+``imports`` runs ``python -X importtime -c "import app.main"`` and sums the
+self time of each module, grouped by top-level package except for the app's
+own modules. ``ready`` starts a uvicorn worker on a fresh data directory
+and polls ``/health`` until it answers, then reads the lifespan step
+timings from ``/metrics``. Each is repeated and the median is reported.
+
+Usage:
+    python -m benchmarks.startup imports --repeat 5 --top 25
+    python -m benchmarks.startup ready --repeat 5
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+_BACKEND = Path(__file__).resolve().parent.parent
+
+_IMPORTTIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+_STARTUP_METRIC = re.compile(r'^worker_startup_seconds\{step="([^"]+)"\} (\S+)$')
+
+
+def _environment(tmp: str) -> dict[str, str]:
+    return {
+        **os.environ,
+        "DATABASE_PATH": f"{tmp}/app.db",
+        "CACHE_PATH": f"{tmp}/cache.db",
+        "BLOB_CACHE_DIR": f"{tmp}/blobs",
+        "PREWARM_ENABLED": "false",
+    }
+
+
+def _group(module: str) -> str:
+    return module if module.startswith("app.") else module.split(".")[0]
+
+
+def import_times(env: dict[str, str]) -> tuple[dict[str, float], float]:
+    """Self import time in ms per module group, and the total."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=_BACKEND,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    groups: dict[str, float] = defaultdict(float)
+    total = 0.0
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        groups[_group(module)] += int(self_us) / 1000
+        if not indent:
+            total += int(cumulative_us) / 1000
+    return groups, total
+
+
+def run_imports(repeat: int, top: int) -> dict:
+    runs: dict[str, list[float]] = defaultdict(list)
+    totals = []
+    with tempfile.TemporaryDirectory(prefix="startup-bench-") as tmp:
+        env = _environment(tmp)
+        for _ in range(repeat):
+            groups, total = import_times(env)
+            totals.append(total)
+            for group, ms in groups.items():
+                runs[group].append(ms)
+    medians = {group: statistics.median(ms) for group, ms in runs.items()}
+    ranked = sorted(medians.items(), key=lambda item: item[1], reverse=True)
+    print(f"Total import time (median of {repeat}): {statistics.median(totals):.0f} ms")
+    print(f"{'module / package':<48}{'self ms':>10}")
+    for group, ms in ranked[:top]:
+        print(f"{group:<48}{ms:>10.1f}")
+    return {"total_ms": statistics.median(totals), "modules_ms": dict(ranked)}
+
+
+def time_to_ready(env: dict[str, str], port: int, timeout: float) -> dict:
+    """Start one worker and time it until /health answers."""
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=_BACKEND,
+        env=env,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+            while True:
+                if time.perf_counter() - started > timeout:
+                    raise TimeoutError("Worker did not become ready")
+                try:
+                    if client.get("/health").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    time.sleep(0.01)
+            ready = time.perf_counter() - started
+            steps = {}
+            for line in client.get("/metrics").text.splitlines():
+                match = _STARTUP_METRIC.match(line)
+                if match:
+                    steps[match.group(1)] = float(match.group(2))
+    finally:
+        server.terminate()
+        server.wait()
+    return {"first_response_seconds": ready, "steps_seconds": steps}
+
+
+def run_ready(repeat: int, port: int, timeout: float, fresh: bool) -> dict:
+    runs = []
+    with tempfile.TemporaryDirectory(prefix="startup-bench-") as tmp:
+        for n in range(repeat):
+            data = Path(tmp) / (str(n) if fresh else "shared")
+            data.mkdir(exist_ok=True)
+            runs.append(time_to_ready(_environment(str(data)), port, timeout))
+    first = statistics.median(r["first_response_seconds"] for r in runs)
+    steps = {
+        step: statistics.median(r["steps_seconds"].get(step, 0.0) for r in runs)
+        for step in runs[-1]["steps_seconds"]
+    }
+    state = "fresh" if fresh else "existing"
+    print(f"First /health response (median of {repeat}, {state} database):")
+    print(f"  {first * 1000:.0f} ms after spawning the worker")
+    for step, seconds in steps.items():
+        print(f"  {step:<22}{seconds * 1000:>8.0f} ms")
+    return {"first_response_seconds": first, "steps_seconds": steps, "runs": runs}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("mode", choices=["imports", "ready"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=25, help="Modules to list")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="New database per run (first boot), instead of a restart",
+    )
+    parser.add_argument("--json", type=Path, help="Also write the report here")
+    args = parser.parse_args()
+
+    if args.mode == "imports":
+        report = run_imports(args.repeat, args.top)
+    else:
+        report = run_ready(args.repeat, args.port, args.timeout, args.fresh)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Stub JIRA server with configurable latency, errors and payload sizes.
+
+Stands in for a real JIRA when load testing the relay: every response is
+delayed by a sample from a latency distribution, a share of requests fails,
+and search pages carry a chosen number of issues of a chosen size. Nothing
+is stored, so the stub itself never becomes the bottleneck.
+
+Usage:
+    python -m benchmarks.stub_jira --port 9100 --latency lognormal:80,0.6
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi import FastAPI, Request, Response
+
+
+@dataclass
+class Latency:
+    """Latency distribution in milliseconds.
+
+    Spec formats: ``fixed:MS``, ``uniform:LOW,HIGH``, ``exp:MEAN`` and
+    ``lognormal:MEDIAN,SIGMA``.
+    """
+
+    kind: str
+    params: tuple[float, ...]
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        kind, _, raw = spec.partition(":")
+        params = tuple(float(p) for p in raw.split(",") if p)
+        expected = {"fixed": 1, "uniform": 2, "exp": 1, "lognormal": 2}
+        if expected.get(kind) != len(params):
+            raise ValueError(f"Invalid latency spec: {spec!r}")
+        return cls(kind, params)
+
+    def sample(self) -> float:
+        """One latency in seconds."""
+        if self.kind == "fixed":
+            ms = self.params[0]
+        elif self.kind == "uniform":
+            ms = random.uniform(*self.params)
+        elif self.kind == "exp":
+            ms = random.expovariate(1 / self.params[0]) if self.params[0] else 0.0
+        else:
+            median, sigma = self.params
+            ms = random.lognormvariate(math.log(median), sigma)
+        return max(ms, 0.0) / 1000
+
+
+@dataclass
+class StubProfile:
+    """Behaviour of the stub server."""
+
+    latency: Latency
+    error_rate: float = 0.0  # Share of requests answered with 503
+    rate_limit_rate: float = 0.0  # Share of requests answered with 429
+    page_size: int = 50  # Issues per search page
+    description_bytes: int = 512  # Size of each issue's description text
+    total_issues: int = 1000  # Reported search total; pages stop after it
+
+
+def issue_payload(number: int, profile: StubProfile) -> dict[str, Any]:
+    text = ("Lorem ipsum dolor sit amet " * (profile.description_bytes // 27 + 1))[
+        : profile.description_bytes
+    ]
+    return {
+        "id": str(10000 + number),
+        "key": f"LOAD-{number}",
+        "fields": {
+            "summary": f"Load test issue {number}",
+            "status": {"name": "To Do", "statusCategory": {"key": "new"}},
+            "priority": {"name": "Medium"},
+            "labels": ["load", f"bucket-{number % 10}"],
+            "updated": "2025-01-01T00:00:00.000+0000",
+            "description": {
+                "type": "doc",
+                "version": 1,
+                "content": [
+                    {"type": "paragraph", "content": [{"type": "text", "text": text}]}
+                ],
+            },
+        },
+    }
+
+
+def create_app(profile: StubProfile) -> FastAPI:
+    """Build the stub JIRA application."""
+    app = FastAPI()
+
+    async def respond(payload: Any, status_code: int = 200) -> Response:
+        await asyncio.sleep(profile.latency.sample())
+        roll = random.random()
+        if roll < profile.error_rate:
+            return Response(b'{"errorMessages": ["Stub failure"]}', 503)
+        if roll < profile.error_rate + profile.rate_limit_rate:
+            return Response(b"{}", 429, headers={"Retry-After": "1"})
+        return Response(
+            json.dumps(payload).encode(),
+            status_code,
+            media_type="application/json",
+        )
+
+    @app.get("/rest/api/{version}/myself")
+    async def myself(version: str):
+        return await respond({"accountId": "stub", "displayName": "Stub User"})
+
+    @app.get("/rest/api/{version}/search/jql")
+    @app.get("/rest/api/{version}/search")
+    async def search(version: str, request: Request):
+        start = int(request.query_params.get("nextPageToken") or 0)
+        size = min(
+            int(request.query_params.get("maxResults", profile.page_size)),
+            profile.page_size,
+        )
+        end = min(start + size, profile.total_issues)
+        payload: dict[str, Any] = {
+            "issues": [issue_payload(n, profile) for n in range(start, end)],
+            "total": profile.total_issues,
+        }
+        if end < profile.total_issues:
+            payload["nextPageToken"] = str(end)
+        return await respond(payload)
+
+    @app.get("/rest/api/{version}/issue/{key}")
+    async def get_issue(version: str, key: str):
+        number = int(key.rsplit("-", 1)[-1]) if key[-1:].isdigit() else 1
+        return await respond(issue_payload(number, profile))
+
+    @app.api_route(
+        "/rest/api/{version}/{path:path}", methods=["GET", "POST", "PUT", "DELETE"]
+    )
+    async def anything(version: str, path: str, request: Request):
+        if request.method == "POST":
+            return await respond({"id": "20000", "key": "LOAD-NEW"}, 201)
+        if request.method in ("PUT", "DELETE"):
+            await asyncio.sleep(profile.latency.sample())
+            return Response(status_code=204)
+        return await respond({})
+
+    return app
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Stub options, shared with the load test runner."""
+    parser.add_argument(
+        "--latency",
+        default="lognormal:80,0.5",
+        help="fixed:MS | uniform:LOW,HIGH | exp:MEAN | lognormal:MEDIAN,SIGMA",
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--description-bytes", type=int, default=512)
+    parser.add_argument("--total-issues", type=int, default=1000)
+
+
+def profile_from_args(args: argparse.Namespace) -> StubProfile:
+    return StubProfile(
+        latency=Latency.parse(args.latency),
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        page_size=args.page_size,
+        description_bytes=args.description_bytes,
+        total_issues=args.total_issues,
+    )
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    add_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(profile_from_args(args)),
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Tests for the admin memory diagnostics endpoints."""
+
+import tracemalloc
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import admin
+from app.config import get_settings
+from app.core.memory import MemoryProfiler
+from app.dependencies import get_current_user
+
+_retained: list[bytes] = []
+
+
+def _allocate() -> None:
+    _retained.extend(b"x" * 1000 + bytes([i % 256]) for i in range(2000))
+
+
+@pytest.fixture
+def profiler(monkeypatch: pytest.MonkeyPatch):
+    """A fresh profiler, with tracing stopped afterwards."""
+    fresh = MemoryProfiler(max_snapshots=2)
+    monkeypatch.setattr(admin, "memory_profiler", fresh)
+    yield fresh
+    fresh.stop()
+    _retained.clear()
+
+
+def _client(monkeypatch: pytest.MonkeyPatch, username: str) -> TestClient:
+    monkeypatch.setenv("ADMIN_USERNAMES", "root, ops")
+    get_settings.cache_clear()
+    app = FastAPI()
+    app.include_router(admin.router)
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(
+        id="u", username=username
+    )
+    return TestClient(app)
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch, profiler):
+    yield _client(monkeypatch, "ops")
+    get_settings.cache_clear()
+
+
+class TestAdminDiagnostics:
+    """Tests for the /admin/diagnostics endpoints."""
+
+    def test_non_admin_forbidden(self, monkeypatch: pytest.MonkeyPatch, profiler):
+        """Test that users not in admin_usernames are rejected."""
+        client = _client(monkeypatch, "alice")
+        try:
+            response = client.get("/admin/diagnostics/memory")
+        finally:
+            get_settings.cache_clear()
+
+        assert response.status_code == 403
+
+    def test_overview_reports_rss_and_gc(self, client: TestClient):
+        """Test that the overview works without tracing."""
+        data = client.get("/admin/diagnostics/memory").json()
+
+        assert data["tracing"] is False
+        assert data["rss_bytes"] is None or data["rss_bytes"] > 0
+        assert len(data["gc"]["counts"]) == 3
+
+    def test_snapshot_requires_tracing(self, client: TestClient):
+        """Test that snapshots need tracemalloc running."""
+        response = client.post("/admin/diagnostics/memory/snapshots")
+
+        assert response.status_code == 409
+
+    def test_diff_finds_growing_site(self, client: TestClient):
+        """Test that a diff between snapshots points at the allocating line."""
+        client.post("/admin/diagnostics/memory/tracemalloc/start")
+        base = client.post("/admin/diagnostics/memory/snapshots").json()["id"]
+        _allocate()
+        after = client.post("/admin/diagnostics/memory/snapshots").json()["id"]
+
+        diff = client.get(
+            f"/admin/diagnostics/memory/snapshots/{after}/diff/{base}"
+        ).json()["diff"]
+        top = client.get(f"/admin/diagnostics/memory/snapshots/{after}/top").json()
+
+        assert "test_admin_diagnostics.py" in diff[0]["traceback"][0]
+        assert diff[0]["size_diff_bytes"] > 2000 * 1000
+        assert top["top"][0]["size_bytes"] >= diff[0]["size_diff_bytes"]
+
+    def test_old_snapshots_are_evicted(self, client: TestClient):
+        """Test that only max_snapshots snapshots are kept."""
+        client.post("/admin/diagnostics/memory/tracemalloc/start")
+        ids = [
+            client.post("/admin/diagnostics/memory/snapshots").json()["id"]
+            for _ in range(3)
+        ]
+
+        response = client.get(f"/admin/diagnostics/memory/snapshots/{ids[0]}/top")
+        kept = client.get("/admin/diagnostics/memory").json()["snapshots"]
+
+        assert response.status_code == 404
+        assert [s["id"] for s in kept] == ids[1:]
+
+    def test_stop_frees_traces(self, client: TestClient):
+        """Test that stopping tracing drops the snapshots."""
+        client.post("/admin/diagnostics/memory/tracemalloc/start?frames=4")
+        client.post("/admin/diagnostics/memory/snapshots")
+
+        data = client.post("/admin/diagnostics/memory/tracemalloc/stop").json()
+
+        assert data["tracing"] is False
+        assert data["snapshots"] == []
+        assert not tracemalloc.is_tracing()
+
+    def test_profile_window_must_end_before_deadline(self, client: TestClient):
+        """Test that windows longer than the route deadline are rejected."""
+        response = client.post("/admin/diagnostics/profiler/window?seconds=106")
+
+        assert response.status_code == 400
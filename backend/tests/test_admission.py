@@ -0,0 +1,101 @@
+"""Tests for admission control."""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config import Settings
+from app.core import admission
+from app.core.admission import AdmissionMiddleware
+from app.core.lanes import LaneScheduler
+
+
+def _client(scheduler: LaneScheduler, **settings) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"ok": True}
+
+    values = {"admission_max_inflight": 4, "admission_retry_after_seconds": 7}
+    values.update(settings)
+    app.add_middleware(
+        AdmissionMiddleware, scheduler=scheduler, settings=Settings(**values)
+    )
+    return TestClient(app)
+
+
+class TestAdmissionMiddleware:
+    """Tests for AdmissionMiddleware."""
+
+    def test_admits_under_normal_load(self):
+        """Test that requests pass when nothing is queueing."""
+        client = _client(LaneScheduler(total=4))
+
+        response = client.get("/api/ping", headers={"X-Request-Priority": "sync"})
+
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_bulk_lanes_are_shed_when_upstream_queues(self):
+        """Test 503 + Retry-After for sync while interactive still passes."""
+        scheduler = LaneScheduler(total=1)
+        middleware = AdmissionMiddleware(
+            None, scheduler, Settings(admission_max_queue_wait_seconds=0.05)
+        )
+        release = asyncio.Event()
+
+        async def hold(lane: str):
+            async with scheduler.slot(lane):
+                await release.wait()
+
+        tasks = [asyncio.create_task(hold("interactive")) for _ in range(2)]
+        await asyncio.sleep(0.1)
+
+        assert middleware.rejection("sync") is not None
+        assert middleware.rejection("background") is not None
+        assert middleware.rejection("interactive") is None
+        release.set()
+        await asyncio.gather(*tasks)
+        assert middleware.rejection("sync") is None
+
+    def test_lower_lanes_hit_the_inflight_limit_first(self):
+        """Test graded shedding by lane as in-flight requests pile up."""
+        scheduler = LaneScheduler(total=4)
+        middleware = AdmissionMiddleware(
+            None, scheduler, Settings(admission_max_inflight=4)
+        )
+        admission._inflight["interactive"] = 2
+        try:
+            assert middleware.rejection("prefetch") is not None
+            assert middleware.rejection("sync") is None
+            admission._inflight["interactive"] = 4
+            assert middleware.rejection("interactive") is not None
+        finally:
+            admission._inflight["interactive"] = 0
+
+    def test_shed_response_and_exempt_paths(self):
+        """Test the 503 response shape, and that /health is never shed."""
+        client = _client(LaneScheduler(total=4), admission_max_inflight=0)
+
+        shed = client.get("/api/ping")
+        health = client.get("/health")
+
+        assert shed.status_code == 503
+        assert shed.headers["retry-after"] == "7"
+        assert shed.json() == {"detail": "Server is overloaded, retry later"}
+        assert health.status_code == 200
+
+    def test_disabled_admits_everything(self):
+        """Test that admission control can be switched off."""
+        client = _client(
+            LaneScheduler(total=4), admission_max_inflight=0, admission_enabled=False
+        )
+
+        assert client.get("/api/ping").status_code == 200
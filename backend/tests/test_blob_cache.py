@@ -0,0 +1,157 @@
+"""Tests for the attachment/avatar blob cache and proxy helpers."""
+
+import hashlib
+import os
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.attachments import _avatar_path
+from app.models.connection import JiraConnection
+from app.services.blob_cache import BlobCache
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> BlobCache:
+    """Create a small blob cache in a temp directory."""
+    return BlobCache(root=tmp_path, max_bytes=1000, max_item_bytes=600)
+
+
+async def _store(cache: BlobCache, key: str, data: bytes, content_type="image/png"):
+    writer = cache.open_writer(key, content_type)
+    await writer.write(data)
+    return await writer.commit()
+
+
+class TestBlobCache:
+    """Tests for BlobCache storage, lookup and eviction."""
+
+    @pytest.mark.asyncio
+    async def test_lookup_miss(self, cache: BlobCache):
+        """Test that unknown keys miss."""
+        assert await cache.lookup("missing") is None
+
+    @pytest.mark.asyncio
+    async def test_store_and_lookup(self, cache: BlobCache):
+        """Test that a committed blob is served from disk."""
+        await _store(cache, "conn:/a", b"hello")
+
+        hit = await cache.lookup("conn:/a")
+
+        assert hit is not None
+        assert hit.path.read_bytes() == b"hello"
+        assert hit.content_type == "image/png"
+        assert hit.size == 5
+
+    @pytest.mark.asyncio
+    async def test_identical_content_is_stored_once(self, cache: BlobCache):
+        """Test content addressing deduplicates blobs across keys."""
+        first = await _store(cache, "conn:/a", b"same bytes")
+        second = await _store(cache, "conn:/b", b"same bytes")
+
+        assert first.path == second.path
+        assert len(list((cache.root / "blobs").glob("*/*"))) == 1
+
+    @pytest.mark.asyncio
+    async def test_oversized_blob_is_not_cached(self, cache: BlobCache):
+        """Test that blobs above the per-item limit are dropped."""
+        result = await _store(cache, "conn:/big", b"x" * 700)
+
+        assert result is None
+        assert await cache.lookup("conn:/big") is None
+        assert list(cache.root.glob("tmp/*")) == []
+
+    @pytest.mark.asyncio
+    async def test_large_blob_is_written_in_batches(self, tmp_path: Path):
+        """Test that blobs larger than one buffered batch are stored intact."""
+        cache = BlobCache(root=tmp_path, max_bytes=10**7, max_item_bytes=10**7)
+        data = os.urandom(700 * 1024)
+        writer = cache.open_writer("conn:/large", "application/zip")
+        for start in range(0, len(data), 64 * 1024):
+            await writer.write(data[start : start + 64 * 1024])
+
+        stored = await writer.commit()
+
+        assert stored.path.read_bytes() == data
+        assert stored.path.name == hashlib.sha256(data).hexdigest()
+
+    @pytest.mark.asyncio
+    async def test_abort_discards_partial_blob(self, cache: BlobCache):
+        """Test that aborted writes leave nothing behind."""
+        writer = cache.open_writer("conn:/a", "image/png")
+        await writer.write(b"partial")
+        await writer.abort()
+
+        assert await writer.commit() is None
+        assert await cache.lookup("conn:/a") is None
+
+    @pytest.mark.asyncio
+    async def test_max_age_rejects_stale_entries(self, cache: BlobCache):
+        """Test that TTL-bound lookups miss stale entries."""
+        await _store(cache, "conn:/avatar", b"img")
+
+        assert await cache.lookup("conn:/avatar", max_age=60) is not None
+        assert await cache.lookup("conn:/avatar", max_age=-1) is None
+
+    @pytest.mark.asyncio
+    async def test_eviction_removes_least_recently_used(self, cache: BlobCache):
+        """Test LRU eviction once the byte budget is exceeded."""
+        old = await _store(cache, "conn:/old", b"a" * 400)
+        await _store(cache, "conn:/recent", b"b" * 400)
+        # Make the first blob clearly older than the second
+        os.utime(old.path, (1, 1))
+
+        await _store(cache, "conn:/new", b"c" * 400)
+
+        assert await cache.lookup("conn:/old") is None
+        assert await cache.lookup("conn:/recent") is not None
+        assert await cache.lookup("conn:/new") is not None
+
+
+class TestAvatarPath:
+    """Tests for avatar URL validation."""
+
+    def _connection(self, jira_url: str) -> JiraConnection:
+        return JiraConnection(jira_url=jira_url, api_version=3)
+
+    def test_same_host_url_is_accepted(self):
+        """Test that avatar URLs on the JIRA host become paths."""
+        connection = self._connection("https://test.atlassian.net")
+
+        path = _avatar_path(
+            connection,
+            "https://test.atlassian.net/rest/api/3/universal_avatar/view/type/"
+            "project/avatar/10400?size=small",
+        )
+
+        assert path == (
+            "/rest/api/3/universal_avatar/view/type/project/avatar/10400?size=small"
+        )
+
+    def test_context_path_is_not_duplicated(self):
+        """Test JIRA servers hosted under a context path."""
+        connection = self._connection("https://example.com/jira")
+
+        path = _avatar_path(
+            connection, "https://example.com/jira/secure/useravatar?avatarId=1"
+        )
+
+        assert path == "/secure/useravatar?avatarId=1"
+
+    def test_relative_path_is_accepted(self):
+        """Test that relative avatar paths are accepted."""
+        connection = self._connection("https://test.atlassian.net")
+
+        assert _avatar_path(connection, "/secure/projectavatar?pid=1") == (
+            "/secure/projectavatar?pid=1"
+        )
+
+    def test_foreign_host_is_rejected(self):
+        """Test that credentials are never sent to other hosts."""
+        connection = self._connection("https://test.atlassian.net")
+
+        with pytest.raises(HTTPException) as exc_info:
+            _avatar_path(connection, "https://evil.example.com/avatar.png")
+
+        assert exc_info.value.status_code == 400
@@ -0,0 +1,191 @@
+"""Tests for the shared cache backends."""
+
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.cache import (
+    Cache,
+    MemoryCacheBackend,
+    PostgresCacheBackend,
+    SQLiteCacheBackend,
+)
+
+
+@pytest_asyncio.fixture(params=["memory", "sqlite"])
+async def backend(request, tmp_path: Path):
+    """Create each locally testable backend with a small byte budget."""
+    if request.param == "memory":
+        backend = MemoryCacheBackend(max_bytes=1000)
+    else:
+        backend = SQLiteCacheBackend(tmp_path / "cache.db", max_bytes=1000)
+    yield backend
+    await backend.close()
+
+
+class TestCacheBackends:
+    """Behaviour shared by all cache backends."""
+
+    @pytest.mark.asyncio
+    async def test_set_and_get(self, backend):
+        """Test storing and reading a value."""
+        await backend.set("key", b"value")
+
+        assert await backend.get("key") == b"value"
+        assert await backend.get("other") is None
+
+    @pytest.mark.asyncio
+    async def test_set_replaces_value(self, backend):
+        """Test that set overwrites existing values."""
+        await backend.set("key", b"old")
+        await backend.set("key", b"new")
+
+        assert await backend.get("key") == b"new"
+
+    @pytest.mark.asyncio
+    async def test_expired_values_miss(self, backend):
+        """Test TTL expiry."""
+        await backend.set("key", b"value", ttl=-1)
+
+        assert await backend.get("key") is None
+
+    @pytest.mark.asyncio
+    async def test_delete(self, backend):
+        """Test removing a single key."""
+        await backend.set("key", b"value")
+        await backend.delete("key")
+
+        assert await backend.get("key") is None
+
+    @pytest.mark.asyncio
+    async def test_add_only_stores_absent_keys(self, backend):
+        """Test that add behaves like set-if-not-exists."""
+        assert await backend.add("key", b"first", ttl=60)
+        assert not await backend.add("key", b"second", ttl=60)
+        assert await backend.get("key") == b"first"
+
+    @pytest.mark.asyncio
+    async def test_add_replaces_expired_keys(self, backend):
+        """Test that an expired entry does not block add."""
+        await backend.set("key", b"old", ttl=-1)
+
+        assert await backend.add("key", b"new")
+        assert await backend.get("key") == b"new"
+
+    @pytest.mark.asyncio
+    async def test_delete_prefix(self, backend):
+        """Test removing all keys with a prefix."""
+        await backend.set("a:1", b"x")
+        await backend.set("a:2", b"x")
+        await backend.set("b:1", b"x")
+
+        await backend.delete_prefix("a:")
+
+        assert await backend.get("a:1") is None
+        assert await backend.get("a:2") is None
+        assert await backend.get("b:1") == b"x"
+
+    @pytest.mark.asyncio
+    async def test_values_over_budget_are_not_stored(self, backend):
+        """Test that a single value larger than the budget is skipped."""
+        await backend.set("huge", b"x" * 2000)
+
+        assert await backend.get("huge") is None
+
+    @pytest.mark.asyncio
+    async def test_eviction_keeps_total_under_budget(self, backend):
+        """Test that older entries are evicted once the budget is exceeded."""
+        for i in range(5):
+            await backend.set(f"key{i}", bytes([i]) * 300)
+
+        assert await backend.get("key0") is None
+        assert await backend.get("key4") == bytes([4]) * 300
+
+
+class TestSQLiteCacheBackend:
+    """Tests specific to the SQLite backend."""
+
+    @pytest.mark.asyncio
+    async def test_entries_are_shared_between_instances(self, tmp_path: Path):
+        """Test that two workers (instances) on one file see each other's data."""
+        first = SQLiteCacheBackend(tmp_path / "cache.db", max_bytes=1000)
+        second = SQLiteCacheBackend(tmp_path / "cache.db", max_bytes=1000)
+        try:
+            await first.set("key", b"shared")
+
+            assert await second.get("key") == b"shared"
+        finally:
+            await first.close()
+            await second.close()
+
+
+class TestPostgresCacheBackend:
+    """Tests for the PostgreSQL backend's SQL that SQLite can also run."""
+
+    @pytest.mark.asyncio
+    async def test_evict_drops_oldest_entries_covering_the_excess(self):
+        """Test that eviction frees the least recently accessed entries."""
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        backend = PostgresCacheBackend(engine, max_bytes=1000)
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(
+                    text(
+                        "CREATE TABLE cache_entries (key TEXT PRIMARY KEY, "
+                        "value BLOB, size INTEGER, expires_at REAL, "
+                        "accessed_at REAL)"
+                    )
+                )
+                for n, size in enumerate([100, 300, 200, 400, 300]):
+                    await conn.execute(
+                        text(
+                            "INSERT INTO cache_entries VALUES "
+                            "(:key, x'00', :size, NULL, :n)"
+                        ),
+                        {"key": f"key{n}", "size": size, "n": n},
+                    )
+
+                statements = []
+                event.listen(
+                    engine.sync_engine,
+                    "before_cursor_execute",
+                    lambda *args: statements.append(args[2]),
+                )
+
+                # 1300 bytes stored, 900 kept: the two oldest cover the 400 excess
+                await backend._evict(conn)
+
+                keys = (
+                    await conn.execute(
+                        text("SELECT key FROM cache_entries ORDER BY key")
+                    )
+                ).scalars()
+                assert list(keys) == ["key2", "key3", "key4"]
+                # The outer filter only reads the subquery's running total; a
+                # bare "size" there would correlate with the DELETE target row
+                evict = next(sql for sql in statements if ") oldest" in sql)
+                outer_where = evict.rsplit(") oldest", 1)[1]
+                assert "size" not in outer_where
+        finally:
+            await engine.dispose()
+
+
+class TestNamespacedCache:
+    """Tests for the Cache namespace wrapper."""
+
+    @pytest.mark.asyncio
+    async def test_namespaces_do_not_collide(self):
+        """Test that equal keys in different namespaces are separate."""
+        backend = MemoryCacheBackend(max_bytes=1000)
+        first = Cache("first", backend)
+        second = Cache("second", backend)
+
+        await first.set("key", b"1")
+        await second.set("key", b"2")
+        await first.delete_prefix("")
+
+        assert await first.get("key") is None
+        assert await second.get("key") == b"2"
@@ -0,0 +1,174 @@
+"""Tests for request deadlines and adaptive relay timeouts."""
+
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core import deadline
+from app.core.deadline import DeadlineMiddleware, deadline_scope
+from app.services.relay_service import RelayError, RelayService, endpoint_class
+
+
+def _app(events: list[str]) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(DeadlineMiddleware)
+
+    @app.get("/slow")
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            events.append("cancelled")
+            raise
+        return {"ok": True}
+
+    @app.get("/remaining")
+    async def left():
+        return {"remaining": deadline.remaining()}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(3):
+                await asyncio.sleep(0.1)
+                yield b"x"
+
+        return StreamingResponse(chunks())
+
+    return app
+
+
+def _scope(path: str, timeout_ms: str | None = None) -> dict:
+    headers = []
+    if timeout_ms is not None:
+        headers.append((b"x-request-timeout-ms", timeout_ms.encode()))
+    return {"type": "http", "path": path, "headers": headers}
+
+
+class TestDeadlineMiddleware:
+    """Tests for DeadlineMiddleware."""
+
+    def test_expired_request_gets_504_and_handler_is_cancelled(self):
+        """Test that the handler stops once the client's budget is used up."""
+        events: list[str] = []
+        client = TestClient(_app(events))
+
+        started = time.monotonic()
+        response = client.get("/slow", headers={"X-Request-Timeout-Ms": "200"})
+
+        assert response.status_code == 504
+        assert time.monotonic() - started < 2
+        assert events == ["cancelled"]
+
+    def test_deadline_is_visible_to_handlers(self):
+        """Test that handlers see the time left of their budget."""
+        client = TestClient(_app([]))
+
+        response = client.get("/remaining", headers={"X-Request-Timeout-Ms": "3000"})
+
+        assert 0 < response.json()["remaining"] <= 3
+
+    def test_started_stream_is_not_cut_off(self):
+        """Test that the deadline only bounds the time to the first byte."""
+        client = TestClient(_app([]))
+
+        response = client.get("/stream", headers={"X-Request-Timeout-Ms": "150"})
+
+        assert response.status_code == 200
+        assert response.content == b"xxx"
+
+    def test_budget_from_header_is_clamped(self):
+        """Test header parsing and clamping to the configured maximum."""
+        middleware = DeadlineMiddleware(None)
+
+        assert middleware.budget(_scope("/api/x", "2500")) == 2.5
+        assert middleware.budget(_scope("/api/x", "0")) == 0.1
+        assert middleware.budget(_scope("/api/x", "999999999")) == 110.0
+
+    def test_route_defaults(self):
+        """Test per-route budgets when the client sends no header."""
+        middleware = DeadlineMiddleware(None)
+
+        assert middleware.budget(_scope("/api/jira/c1/batch")) == 60.0
+        assert middleware.budget(_scope("/api/jira/c1/rest/api/3/myself")) == 30.0
+        assert middleware.budget(_scope("/api/connections", "nonsense")) == 60.0
+        assert (
+            middleware.budget(_scope("/api/admin/diagnostics/profiler/window")) == 110.0
+        )
+
+
+class TestRelayTimeouts:
+    """Tests for deadline-bound and adaptive relay timeouts."""
+
+    @pytest.mark.asyncio
+    async def test_timeouts_are_clamped_to_deadline(self):
+        """Test that upstream timeouts never outlast the request deadline."""
+        service = RelayService(timeout=30.0, connect_timeout=10.0, pool_timeout=5.0)
+
+        with deadline_scope(2.0):
+            timeout = service._timeouts("c1")
+
+        assert timeout.read <= 2.0
+        assert timeout.connect <= 2.0
+        assert timeout.pool <= 2.0
+
+    @pytest.mark.asyncio
+    async def test_expired_deadline_raises_504(self):
+        """Test that no upstream call starts after the deadline passed."""
+        service = RelayService()
+
+        with deadline_scope(0), pytest.raises(RelayError) as exc_info:
+            service._timeouts("c1")
+
+        assert exc_info.value.status_code == 504
+
+    def test_nested_scope_keeps_tighter_deadline(self):
+        """Test that an inner scope can't extend an outer deadline."""
+        with deadline_scope(1.0), deadline_scope(60.0):
+            assert deadline.remaining() <= 1.0
+
+    def test_read_timeout_adapts_to_latency(self):
+        """Test that fast connections get a short read timeout."""
+        service = RelayService(timeout=30.0, min_timeout=1.0)
+        for _ in range(4):
+            service._record_latency("c1", 0.1)
+        assert service.read_timeout("c1") == 30.0
+
+        service._record_latency("c1", 0.1)
+
+        assert service.read_timeout("c1") == 1.0
+        assert service.read_timeout("other") == 30.0
+
+    def test_latency_is_estimated_per_endpoint_class(self):
+        """Test that fast reads do not shorten slow searches or writes."""
+        service = RelayService(timeout=30.0, min_timeout=1.0)
+        for _ in range(20):
+            service._record_latency("c1", 0.05, "read")
+        for _ in range(5):
+            service._record_latency("c1", 4.0, "search")
+
+        assert service.read_timeout("c1", "read") == 1.0
+        assert service.read_timeout("c1", "search") >= 12.0
+        assert service.read_timeout("c1", "write") == 30.0
+        assert endpoint_class("GET", "/rest/api/3/search/jql") == "search"
+        assert endpoint_class("POST", "/rest/api/3/search") == "search"
+        assert endpoint_class("POST", "/rest/api/3/issue/T-1/attachments") == "write"
+        assert endpoint_class("GET", "/rest/api/3/issue/T-1") == "read"
+
+    def test_timeout_backs_off(self):
+        """Test that a timeout doubles the latency estimate, up to the cap."""
+        service = RelayService(timeout=30.0, min_timeout=1.0)
+        for _ in range(5):
+            service._record_latency("c1", 1.0)
+        before = service.read_timeout("c1")
+
+        service._record_timeout("c1")
+
+        assert service.read_timeout("c1") > before
+        for _ in range(10):
+            service._record_timeout("c1")
+        assert service.read_timeout("c1") == 30.0
@@ -0,0 +1,146 @@
+"""Tests for cancelling request handling on client disconnect."""
+
+import asyncio
+
+import pytest
+from fastapi import BackgroundTasks, FastAPI, Request
+
+from app.core.disconnect import DisconnectMiddleware
+from app.core.lanes import LaneScheduler
+
+
+def _app(events: list[str]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/slow")
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            events.append("cancelled")
+            raise
+        return {}
+
+    @app.post("/echo")
+    async def echo(request: Request, background_tasks: BackgroundTasks):
+        body = await request.body()
+
+        async def after():
+            await asyncio.sleep(0.05)
+            events.append("background done")
+
+        background_tasks.add_task(after)
+        return {"size": len(body)}
+
+    return app
+
+
+class FakeClient:
+    """ASGI client sending a body in chunks, then disconnecting on cue."""
+
+    def __init__(self, chunks: list[bytes], disconnect_after: float | None = None):
+        self.chunks = list(chunks) or [b""]
+        self.disconnect_after = disconnect_after
+        self.sent: list[dict] = []
+        self.done = asyncio.Event()
+
+    async def receive(self) -> dict:
+        if self.chunks:
+            body = self.chunks.pop(0)
+            return {
+                "type": "http.request",
+                "body": body,
+                "more_body": bool(self.chunks),
+            }
+        if self.disconnect_after is not None:
+            await asyncio.sleep(self.disconnect_after)
+        else:
+            await self.done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message: dict) -> None:
+        self.sent.append(message)
+        if message["type"] == "http.response.body" and not message.get("more_body"):
+            self.done.set()
+
+
+def _scope(method: str, path: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [],
+        "scheme": "http",
+        "server": ("test", 80),
+        "client": ("test", 1234),
+        "root_path": "",
+    }
+
+
+class TestDisconnectMiddleware:
+    """Tests for DisconnectMiddleware."""
+
+    @pytest.mark.asyncio
+    async def test_disconnect_cancels_handler(self):
+        """Test that leaving mid-request stops the handler right away."""
+        events: list[str] = []
+        client = FakeClient([b""], disconnect_after=0.05)
+        middleware = DisconnectMiddleware(_app(events))
+
+        await asyncio.wait_for(
+            middleware(_scope("GET", "/slow"), client.receive, client.send), 2
+        )
+
+        assert events == ["cancelled"]
+        assert client.sent == []
+
+    @pytest.mark.asyncio
+    async def test_completed_response_keeps_background_tasks(self):
+        """Test that the chunked body arrives and nothing is cancelled after."""
+        events: list[str] = []
+        client = FakeClient([b"ab", b"cd", b"e"])
+        middleware = DisconnectMiddleware(_app(events))
+
+        await middleware(_scope("POST", "/echo"), client.receive, client.send)
+
+        assert client.sent[0]["status"] == 200
+        assert client.sent[1]["body"] == b'{"size":5}'
+        assert events == ["background done"]
+
+    @pytest.mark.asyncio
+    async def test_outer_cancellation_propagates(self):
+        """Test that a server shutdown still cancels the request normally."""
+        events: list[str] = []
+        client = FakeClient([b""])
+        middleware = DisconnectMiddleware(_app(events))
+
+        task = asyncio.create_task(
+            middleware(_scope("GET", "/slow"), client.receive, client.send)
+        )
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert events == ["cancelled"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_upstream_call_frees_its_slot(self):
+        """Test that cancelling a relay call returns its upstream slot."""
+        scheduler = LaneScheduler(total=1)
+
+        async def upstream():
+            async with scheduler.slot("interactive", user="u"):
+                await asyncio.sleep(5)
+
+        task = asyncio.create_task(upstream())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert scheduler.stats()["interactive"] == {"active": 0, "waiting": 0}
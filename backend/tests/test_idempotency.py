@@ -0,0 +1,209 @@
+"""Tests for Idempotency-Key handling of mutating relay requests."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.testclient import TestClient
+
+from app.api import relay
+from app.config import get_settings
+from app.core.cache import Cache, MemoryCacheBackend
+from app.dependencies import get_connection_repository, get_current_user
+from app.services.idempotency import IdempotencyStore, request_fingerprint
+from app.services.relay_service import RelayResponse
+
+
+def _store(backend: MemoryCacheBackend | None = None) -> IdempotencyStore:
+    """Create a store on a private in-memory backend."""
+    backend = backend or MemoryCacheBackend(max_bytes=1024 * 1024)
+    return IdempotencyStore(
+        ttl_seconds=60,
+        responses=Cache("idempotency", backend),
+        locks=Cache("idempotency-lock", backend),
+    )
+
+
+FINGERPRINT = request_fingerprint("POST", "/api/jira/c/rest/api/3/issue", "", b"{}")
+
+
+class TestRequestFingerprint:
+    """Tests for request_fingerprint."""
+
+    def test_differs_by_body_and_path(self):
+        """Test that any request component changes the fingerprint."""
+        base = request_fingerprint("POST", "/a", "", b"{}")
+        assert base == request_fingerprint("post", "/a", "", b"{}")
+        assert base != request_fingerprint("POST", "/b", "", b"{}")
+        assert base != request_fingerprint("POST", "/a", "", b'{"x": 1}')
+        assert base != request_fingerprint("PUT", "/a", "", b"{}")
+
+
+class TestIdempotencyStore:
+    """Tests for IdempotencyStore."""
+
+    @pytest.mark.asyncio
+    async def test_first_response_is_replayed(self):
+        """Test that a retry gets the stored response."""
+        store = _store()
+        async with store.reserve("u1", "key", FINGERPRINT) as reservation:
+            assert reservation.replay is None
+            await reservation.save(Response(b'{"key": "T-1"}', status_code=201))
+
+        async with store.reserve("u1", "key", FINGERPRINT) as reservation:
+            replay = reservation.replay.to_response()
+
+        assert replay.status_code == 201
+        assert replay.body == b'{"key": "T-1"}'
+        assert replay.headers["idempotent-replayed"] == "true"
+
+    @pytest.mark.asyncio
+    async def test_keys_are_scoped_per_user(self):
+        """Test that the same key of another user is independent."""
+        store = _store()
+        async with store.reserve("u1", "key", FINGERPRINT) as reservation:
+            await reservation.save(Response(b"1", status_code=201))
+
+        async with store.reserve("u2", "key", FINGERPRINT) as reservation:
+            assert reservation.replay is None
+
+    @pytest.mark.asyncio
+    async def test_key_reuse_for_other_request_rejected(self):
+        """Test that a key can't be replayed for a different request."""
+        store = _store()
+        async with store.reserve("u1", "key", FINGERPRINT) as reservation:
+            await reservation.save(Response(b"1", status_code=201))
+
+        other = request_fingerprint("POST", "/other", "", b"{}")
+        with pytest.raises(HTTPException) as exc_info:
+            async with store.reserve("u1", "key", other):
+                pass
+        assert exc_info.value.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_server_errors_are_not_stored(self):
+        """Test that a 5xx can be retried with the same key."""
+        store = _store()
+        async with store.reserve("u1", "key", FINGERPRINT) as reservation:
+            await reservation.save(Response(b"down", status_code=503))
+
+        async with store.reserve("u1", "key", FINGERPRINT) as reservation:
+            assert reservation.replay is None
+
+    @pytest.mark.asyncio
+    async def test_redirects_are_not_stored(self):
+        """Test that a redirect is followed again instead of being replayed."""
+        store = _store()
+        async with store.reserve("u1", "key", FINGERPRINT) as reservation:
+            await reservation.save(
+                Response(status_code=307, headers={"location": "/api/jira/mock"})
+            )
+
+        async with store.reserve("u1", "key", FINGERPRINT) as reservation:
+            assert reservation.replay is None
+
+    def test_lock_outlives_longest_request(self):
+        """Test that the in-flight lock lasts past the longest request deadline."""
+        assert _store().lock_ttl_seconds > get_settings().request_max_timeout_seconds
+
+    @pytest.mark.asyncio
+    async def test_failed_request_releases_key(self):
+        """Test that an exception in the owner frees the key."""
+        store = _store()
+        with pytest.raises(RuntimeError):
+            async with store.reserve("u1", "key", FINGERPRINT):
+                raise RuntimeError("upstream timeout")
+
+        async with store.reserve("u1", "key", FINGERPRINT) as reservation:
+            assert reservation.replay is None
+
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicate_waits_for_first(self):
+        """Test that a duplicate in flight waits and executes nothing."""
+        store = _store()
+        executed = []
+
+        async def handle(delay: float) -> bytes:
+            async with store.reserve("u1", "key", FINGERPRINT) as reservation:
+                if reservation.replay is not None:
+                    return reservation.replay.body
+                executed.append(delay)
+                await asyncio.sleep(delay)
+                await reservation.save(Response(b"created", status_code=201))
+                return b"created"
+
+        results = await asyncio.gather(handle(0.05), handle(0))
+
+        assert results == [b"created", b"created"]
+        assert executed == [0.05]
+
+    @pytest.mark.asyncio
+    async def test_duplicate_in_other_worker_polls_shared_store(self):
+        """Test waiting on a request owned by another process."""
+        backend = MemoryCacheBackend(max_bytes=1024 * 1024)
+        first_worker, second_worker = _store(backend), _store(backend)
+
+        async def first() -> None:
+            async with first_worker.reserve("u1", "key", FINGERPRINT) as reservation:
+                await asyncio.sleep(0.3)
+                await reservation.save(Response(b"created", status_code=201))
+
+        async def second() -> bytes:
+            await asyncio.sleep(0.05)
+            async with second_worker.reserve("u1", "key", FINGERPRINT) as reservation:
+                return reservation.replay.body
+
+        _, body = await asyncio.gather(first(), second())
+
+        assert body == b"created"
+
+    @pytest.mark.asyncio
+    async def test_invalid_key_rejected(self):
+        """Test the key length limit."""
+        with pytest.raises(HTTPException) as exc_info:
+            async with _store().reserve("u1", "k" * 300, FINGERPRINT):
+                pass
+        assert exc_info.value.status_code == 400
+
+
+class TestRelayIdempotency:
+    """Tests for Idempotency-Key on the relay catch-all route."""
+
+    def test_retried_post_is_executed_once(self, monkeypatch: pytest.MonkeyPatch):
+        """Test that a retried POST replays instead of creating twice."""
+        calls = []
+
+        class FakeRelay:
+            async def forward_request(self, connection, method, path, **kwargs):
+                calls.append((method, path))
+                body = b'{"key": "T-%d"}' % len(calls)
+                return RelayResponse(201, {"content-type": "application/json"}, body)
+
+        class FakeRepo:
+            async def get_by_id(self, connection_id):
+                return SimpleNamespace(
+                    id=connection_id, name="c", jira_url="https://j", user_id="u1"
+                )
+
+            async def touch_last_used(self, connection_id):
+                pass
+
+        monkeypatch.setattr(relay, "relay_service", FakeRelay())
+        monkeypatch.setattr(relay, "idempotency_store", _store())
+        app = FastAPI()
+        app.include_router(relay.router, prefix="/api")
+        app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id="u1")
+        app.dependency_overrides[get_connection_repository] = lambda: FakeRepo()
+        client = TestClient(app)
+
+        url = "/api/jira/c1/rest/api/3/issue"
+        headers = {"Idempotency-Key": "create-1"}
+        first = client.post(url, json={"fields": {}}, headers=headers)
+        retry = client.post(url, json={"fields": {}}, headers=headers)
+        other = client.post(url, json={"fields": {}}, headers={"Idempotency-Key": "2"})
+
+        assert first.json() == retry.json() == {"key": "T-1"}
+        assert retry.headers["idempotent-replayed"] == "true"
+        assert other.json() == {"key": "T-2"}
+        assert len(calls) == 2
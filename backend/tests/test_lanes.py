@@ -0,0 +1,303 @@
+"""Tests for relay priority lanes."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import relay
+from app.core.lanes import (
+    LaneScheduler,
+    _LaneQueue,
+    _Waiter,
+    current_lane,
+    lane_scope,
+    parse_lane,
+    parse_user_weights,
+    request_lane,
+)
+from app.dependencies import get_connection_repository, get_current_user
+from app.services.relay_service import RelayResponse
+
+
+async def _hold(scheduler: LaneScheduler, lane: str, order: list, release):
+    async with scheduler.slot(lane):
+        order.append(lane)
+        await release.wait()
+
+
+async def _call(scheduler: LaneScheduler, user: str, connection: str, order: list):
+    async with scheduler.slot("sync", user=user, connection=connection):
+        order.append(f"{user}/{connection}")
+        await asyncio.sleep(0)
+
+
+class TestLaneScheduler:
+    """Tests for LaneScheduler."""
+
+    @pytest.mark.asyncio
+    async def test_lane_budget_leaves_room_for_interactive(self):
+        """Test that bulk traffic can't take the slots interactive needs."""
+        scheduler = LaneScheduler(total=3, limits={"sync": 2})
+        order: list[str] = []
+        release = asyncio.Event()
+
+        tasks = [
+            asyncio.create_task(_hold(scheduler, "sync", order, release))
+            for _ in range(4)
+        ]
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(
+            _hold(scheduler, "interactive", order, release)
+        )
+        await asyncio.sleep(0)
+
+        assert order == ["sync", "sync", "interactive"]
+        assert scheduler.stats()["sync"] == {"active": 2, "waiting": 2}
+        release.set()
+        await asyncio.gather(*tasks, interactive)
+        assert order.count("sync") == 4
+
+    @pytest.mark.asyncio
+    async def test_freed_slots_go_to_higher_lanes_first(self):
+        """Test that queued interactive requests overtake queued bulk ones."""
+        scheduler = LaneScheduler(total=1)
+        order: list[str] = []
+        release = asyncio.Event()
+
+        first = asyncio.create_task(_hold(scheduler, "background", order, release))
+        await asyncio.sleep(0)
+        queued = [
+            asyncio.create_task(_hold(scheduler, lane, order, release))
+            for lane in ("prefetch", "sync", "background", "interactive")
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(first, *queued)
+
+        assert order == ["background", "interactive", "sync", "prefetch", "background"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_gives_up_its_place(self):
+        """Test that a cancelled waiter neither leaks nor blocks a slot."""
+        scheduler = LaneScheduler(total=1)
+        order: list[str] = []
+        release = asyncio.Event()
+
+        first = asyncio.create_task(_hold(scheduler, "sync", order, release))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(_hold(scheduler, "sync", order, release))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        release.set()
+        await first
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert scheduler.stats()["sync"] == {"active": 0, "waiting": 0}
+        async with scheduler.slot("interactive"):
+            pass
+
+    @pytest.mark.asyncio
+    async def test_slot_defaults_to_current_lane(self):
+        """Test that the context lane is used when none is given."""
+        scheduler = LaneScheduler(total=2)
+
+        with lane_scope("prefetch"):
+            async with scheduler.slot():
+                assert scheduler.stats()["prefetch"]["active"] == 1
+        assert current_lane() == "interactive"
+
+
+class TestFairShare:
+    """Tests for fair sharing between users within a lane."""
+
+    @pytest.mark.asyncio
+    async def test_light_user_is_not_stuck_behind_heavy_sync(self):
+        """Test that users take turns instead of first-come-first-served."""
+        scheduler = LaneScheduler(total=1)
+        order: list[str] = []
+
+        heavy = [_call(scheduler, "heavy", "c1", order) for _ in range(6)]
+        light = [_call(scheduler, "light", "c2", order) for _ in range(2)]
+        await asyncio.gather(*heavy, *light)
+
+        assert order[:5] == [
+            "heavy/c1",
+            "light/c2",
+            "heavy/c1",
+            "light/c2",
+            "heavy/c1",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_connections_of_a_user_take_turns(self):
+        """Test round-robin between one user's connections."""
+        scheduler = LaneScheduler(total=1)
+        order: list[str] = []
+
+        calls = [_call(scheduler, "u", "a", order) for _ in range(3)]
+        calls += [_call(scheduler, "u", "b", order) for _ in range(2)]
+        await asyncio.gather(*calls)
+
+        assert order == ["u/a", "u/b", "u/a", "u/b", "u/a"]
+
+    @pytest.mark.asyncio
+    async def test_weights_give_proportional_shares(self):
+        """Test that a user with weight 2 gets two slots per turn."""
+        scheduler = LaneScheduler(total=1, weights={"big": 2.0})
+        order: list[str] = []
+
+        calls = [_call(scheduler, "big", "c", order) for _ in range(8)]
+        calls += [_call(scheduler, "small", "c", order) for _ in range(8)]
+        await asyncio.gather(*calls)
+
+        assert order[:9].count("big/c") == 6
+
+    @pytest.mark.asyncio
+    async def test_idle_users_are_forgotten(self):
+        """Test that users without waiters don't leave state behind."""
+        scheduler = LaneScheduler(total=1)
+        order: list[str] = []
+
+        for n in range(20):
+            await _call(scheduler, f"u{n}", "c", order)
+        await asyncio.gather(
+            *(_call(scheduler, f"v{n}", "c", order) for n in range(20))
+        )
+
+        queue = scheduler._queues["sync"]
+        assert len(order) == 40
+        assert (queue.vtime, queue.last_connection, queue.flows) == ({}, {}, {})
+
+    @pytest.mark.asyncio
+    async def test_returning_user_keeps_its_lead(self):
+        """Test that a user re-queueing right after a grant doesn't skip ahead."""
+        loop = asyncio.get_running_loop()
+        queue = _LaneQueue()
+
+        def waiter(user: str) -> _Waiter:
+            return _Waiter(loop.create_future(), user, "c")
+
+        queue.push(waiter("a"))
+        queue.push(waiter("b"))
+        queue.push(waiter("b"))
+        assert queue.pop(lambda u: True, lambda u: 1.0).user == "a"
+        queue.push(waiter("a"))
+
+        assert queue.vtime == {"a": 1.0, "b": 0.0}
+        assert [queue.pop(lambda u: True, lambda u: 1.0).user for _ in range(3)] == [
+            "b",
+            "b",
+            "a",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_user_limit_caps_concurrency(self):
+        """Test that a user can't hold more than their cap of slots."""
+        scheduler = LaneScheduler(total=10, user_limit=2)
+        release = asyncio.Event()
+        entered: list[str] = []
+
+        async def hold(user: str):
+            async with scheduler.slot("sync", user=user):
+                entered.append(user)
+                await release.wait()
+
+        tasks = [asyncio.create_task(hold("greedy")) for _ in range(5)]
+        tasks.append(asyncio.create_task(hold("other")))
+        await asyncio.sleep(0)
+
+        assert entered.count("greedy") == 2
+        assert "other" in entered
+        assert scheduler.stats()["sync"]["waiting"] == 3
+        release.set()
+        await asyncio.gather(*tasks)
+        assert entered.count("greedy") == 5
+
+    @pytest.mark.asyncio
+    async def test_user_limit_is_per_lane(self):
+        """Test that a user's own sync traffic can't block their reads."""
+        scheduler = LaneScheduler(total=10, user_limit=2)
+        release = asyncio.Event()
+        entered: list[str] = []
+
+        async def hold(lane: str):
+            async with scheduler.slot(lane, user="u"):
+                entered.append(lane)
+                await release.wait()
+
+        tasks = [asyncio.create_task(hold("sync")) for _ in range(3)]
+        tasks.append(asyncio.create_task(hold("interactive")))
+        await asyncio.sleep(0)
+
+        assert entered == ["sync", "sync", "interactive"]
+        release.set()
+        await asyncio.gather(*tasks)
+
+    def test_parse_user_weights(self):
+        """Test the relay_user_weights setting format."""
+        assert parse_user_weights("") == {}
+        assert parse_user_weights(" a=2, b=0.5 ,") == {"a": 2.0, "b": 0.5}
+        for bad in ("a", "a=x", "a=0", "=2"):
+            with pytest.raises(ValueError):
+                parse_user_weights(bad)
+
+
+class TestLaneSelection:
+    """Tests for picking the lane of a request."""
+
+    def test_header_overrides_route_default(self):
+        """Test that a valid header wins and invalid ones are ignored."""
+        batch = "/api/jira/c1/batch"
+        assert request_lane("/api/jira/c1/rest/api/3/issue/T-1", "Sync") == "sync"
+        assert request_lane(batch, "urgent") == "interactive"
+        assert request_lane(batch, "sync") == "sync"
+
+    def test_route_defaults(self):
+        """Test that searches are sync traffic by default, batches are not."""
+        assert request_lane("/api/jira/c1/rest/api/3/search/jql") == "sync"
+        assert request_lane("/api/jira/c1/rest/api/2/search") == "sync"
+        assert request_lane("/api/jira/c1/batch") == "interactive"
+        assert request_lane("/api/jira/c1/rest/api/3/issue/T-1") == "interactive"
+        assert request_lane("/api/users/connections") == "interactive"
+
+    def test_sync_client_get_runs_in_sync_lane(self, monkeypatch: pytest.MonkeyPatch):
+        """Test that a per-issue GET from the sync engine is sync traffic."""
+        calls = []
+
+        class FakeRelay:
+            async def forward_request(self, connection, method, path, **kwargs):
+                calls.append((current_lane(), kwargs["headers"]))
+                return RelayResponse(200, {"content-type": "application/json"}, b"{}")
+
+        class FakeRepo:
+            async def get_by_id(self, connection_id):
+                return SimpleNamespace(
+                    id=connection_id, name="c", jira_url="https://j", user_id="u1"
+                )
+
+            async def touch_last_used(self, connection_id):
+                pass
+
+        monkeypatch.setattr(relay, "relay_service", FakeRelay())
+        app = FastAPI()
+        app.include_router(relay.router, prefix="/api")
+        app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id="u1")
+        app.dependency_overrides[get_connection_repository] = lambda: FakeRepo()
+        client = TestClient(app)
+
+        url = "/api/jira/c1/rest/api/3/issue/T-1"
+        client.get(url, headers={"X-Request-Priority": "sync"})
+        client.get(url)
+
+        assert [lane for lane, _ in calls] == ["sync", "interactive"]
+        assert "x-request-priority" not in calls[0][1]
+
+    def test_parse_lane(self):
+        """Test lane name validation."""
+        assert parse_lane(" background ") == "background"
+        assert parse_lane(None) is None
+        assert parse_lane("vip") is None
@@ -0,0 +1,78 @@
+"""Tests for the event-loop lag monitor."""
+
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+
+from app.config import Settings
+from app.core.loop_monitor import LoopMonitor, loop_blocked, loop_lag_seconds
+
+
+def _block_the_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+async def _monitor(**overrides) -> LoopMonitor:
+    settings = Settings(
+        loop_monitor_interval_seconds=0.02,
+        loop_monitor_block_threshold_seconds=0.1,
+        **overrides,
+    )
+    monitor = LoopMonitor(settings)
+    monitor.start()
+    await asyncio.sleep(0.05)
+    return monitor
+
+
+@pytest_asyncio.fixture
+async def monitor():
+    monitor = await _monitor(loop_monitor_capture_stacks=True)
+    yield monitor
+    await monitor.stop()
+
+
+class TestLoopMonitor:
+    """Tests for lag measurement and blocking-call stacks."""
+
+    @pytest.mark.asyncio
+    async def test_idle_loop_has_little_lag(self, monitor: LoopMonitor):
+        """Test that an idle loop is measured without counting blocks."""
+        observed = loop_lag_seconds.count()
+        blocked = loop_blocked.value()
+
+        await asyncio.sleep(0.1)
+
+        assert loop_lag_seconds.count() > observed
+        assert loop_blocked.value() == blocked
+        assert list(monitor.recent_blocks) == []
+
+    @pytest.mark.asyncio
+    async def test_blocking_call_is_measured_and_captured(self, monitor: LoopMonitor):
+        """Test that a blocking callback shows up as lag with its stack."""
+        blocked = loop_blocked.value()
+
+        _block_the_loop(0.3)
+        await asyncio.sleep(0.05)
+
+        assert loop_blocked.value() == blocked + 1
+        assert monitor.max_lag >= 0.2
+        assert len(monitor.recent_blocks) == 1
+        stack = "".join(monitor.recent_blocks[0]["stack"])
+        assert "_block_the_loop" in stack
+        assert "test_loop_monitor.py" in stack
+
+    @pytest.mark.asyncio
+    async def test_no_stacks_without_debug(self):
+        """Test that the watchdog only runs with debug or capture_stacks."""
+        monitor = await _monitor(debug=False, loop_monitor_capture_stacks=False)
+        try:
+            _block_the_loop(0.15)
+            await asyncio.sleep(0.05)
+        finally:
+            await monitor.stop()
+
+        assert monitor.max_lag >= 0.1
+        assert list(monitor.recent_blocks) == []
+        assert monitor.status()["running"] is False
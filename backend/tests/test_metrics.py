@@ -0,0 +1,68 @@
+"""Tests for the Prometheus metrics registry."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.metrics import Registry
+from app.main import create_app
+
+
+class TestRegistry:
+    """Tests for metric types and text exposition."""
+
+    def test_counter_and_gauge_render(self):
+        """Test labelled counters and callback gauges."""
+        registry = Registry()
+        requests = registry.counter("requests_total", "Requests", labels=("code",))
+        registry.gauge(
+            "queue_depth", "Queued", labels=("lane",), callback=lambda: {("sync",): 3}
+        )
+
+        requests.inc(code="200")
+        requests.inc(2, code="200")
+        text = registry.render()
+
+        assert "# TYPE requests_total counter" in text
+        assert 'requests_total{code="200"} 3' in text
+        assert 'queue_depth{lane="sync"} 3' in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test bucket, count and sum samples of a histogram."""
+        registry = Registry()
+        wait = registry.histogram("wait_seconds", "Wait", buckets=(0.1, 1.0))
+
+        for value in (0.05, 0.5, 5.0):
+            wait.observe(value)
+        text = registry.render()
+
+        assert 'wait_seconds_bucket{le="0.1"} 1' in text
+        assert 'wait_seconds_bucket{le="1"} 2' in text
+        assert 'wait_seconds_bucket{le="+Inf"} 3' in text
+        assert "wait_seconds_count 3" in text
+        assert "wait_seconds_sum 5.55" in text
+
+    def test_label_mismatch_and_duplicates_are_rejected(self):
+        """Test that misuse fails loudly instead of producing bad output."""
+        registry = Registry()
+        counter = registry.counter("hits_total", "Hits", labels=("lane",))
+
+        with pytest.raises(ValueError):
+            counter.inc(user="x")
+        with pytest.raises(ValueError):
+            registry.counter("hits_total", "Again")
+
+    def test_label_values_are_escaped(self):
+        """Test escaping of quotes in label values."""
+        registry = Registry()
+        registry.counter("odd_total", "Odd", labels=("path",)).inc(path='a"b')
+
+        assert 'odd_total{path="a\\"b"} 1' in registry.render()
+
+
+def test_metrics_endpoint_exposes_relay_queues():
+    """Test that /metrics serves the relay lane gauges."""
+    response = TestClient(create_app()).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'relay_upstream_waiting{lane="interactive"} 0' in response.text
@@ -417,6 +417,37 @@ class TestSearch:
         assert data["total"] == 2
         assert len(data["issues"]) == 2
 
+    def test_search_pages_with_next_page_token(self, client: TestClient):
+        """Test that nextPageToken walks every issue once."""
+        for i in range(5):
+            client.post("/rest/api/2/issue", json={"fields": {"summary": f"Issue {i}"}})
+
+        keys = []
+        params = {"jql": "project = TEST ORDER BY updated ASC", "maxResults": 2}
+        while True:
+            data = client.get("/rest/api/2/search/jql", params=params).json()
+            keys.extend(issue["key"] for issue in data["issues"])
+            if "nextPageToken" not in data:
+                break
+            params["nextPageToken"] = data["nextPageToken"]
+
+        assert data["isLast"] is True
+        assert sorted(keys) == [f"TEST-{n}" for n in range(1, 6)]
+
+    def test_search_filters_by_status(self, client: TestClient):
+        """Test that a transition moves the issue between status filters."""
+        client.post("/rest/api/2/issue", json={"fields": {"summary": "First"}})
+        client.post("/rest/api/2/issue", json={"fields": {"summary": "Second"}})
+        client.post(
+            "/rest/api/2/issue/TEST-2/transitions", json={"transition": {"id": "31"}}
+        )
+
+        response = client.get("/rest/api/2/search/jql?jql=status+%3D+Done")
+
+        data = response.json()
+        assert data["total"] == 1
+        assert data["issues"][0]["key"] == "TEST-2"
+
     def test_search_empty_database(self, client: TestClient):
         """Test search when no issues exist."""
         response = client.get("/rest/api/2/search/jql?jql=")
@@ -0,0 +1,181 @@
+"""Tests for the indexed mock JIRA issue store."""
+
+import random
+
+import pytest
+
+from app.services.mock_jira.store import IssueStore, Query
+
+STATUSES = ["To Do", "In Progress", "Done"]
+
+
+def _issue(
+    number: int,
+    updated: str,
+    status: str = "To Do",
+    project: str = "TEST",
+    assignee: str | None = None,
+    labels: list[str] | None = None,
+) -> dict:
+    return {
+        "id": str(number),
+        "key": f"{project}-{number}",
+        "fields": {
+            "summary": f"Issue {number}",
+            "status": {"name": status},
+            "project": {"key": project},
+            "assignee": {"displayName": assignee} if assignee else None,
+            "labels": labels or [],
+            "updated": updated,
+        },
+    }
+
+
+def _keys(issues: list[dict]) -> list[str]:
+    return [issue["key"] for issue in issues]
+
+
+@pytest.fixture
+def store() -> IssueStore:
+    store = IssueStore()
+    store.add_many(
+        [
+            _issue(1, "2025-01-03T10:00:00.000+0000", "Done", assignee="Alice"),
+            _issue(2, "2025-01-01T10:00:00.000+0000", labels=["backend", "bug"]),
+            _issue(3, "2025-01-02T10:00:00.000+0000", "In Progress", "DEMO"),
+            _issue(4, "2025-01-04T10:00:00.000+0000", labels=["Backend"]),
+        ]
+    )
+    return store
+
+
+class TestLookup:
+    """Tests for reading issues by id or key."""
+
+    def test_get_by_id_and_key(self, store: IssueStore):
+        """Test that issues are stored once and found by id or key."""
+        assert len(store) == 4
+        assert store.get("1") is store.get("TEST-1")
+        assert "DEMO-3" in store
+        assert store.get("TEST-9") is None
+
+    def test_add_replaces_same_id(self, store: IssueStore):
+        """Test that re-adding an id drops the old issue from the indexes."""
+        store.add(_issue(2, "2025-01-05T10:00:00.000+0000", "Done"))
+
+        assert len(store) == 4
+        assert _keys(store.search("status = Done", 10)[0]) == ["TEST-1", "TEST-2"]
+        assert _keys(store.search("labels = bug", 10)[0]) == []
+
+
+class TestSearch:
+    """Tests for JQL search on the indexes."""
+
+    def test_default_order_is_least_recently_updated(self, store: IssueStore):
+        """Test that issues come in updated order without ORDER BY."""
+        issues, total = store.search("", 10)
+
+        assert total == 4
+        assert _keys(issues) == ["TEST-2", "DEMO-3", "TEST-1", "TEST-4"]
+
+    def test_equality_filters(self, store: IssueStore):
+        """Test AND-ed filters on project, status, assignee and labels."""
+        assert _keys(store.search("project = test ORDER BY updated DESC", 10)[0]) == [
+            "TEST-4",
+            "TEST-1",
+            "TEST-2",
+        ]
+        assert _keys(store.search('status = "in progress"', 10)[0]) == ["DEMO-3"]
+        assert _keys(store.search("assignee = alice", 10)[0]) == ["TEST-1"]
+        assert _keys(store.search("labels = backend AND labels = bug", 10)[0]) == [
+            "TEST-2"
+        ]
+        assert _keys(store.search("status in (Done, 'In Progress')", 10)[0]) == [
+            "DEMO-3",
+            "TEST-1",
+        ]
+        assert store.search("project = NOPE", 10) == ([], 0)
+
+    def test_updated_range(self, store: IssueStore):
+        """Test updated bounds, with and without other filters."""
+        issues, total = store.search(
+            'updated >= "2025-01-02" AND updated < "2025-01-04" ORDER BY updated DESC',
+            10,
+        )
+        filtered, filtered_total = store.search(
+            '(project = TEST) AND updated >= "2025-01-02"', 10
+        )
+
+        assert (total, _keys(issues)) == (2, ["TEST-1", "DEMO-3"])
+        assert (filtered_total, _keys(filtered)) == (2, ["TEST-1", "TEST-4"])
+        assert store.search("updated >= -1w", 10) == ([], 0)
+
+    def test_or_and_unknown_clauses_are_ignored(self, store: IssueStore):
+        """Test that the mock returns everything for filters it cannot answer."""
+        assert store.search("project = DEMO OR status = Done", 10)[1] == 4
+        assert store.search("created >= -3000w ORDER BY updated ASC", 10)[1] == 4
+
+    def test_pages(self, store: IssueStore):
+        """Test offset and limit."""
+        issues, total = store.search("ORDER BY updated ASC", 2, offset=1)
+
+        assert total == 4
+        assert _keys(issues) == ["DEMO-3", "TEST-1"]
+
+    def test_update_fields_reindexes(self, store: IssueStore):
+        """Test that status and updated changes move the issue in the indexes."""
+        store.update_fields(
+            store.get("TEST-2"),
+            status={"name": "Done"},
+            updated="2025-01-09T10:00:00.000+0000",
+        )
+
+        assert _keys(store.search("status = Done", 10)[0]) == ["TEST-1", "TEST-2"]
+        assert _keys(store.search('status = "To Do"', 10)[0]) == ["TEST-4"]
+        assert _keys(store.search("ORDER BY updated DESC", 1)[0]) == ["TEST-2"]
+
+    def test_matches_full_scan(self):
+        """Test that both search strategies agree with filtering every issue."""
+        rng = random.Random(7)
+        store = IssueStore()
+        issues = [
+            _issue(
+                n,
+                f"2025-01-{rng.randint(1, 28):02d}T10:00:00.000+0000",
+                rng.choice(STATUSES),
+                labels=rng.sample(["a", "b", "c", "d"], rng.randint(0, 2)),
+            )
+            for n in range(1, 501)
+        ]
+        store.add_many(issues)
+
+        for jql in [
+            "labels = a ORDER BY updated DESC",
+            "labels in (a, b) AND labels = c",
+            'status = Done AND labels = b AND updated >= "2025-01-10"',
+            'status in (Done, "To Do") AND updated < "2025-01-20"',
+        ]:
+            query = Query.parse(jql)
+            expected = [
+                issue
+                for issue in issues
+                if all(
+                    wanted
+                    & (
+                        {label.lower() for label in issue["fields"]["labels"]}
+                        if name == "labels"
+                        else {issue["fields"]["status"]["name"].lower()}
+                    )
+                    for name, wanted in query.equals
+                )
+                and store._in_range(issue, query)
+            ]
+            expected.sort(
+                key=lambda issue: (issue["fields"]["updated"], issue["id"]),
+                reverse=query.descending,
+            )
+
+            issues_page, total = store.search(jql, limit=20, offset=5)
+
+            assert total == len(expected)
+            assert issues_page == expected[5:25]
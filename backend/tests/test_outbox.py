@@ -0,0 +1,456 @@
+"""Tests for the server-side outbox repository and worker."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.api import outbox
+from app.config import Settings
+from app.core.security import encrypt_api_token
+from app.db.database import Base
+from app.db.repositories import ConnectionRepository, OutboxRepository
+from app.dependencies import (
+    get_connection_repository,
+    get_current_user,
+    get_outbox_repository,
+)
+from app.services.outbox import OutboxWorker
+from app.services.relay_service import RelayResponse
+
+
+class FakeRelay:
+    """Relay stand-in returning scripted responses per path."""
+
+    def __init__(self):
+        self.calls: list[tuple[str, str]] = []
+        self.responses: dict[str, list[RelayResponse]] = {}
+        self.active = 0
+        self.peak = 0
+
+    def script(self, path: str, *responses: RelayResponse) -> None:
+        self.responses[path] = list(responses)
+
+    async def forward_request(self, connection, method, path, body=None, **kwargs):
+        self.calls.append((method, path))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            scripted = self.responses.get(path)
+            if scripted:
+                return scripted.pop(0)
+            return RelayResponse(204, {}, None)
+        finally:
+            self.active -= 1
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    """File-backed SQLite engine.
+
+    The worker runs operations concurrently, each in its own session; the
+    shared in-memory engine would interleave their transactions on a single
+    connection.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'outbox.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine) -> async_sessionmaker:
+    """Session factory bound to the test engine."""
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest_asyncio.fixture
+async def connection(connection_repository: ConnectionRepository, test_user):
+    """Create a JIRA connection."""
+    return await connection_repository.create(
+        user_id=test_user.id,
+        name="Outbox",
+        jira_url="https://test.atlassian.net",
+        email="test@example.com",
+        api_token_encrypted=encrypt_api_token("token"),
+    )
+
+
+def _op(kind: str, key: str, client_op_id: str | None = None, **payload):
+    return {
+        "client_op_id": client_op_id,
+        "kind": kind,
+        "entity_key": key,
+        "payload": payload or {"fields": {"summary": "x"}},
+    }
+
+
+def _worker(session_factory, relay, **overrides) -> OutboxWorker:
+    values = {"outbox_concurrency": 4, "outbox_max_attempts": 3}
+    values.update(overrides)
+    return OutboxWorker(session_factory, relay, Settings(**values))
+
+
+async def _statuses(session_factory, connection_id: str) -> list[tuple[str, str]]:
+    async with session_factory() as session:
+        ops = await OutboxRepository(session).list_for_connection(connection_id)
+    return [(op.entity_key, op.status) for op in ops]
+
+
+async def _make_due(session_factory, connection_id: str) -> None:
+    """Move every retry into the past so the next round picks it up."""
+    async with session_factory() as session:
+        repo = OutboxRepository(session)
+        for op in await repo.list_for_connection(connection_id, status="pending"):
+            op.next_attempt_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+        await session.commit()
+
+
+class TestOutboxRepository:
+    """Tests for OutboxRepository."""
+
+    @pytest.mark.asyncio
+    async def test_enqueue_is_idempotent_per_client_op(
+        self, db_session, connection, test_user
+    ):
+        """Test that re-uploading a client op ID returns the original."""
+        repo = OutboxRepository(db_session)
+        first = await repo.enqueue(
+            test_user.id, connection.id, [_op("update", "T-1", "op-1")]
+        )
+        second = await repo.enqueue(
+            test_user.id,
+            connection.id,
+            [_op("update", "T-1", "op-1"), _op("comment", "T-1", "op-2")],
+        )
+
+        assert second[0].id == first[0].id
+        assert len(await repo.list_for_connection(connection.id)) == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_upload_of_same_client_op(
+        self, session_factory, connection, test_user, monkeypatch
+    ):
+        """Test that losing the insert race returns the winner's operation."""
+        async with session_factory() as session:
+            winner = await OutboxRepository(session).enqueue(
+                test_user.id, connection.id, [_op("update", "T-1", "op-1")]
+            )
+        lookup = OutboxRepository._existing_client_ops
+        calls = []
+
+        async def stale_lookup(self, connection_id, client_ids):
+            # The first lookup ran before the winning upload committed
+            calls.append(client_ids)
+            if len(calls) == 1:
+                return {}
+            return await lookup(self, connection_id, client_ids)
+
+        monkeypatch.setattr(OutboxRepository, "_existing_client_ops", stale_lookup)
+        async with session_factory() as session:
+            loser = await OutboxRepository(session).enqueue(
+                test_user.id, connection.id, [_op("update", "T-1", "op-1")]
+            )
+
+        assert len(calls) == 2
+        assert loser[0].id == winner[0].id
+        assert len(await _statuses(session_factory, connection.id)) == 1
+
+    @pytest.mark.asyncio
+    async def test_claim_only_heads_of_each_issue(
+        self, db_session, connection, test_user
+    ):
+        """Test that only the oldest unfinished op per issue is claimable."""
+        repo = OutboxRepository(db_session)
+        ops = await repo.enqueue(
+            test_user.id,
+            connection.id,
+            [_op("update", "T-1"), _op("comment", "T-1"), _op("update", "T-2")],
+        )
+        now = datetime.now(timezone.utc)
+
+        claimed = await repo.claim_ready(now, now + timedelta(minutes=5), limit=10)
+        again = await repo.claim_ready(now, now + timedelta(minutes=5), limit=10)
+
+        assert [op.id for op in claimed] == [ops[0].id, ops[2].id]
+        assert again == []
+
+    @pytest.mark.asyncio
+    async def test_finish_rekeys_follow_ups_with_the_outcome(
+        self, db_session, connection, test_user
+    ):
+        """Test that the next op is claimable only once it has the new key."""
+        repo = OutboxRepository(db_session)
+        create, _ = await repo.enqueue(
+            test_user.id,
+            connection.id,
+            [_op("create", "local-1"), _op("comment", "local-1")],
+        )
+        now = datetime.now(timezone.utc)
+        await repo.claim_ready(now, now + timedelta(minutes=5), limit=10)
+
+        await repo.finish(create.id, "succeeded", 201, new_entity_key="TEST-42")
+        claimed = await repo.claim_ready(now, now + timedelta(minutes=5), limit=10)
+
+        assert [op.entity_key for op in claimed] == ["TEST-42"]
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_is_reclaimed(self, db_session, connection, test_user):
+        """Test that operations of a dead worker run again after the lease."""
+        repo = OutboxRepository(db_session)
+        await repo.enqueue(test_user.id, connection.id, [_op("update", "T-1")])
+        now = datetime.now(timezone.utc)
+        await repo.claim_ready(now, now + timedelta(seconds=1), limit=10)
+
+        later = now + timedelta(seconds=2)
+        claimed = await repo.claim_ready(later, later + timedelta(minutes=5), limit=10)
+
+        assert len(claimed) == 1
+
+
+class TestOutboxWorker:
+    """Tests for OutboxWorker."""
+
+    @pytest.mark.asyncio
+    async def test_per_issue_order_and_cross_issue_concurrency(
+        self, session_factory, connection, test_user
+    ):
+        """Test that one issue's ops run in order while issues run in parallel."""
+        async with session_factory() as session:
+            await OutboxRepository(session).enqueue(
+                test_user.id,
+                connection.id,
+                [
+                    _op("update", "T-1"),
+                    _op("transition", "T-1", transition={"id": "31"}),
+                    _op("comment", "T-1", body="done"),
+                    _op("update", "T-2"),
+                    _op("update", "T-3"),
+                ],
+            )
+        relay = FakeRelay()
+        worker = _worker(session_factory, relay)
+
+        while await worker.run_once():
+            pass
+
+        t1_calls = [path for _, path in relay.calls if "/T-1" in path]
+        assert t1_calls == [
+            "/rest/api/3/issue/T-1",
+            "/rest/api/3/issue/T-1/transitions",
+            "/rest/api/3/issue/T-1/comment",
+        ]
+        assert relay.peak == 3
+        assert {s for _, s in await _statuses(session_factory, connection.id)} == {
+            "succeeded"
+        }
+
+    @pytest.mark.asyncio
+    async def test_create_rekeys_follow_up_operations(
+        self, session_factory, connection, test_user
+    ):
+        """Test that ops queued on a temporary key follow the created issue."""
+        async with session_factory() as session:
+            await OutboxRepository(session).enqueue(
+                test_user.id,
+                connection.id,
+                [_op("create", "local-1"), _op("comment", "local-1", body="hi")],
+            )
+        relay = FakeRelay()
+        relay.script(
+            "/rest/api/3/issue",
+            RelayResponse(201, {}, b'{"id": "10001", "key": "TEST-42"}'),
+        )
+        worker = _worker(session_factory, relay)
+
+        while await worker.run_once():
+            pass
+
+        assert relay.calls[-1] == ("POST", "/rest/api/3/issue/TEST-42/comment")
+
+    @pytest.mark.asyncio
+    async def test_failed_create_fails_its_follow_ups(
+        self, session_factory, connection, test_user
+    ):
+        """Test that ops on a never-created issue fail without reaching JIRA."""
+        async with session_factory() as session:
+            create, comment, other = await OutboxRepository(session).enqueue(
+                test_user.id,
+                connection.id,
+                [
+                    _op("create", "local-1"),
+                    _op("comment", "local-1", body="hi"),
+                    _op("update", "T-2"),
+                ],
+            )
+        relay = FakeRelay()
+        relay.script("/rest/api/3/issue", RelayResponse(400, {}, b'{"errors": {}}'))
+        worker = _worker(session_factory, relay)
+
+        while await worker.run_once():
+            pass
+
+        async with session_factory() as session:
+            ops = await OutboxRepository(session).list_for_connection(connection.id)
+        assert [(op.id, op.status) for op in ops] == [
+            (create.id, "failed"),
+            (comment.id, "failed"),
+            (other.id, "succeeded"),
+        ]
+        assert ops[1].last_error == f"Depends on failed operation {create.id}"
+        assert ops[1].attempts == 0
+        assert ("POST", "/rest/api/3/issue/local-1/comment") not in relay.calls
+
+    @pytest.mark.asyncio
+    async def test_server_errors_are_retried_then_fail(
+        self, session_factory, connection, test_user
+    ):
+        """Test backoff retries and the attempt limit."""
+        async with session_factory() as session:
+            await OutboxRepository(session).enqueue(
+                test_user.id, connection.id, [_op("update", "T-1")]
+            )
+        relay = FakeRelay()
+        relay.script(
+            "/rest/api/3/issue/T-1",
+            *[RelayResponse(503, {}, b"busy")] * 3,
+        )
+        worker = _worker(session_factory, relay)
+
+        for _ in range(3):
+            await worker.run_once()
+            await _make_due(session_factory, connection.id)
+
+        async with session_factory() as session:
+            (op,) = await OutboxRepository(session).list_for_connection(connection.id)
+        assert op.status == "failed"
+        assert op.attempts == 3
+        assert op.response_status == 503
+
+    @pytest.mark.asyncio
+    async def test_client_errors_fail_without_retry(
+        self, session_factory, connection, test_user
+    ):
+        """Test that a 400 is final and doesn't block later ops of the issue."""
+        async with session_factory() as session:
+            await OutboxRepository(session).enqueue(
+                test_user.id,
+                connection.id,
+                [_op("update", "T-1"), _op("comment", "T-1", body="x")],
+            )
+        relay = FakeRelay()
+        relay.script(
+            "/rest/api/3/issue/T-1",
+            RelayResponse(400, {}, b'{"errors": {"summary": "required"}}'),
+        )
+        worker = _worker(session_factory, relay)
+
+        while await worker.run_once():
+            pass
+
+        assert await _statuses(session_factory, connection.id) == [
+            ("T-1", "failed"),
+            ("T-1", "succeeded"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_pauses_connection(
+        self, session_factory, connection, test_user
+    ):
+        """Test that a 429 defers the op without using up an attempt."""
+        async with session_factory() as session:
+            await OutboxRepository(session).enqueue(
+                test_user.id,
+                connection.id,
+                [_op("update", "T-1"), _op("update", "T-2")],
+            )
+        relay = FakeRelay()
+        relay.script(
+            "/rest/api/3/issue/T-1",
+            RelayResponse(429, {"Retry-After": "120"}, None),
+        )
+        worker = _worker(session_factory, relay, outbox_concurrency=1)
+
+        await worker.run_once()
+        calls_after_first_round = len(relay.calls)
+        await _make_due(session_factory, connection.id)
+        await worker.run_once()
+
+        assert calls_after_first_round == 1
+        assert len(relay.calls) == 1
+        async with session_factory() as session:
+            ops = await OutboxRepository(session).list_for_connection(connection.id)
+        assert [(op.status, op.attempts) for op in ops] == [
+            ("pending", 0),
+            ("pending", 0),
+        ]
+
+
+class TestOutboxApi:
+    """Tests for the outbox endpoints."""
+
+    @staticmethod
+    def _client(outbox_repo) -> TestClient:
+        class FakeConnections:
+            async def get_by_id(self, connection_id):
+                if connection_id == "missing":
+                    return None
+                owner = "u2" if connection_id == "theirs" else "u1"
+                return SimpleNamespace(id=connection_id, user_id=owner)
+
+        app = FastAPI()
+        app.include_router(outbox.router, prefix="/api")
+        app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id="u1")
+        app.dependency_overrides[get_connection_repository] = FakeConnections
+        app.dependency_overrides[get_outbox_repository] = lambda: outbox_repo
+        return TestClient(app)
+
+    def test_connection_must_be_owned(self):
+        """Test that other users' and unknown connections are refused."""
+        client = self._client(SimpleNamespace())
+
+        theirs = client.get("/api/outbox/theirs/operations")
+        missing = client.get("/api/outbox/missing/operations")
+
+        assert (theirs.status_code, missing.status_code) == (403, 404)
+
+    def test_malformed_ids_are_rejected(self):
+        """Test that a non-numeric ids filter is a 400, not a 404."""
+        client = self._client(SimpleNamespace())
+
+        response = client.get("/api/outbox/c1/operations", params={"ids": "1,x"})
+
+        assert response.status_code == 400
+
+    def test_upload_conflict_is_409(self):
+        """Test that an upload that keeps losing the insert race is a 409."""
+
+        class RacingRepo:
+            async def enqueue(self, user_id, connection_id, items):
+                raise IntegrityError("INSERT", {}, Exception("unique"))
+
+        client = self._client(RacingRepo())
+
+        response = client.post(
+            "/api/outbox/c1/operations",
+            json={
+                "operations": [
+                    {
+                        "client_op_id": "op-1",
+                        "issue_key": "T-1",
+                        "kind": "update",
+                        "payload": {},
+                    }
+                ]
+            },
+        )
+
+        assert response.status_code == 409
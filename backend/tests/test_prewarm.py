@@ -0,0 +1,254 @@
+"""Tests for the prewarm scheduler and the relay metadata cache."""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import Settings
+from app.core.cache import Cache, MemoryCacheBackend
+from app.core.security import encrypt_api_token
+from app.db.repositories import ConnectionRepository, IssueSearchRepository
+from app.services.metadata_cache import METADATA_PATHS, MetadataCache
+from app.services.prewarm import PrewarmScheduler, should_record_use
+from app.services.relay_service import RelayResponse
+
+
+class FakeRelay:
+    """Relay stand-in that records calls instead of contacting JIRA."""
+
+    def __init__(self, status_code: int = 200):
+        self.status_code = status_code
+        self.calls: list[tuple[str, str]] = []
+
+    async def forward_request(self, connection, method, path, **kwargs):
+        self.calls.append((connection.id, path))
+        return RelayResponse(self.status_code, {}, b"[]")
+
+    async def search_issues(self, connection, jql=None, **kwargs) -> dict[str, Any]:
+        self.calls.append((connection.id, "search"))
+        return {
+            "issues": [
+                {"id": "1", "key": "TEST-1", "fields": {"summary": "Warm issue"}},
+                {"id": "2", "key": "TEST-2", "fields": {"summary": "Other issue"}},
+            ]
+        }
+
+    async def get_comments(self, connection, issue_id_or_key) -> dict[str, Any]:
+        self.calls.append((connection.id, f"comments:{issue_id_or_key}"))
+        return {"comments": [{"body": f"prewarmed comment {issue_id_or_key}"}]}
+
+
+@pytest.fixture
+def session_factory(engine) -> async_sessionmaker:
+    """Session factory bound to the test engine."""
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def _create_connection(
+    repo: ConnectionRepository,
+    user_id: str,
+    name: str,
+    last_used_minutes_ago: int | None,
+    jira_url: str = "https://test.atlassian.net",
+):
+    connection = await repo.create(
+        user_id=user_id,
+        name=name,
+        jira_url=jira_url,
+        email="test@example.com",
+        api_token_encrypted=encrypt_api_token("token"),
+    )
+    if last_used_minutes_ago is not None:
+        used_at = datetime.now(timezone.utc) - timedelta(minutes=last_used_minutes_ago)
+        await repo.update(connection, last_used_at=used_at)
+    return connection
+
+
+@pytest_asyncio.fixture
+async def connections(connection_repository: ConnectionRepository, test_user):
+    """Create connections with different recency of use."""
+    return {
+        "hot": await _create_connection(connection_repository, test_user.id, "hot", 1),
+        "warm": await _create_connection(
+            connection_repository, test_user.id, "warm", 60
+        ),
+        "stale": await _create_connection(
+            connection_repository, test_user.id, "stale", 60 * 24 * 30
+        ),
+        "unused": await _create_connection(
+            connection_repository, test_user.id, "unused", None
+        ),
+        "demo": await _create_connection(
+            connection_repository, test_user.id, "demo", 0, jira_url="demo://local"
+        ),
+    }
+
+
+def _cache(ttl_seconds: float = 60) -> MetadataCache:
+    """Create a metadata cache on a private in-memory backend."""
+    return MetadataCache(
+        ttl_seconds, Cache("metadata", MemoryCacheBackend(max_bytes=1024 * 1024))
+    )
+
+
+def _settings(**overrides) -> Settings:
+    values = {"prewarm_upstream_budget": 100, "prewarm_comment_issues": 1}
+    values.update(overrides)
+    return Settings(**values)
+
+
+class TestMetadataCache:
+    """Tests for MetadataCache."""
+
+    def test_is_cacheable(self):
+        """Test that only metadata endpoints are cacheable."""
+        assert MetadataCache.is_cacheable("/rest/api/3/field")
+        assert MetadataCache.is_cacheable("/rest/api/2/project/search")
+        assert not MetadataCache.is_cacheable("/rest/api/3/issue/TEST-1")
+        assert not MetadataCache.is_cacheable("/rest/api/3/fieldx")
+
+    @pytest.mark.asyncio
+    async def test_put_and_get_shares_entries_across_api_versions(self):
+        """Test that v2 and v3 paths map to the same entry."""
+        cache = _cache()
+        await cache.put("c1", "/rest/api/2/field", "", 200, {"a": "b"}, b"[1]")
+
+        cached = await cache.get("c1", "/rest/api/3/field")
+        assert cached.body == b"[1]"
+        assert cached.headers == {"a": "b"}
+        assert await cache.get("c2", "/rest/api/3/field") is None
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self):
+        """Test that non-200 responses are never stored."""
+        cache = _cache()
+        await cache.put("c1", "/rest/api/3/field", "", 500, {}, b"oops")
+
+        assert await cache.get("c1", "/rest/api/3/field") is None
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_miss(self):
+        """Test TTL expiry."""
+        cache = _cache(ttl_seconds=-1)
+        await cache.put("c1", "/rest/api/3/field", "", 200, {}, b"[]")
+
+        assert await cache.get("c1", "/rest/api/3/field") is None
+
+    @pytest.mark.asyncio
+    async def test_invalidate_connection(self):
+        """Test dropping all entries of one connection."""
+        cache = _cache()
+        await cache.put("c1", "/rest/api/3/field", "", 200, {}, b"[]")
+        await cache.put("c2", "/rest/api/3/field", "", 200, {}, b"[]")
+
+        await cache.invalidate_connection("c1")
+
+        assert await cache.get("c1", "/rest/api/3/field") is None
+        assert await cache.get("c2", "/rest/api/3/field") is not None
+
+
+class TestUsageTracking:
+    """Tests for last-used bookkeeping."""
+
+    def test_should_record_use_is_throttled(self):
+        """Test that repeated uses only record once per interval."""
+        assert should_record_use("throttle-test") is True
+        assert should_record_use("throttle-test") is False
+
+    @pytest.mark.asyncio
+    async def test_get_recently_used_orders_by_recency(
+        self, connection_repository: ConnectionRepository, connections
+    ):
+        """Test ranking of recently used connections."""
+        since = datetime.now(timezone.utc) - timedelta(days=3)
+
+        recent = await connection_repository.get_recently_used(since, limit=10)
+
+        assert [c.name for c in recent] == ["demo", "hot", "warm"]
+
+    @pytest.mark.asyncio
+    async def test_touch_last_used(
+        self, connection_repository: ConnectionRepository, connections
+    ):
+        """Test that touching a connection makes it the most recent."""
+        await connection_repository.touch_last_used(connections["unused"].id)
+        since = datetime.now(timezone.utc) - timedelta(minutes=1)
+
+        recent = await connection_repository.get_recently_used(since, limit=10)
+
+        assert connections["unused"].id in [c.id for c in recent]
+
+
+class TestPrewarmScheduler:
+    """Tests for PrewarmScheduler cycles."""
+
+    @pytest.mark.asyncio
+    async def test_cycle_refreshes_recent_connections(
+        self, session_factory, connections
+    ):
+        """Test metadata, issues and comments are refreshed for used connections."""
+        relay = FakeRelay()
+        cache = _cache()
+        scheduler = PrewarmScheduler(session_factory, relay, cache, _settings())
+
+        calls = await scheduler.run_cycle()
+
+        refreshed = {connection_id for connection_id, _ in relay.calls}
+        assert refreshed == {connections["hot"].id, connections["warm"].id}
+        assert calls == len(relay.calls)
+        assert await cache.get(connections["hot"].id, "/rest/api/3/field") is not None
+
+        async with session_factory() as session:
+            repo = IssueSearchRepository(session)
+            total, _ = await repo.search(connections["hot"].id, "warm")
+            assert total == 1
+            total, _ = await repo.search(connections["hot"].id, "prewarmed")
+            assert total == 1
+
+    @pytest.mark.asyncio
+    async def test_cycle_respects_upstream_budget(self, session_factory, connections):
+        """Test that a cycle never exceeds its upstream call budget."""
+        relay = FakeRelay()
+        budget = len(METADATA_PATHS) + 1
+        scheduler = PrewarmScheduler(
+            session_factory,
+            relay,
+            _cache(),
+            _settings(prewarm_upstream_budget=budget),
+        )
+
+        calls = await scheduler.run_cycle()
+
+        assert calls == budget
+        # The budget went to the most recently used connection
+        assert {c for c, _ in relay.calls} == {connections["hot"].id}
+
+    @pytest.mark.asyncio
+    async def test_refreshed_connections_are_not_due_again(
+        self, session_factory, connections
+    ):
+        """Test that the schedule skips connections refreshed this interval."""
+        relay = FakeRelay()
+        scheduler = PrewarmScheduler(session_factory, relay, _cache(), _settings())
+
+        await scheduler.run_cycle()
+        relay.calls.clear()
+        calls = await scheduler.run_cycle()
+
+        assert calls == 0
+
+    @pytest.mark.asyncio
+    async def test_auth_failure_stops_connection_refresh(
+        self, session_factory, connections
+    ):
+        """Test that a 401 stops spending budget on that connection."""
+        relay = FakeRelay(status_code=401)
+        scheduler = PrewarmScheduler(session_factory, relay, _cache(), _settings())
+
+        calls = await scheduler.run_cycle()
+
+        # One metadata call per connection, then the refresh is abandoned
+        assert calls == 2
@@ -0,0 +1,146 @@
+"""Tests for the on-demand sampling profiler."""
+
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.core.profiler import (
+    PROFILE_ID_HEADER,
+    ProfileNotFound,
+    ProfilingMiddleware,
+    SamplingProfiler,
+)
+
+
+def _spin(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _other_spin(seconds: float) -> None:
+    _spin(seconds)
+
+
+@pytest.fixture
+def profiler() -> SamplingProfiler:
+    return SamplingProfiler(interval=0.001)
+
+
+def _client(profiler: SamplingProfiler) -> httpx.AsyncClient:
+    app = FastAPI()
+
+    @app.get("/slow")
+    async def slow():
+        await asyncio.sleep(0.05)
+        _spin(0.1)
+        return {}
+
+    @app.get("/other")
+    async def other():
+        _other_spin(0.1)
+        return {}
+
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://t"
+    )
+
+
+class TestRequestProfiles:
+    """Tests for profiling armed requests."""
+
+    @pytest.mark.asyncio
+    async def test_armed_request_is_profiled(self, profiler: SamplingProfiler):
+        """Test that only the armed number of matching requests is profiled."""
+        profiler.arm("/slow", count=1, method="get")
+
+        async with _client(profiler) as client:
+            other = await client.get("/other")
+            first = await client.get("/slow")
+            second = await client.get("/slow")
+
+        profile = profiler.get(int(first.headers[PROFILE_ID_HEADER]))
+
+        assert PROFILE_ID_HEADER not in other.headers
+        assert PROFILE_ID_HEADER not in second.headers
+        assert profile.name == "GET /slow"
+        assert "_spin" in profile.folded()
+        assert profiler.status()["armed"] is None
+
+    @pytest.mark.asyncio
+    async def test_interleaved_requests_left_out(self, profiler: SamplingProfiler):
+        """Test that other requests running on the loop are not attributed."""
+        profiler.arm("/slow", count=1)
+
+        async with _client(profiler) as client:
+            slow, _ = await asyncio.gather(client.get("/slow"), client.get("/other"))
+
+        folded = profiler.get(int(slow.headers[PROFILE_ID_HEADER])).folded()
+
+        assert "slow (" in folded
+        assert "_other_spin" not in folded
+        for line in folded.splitlines():
+            assert line.startswith("ProfilingMiddleware.__call__ (")
+            assert int(line.rsplit(" ", 1)[1]) > 0
+
+
+class TestWindowProfiles:
+    """Tests for whole-worker profiles."""
+
+    def test_window_samples_all_threads(self, profiler: SamplingProfiler):
+        """Test that busy threads show up in a window profile."""
+        worker = threading.Thread(target=_spin, args=(0.3,))
+        worker.start()
+        profile = profiler.profile_window(0.2)
+        worker.join()
+
+        assert profile.samples > 0
+        assert "_spin" in profile.folded()
+        assert profiler.status()["active"] == []
+
+    def test_old_profiles_are_evicted(self):
+        """Test that only max_profiles finished profiles are kept."""
+        profiler = SamplingProfiler(interval=0.001, max_profiles=1)
+        first = profiler.profile_window(0.01)
+        profiler.profile_window(0.01)
+
+        with pytest.raises(ProfileNotFound):
+            profiler.get(first.id)
+
+
+class TestApplicationStack:
+    """Tests for request profiles through the application middleware."""
+
+    @pytest.mark.asyncio
+    async def test_handler_is_profiled_under_task_middlewares(self):
+        """Test that handlers run by deadline/disconnect tasks are sampled."""
+        from app.core.profiler import profiler
+        from app.main import create_app
+
+        app = create_app()
+
+        @app.get("/profiled-spin")
+        async def profiled_spin():
+            await asyncio.sleep(0.01)
+            _spin(0.2)
+            return {}
+
+        profiler.arm("/profiled-spin", count=1)
+        try:
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://t"
+            ) as client:
+                response = await client.get("/profiled-spin")
+        finally:
+            profiler.disarm()
+
+        profile = profiler.get(int(response.headers[PROFILE_ID_HEADER]))
+
+        assert profile.samples > 0
+        assert "profiled_spin" in profile.folded()
+        assert "_spin" in profile.folded()
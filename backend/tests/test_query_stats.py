@@ -0,0 +1,99 @@
+"""Tests for per-request query statistics and N+1 detection."""
+
+import logging
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import get_settings
+from app.db.database import (
+    instrument_query_stats,
+    normalize_sql,
+    recent_slow_queries,
+    repeated_queries,
+    track_queries,
+)
+
+
+@pytest_asyncio.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    instrument_query_stats(engine)
+    yield engine
+    await engine.dispose()
+
+
+class TestNormalizeSql:
+    """Tests for SQL normalisation."""
+
+    @pytest.mark.parametrize(
+        "statement, expected",
+        [
+            ("SELECT * FROM t WHERE id = 42", "SELECT * FROM t WHERE id = ?"),
+            (
+                "SELECT * FROM t WHERE name = 'O''Brien'",
+                "SELECT * FROM t WHERE name = ?",
+            ),
+            (
+                "SELECT *\n  FROM t WHERE id IN (?, ?, ?)",
+                "SELECT * FROM t WHERE id IN (?)",
+            ),
+            (
+                "SELECT * FROM t WHERE a = $1 AND b = $2",
+                "SELECT * FROM t WHERE a = ? AND b = ?",
+            ),
+        ],
+    )
+    def test_literals_and_placeholders(self, statement, expected):
+        """Test that statements differing only in values normalise alike."""
+        assert normalize_sql(statement) == expected
+
+
+class TestTrackQueries:
+    """Tests for query counting within a scope."""
+
+    @pytest.mark.asyncio
+    async def test_counts_and_timing(self, engine):
+        """Test that statements inside the scope are counted and timed."""
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            with track_queries("GET /items") as stats:
+                await conn.execute(text("SELECT 1"))
+                await conn.execute(text("SELECT 2"))
+
+        assert stats.count == 2
+        assert stats.total_seconds > 0
+        assert stats.statements == {"SELECT ?": 2}
+
+    @pytest.mark.asyncio
+    async def test_repeated_statement_warns(self, engine, caplog):
+        """Test that an N+1 pattern is reported with its SQL."""
+        before = repeated_queries.value()
+        threshold = get_settings().db_repeated_query_threshold
+
+        with caplog.at_level(logging.WARNING, logger="app.db.database"):
+            async with engine.connect() as conn:
+                with track_queries("GET /projects"):
+                    for n in range(threshold):
+                        await conn.execute(text(f"SELECT {n} AS issue_id"))
+
+        assert repeated_queries.value() == before + 1
+        assert f"ran the same query {threshold} times" in caplog.text
+        assert "SELECT ? AS issue_id" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_slow_queries_are_sampled(self, engine, monkeypatch):
+        """Test that slow statements are kept with their normalised SQL."""
+        monkeypatch.setenv("DB_SLOW_QUERY_SECONDS", "0")
+        get_settings.cache_clear()
+        try:
+            async with engine.connect() as conn:
+                with track_queries("GET /slow") as stats:
+                    await conn.execute(text("SELECT 'secret'"))
+        finally:
+            get_settings.cache_clear()
+
+        assert stats.slow[0]["sql"] == "SELECT ?"
+        assert recent_slow_queries[-1]["scope"] == "GET /slow"
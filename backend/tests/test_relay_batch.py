@@ -0,0 +1,217 @@
+"""Tests for the relay batch endpoint."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import relay
+from app.dependencies import get_connection_repository, get_current_user
+from app.services.mock_jira import reset_storage
+from app.services.relay_service import RelayError, RelayResponse, RelayService
+
+USER = SimpleNamespace(id="user-1")
+
+
+class FakeConnectionRepo:
+    """Connection repository holding a fixed set of connections."""
+
+    def __init__(self, *connections):
+        self._connections = {c.id: c for c in connections}
+
+    async def get_by_id(self, connection_id):
+        return self._connections.get(connection_id)
+
+    async def get_by_user_id(self, user_id):
+        return [c for c in self._connections.values() if c.user_id == user_id]
+
+    async def touch_last_used(self, connection_id):
+        pass
+
+
+def _connection(connection_id: str, jira_url: str, user_id: str = USER.id):
+    return SimpleNamespace(
+        id=connection_id,
+        name=connection_id,
+        jira_url=jira_url,
+        user_id=user_id,
+        api_version=3,
+    )
+
+
+class FakeRelay:
+    """Records forwarded requests and tracks peak concurrency."""
+
+    def __init__(self):
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+
+    async def forward_request(self, connection, method, path, body, query_params):
+        self.calls.append((method, path, body, query_params))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            if path.endswith("/boom"):
+                raise RelayError(503, "Upstream unavailable")
+            return RelayResponse(
+                200,
+                {"content-type": "application/json"},
+                b'{"path": "%s"}' % path.encode(),
+            )
+        finally:
+            self.active -= 1
+
+
+@pytest.fixture
+def fake_relay(monkeypatch: pytest.MonkeyPatch) -> FakeRelay:
+    """Replace the relay service and background indexing."""
+    fake = FakeRelay()
+    monkeypatch.setattr(relay, "relay_service", fake)
+
+    async def no_index(*args):
+        pass
+
+    monkeypatch.setattr(relay, "index_relay_response", no_index)
+    return fake
+
+
+@pytest.fixture
+def client(fake_relay: FakeRelay) -> TestClient:
+    """Create a test app with the relay and mock JIRA routers."""
+    reset_storage()
+    app = FastAPI()
+    app.include_router(relay.router, prefix="/api")
+    repo = FakeConnectionRepo(
+        _connection("real", "https://jira.example.com"),
+        _connection("demo", "demo://local"),
+        _connection("other", "https://jira.example.com", user_id="user-2"),
+    )
+    app.dependency_overrides[get_current_user] = lambda: USER
+    app.dependency_overrides[get_connection_repository] = lambda: repo
+    return TestClient(app)
+
+
+class TestRelayBatch:
+    """Tests for POST /api/jira/{connection_id}/batch."""
+
+    def test_results_are_returned_in_request_order(
+        self, client: TestClient, fake_relay: FakeRelay
+    ):
+        """Test that each sub-request gets its own result."""
+        response = client.post(
+            "/api/jira/real/batch",
+            json={
+                "requests": [
+                    {"id": "issue", "path": "/rest/api/3/issue/T-1"},
+                    {"id": "comments", "path": "/rest/api/3/issue/T-1/comment"},
+                    {
+                        "id": "transitions",
+                        "path": "/rest/api/3/issue/T-1/transitions",
+                        "query": {"expand": "transitions.fields"},
+                    },
+                ]
+            },
+        )
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["id"] for r in results] == ["issue", "comments", "transitions"]
+        assert all(r["status"] == 200 for r in results)
+        assert results[1]["body"] == {"path": "/rest/api/3/issue/T-1/comment"}
+        assert fake_relay.calls[2][3] == {"expand": "transitions.fields"}
+
+    def test_failures_are_reported_per_item(self, client: TestClient):
+        """Test that one failing sub-request doesn't fail the batch."""
+        response = client.post(
+            "/api/jira/real/batch",
+            json={
+                "requests": [
+                    {"path": "/rest/api/3/boom"},
+                    {"path": "/rest/api/3/issue/T-1"},
+                    {"path": "/rest/api/3/../../admin"},
+                    {"path": "/secure/Dashboard.jspa"},
+                ]
+            },
+        )
+
+        assert response.status_code == 200
+        statuses = [r["status"] for r in response.json()["results"]]
+        assert statuses == [503, 200, 400, 400]
+
+    def test_concurrency_is_capped(
+        self,
+        client: TestClient,
+        fake_relay: FakeRelay,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """Test that at most relay_batch_concurrency calls run at once."""
+        settings = relay.get_settings()
+        monkeypatch.setattr(settings, "relay_batch_concurrency", 2)
+
+        response = client.post(
+            "/api/jira/real/batch",
+            json={"requests": [{"path": f"/rest/api/3/issue/T-{i}"} for i in range(6)]},
+        )
+
+        assert response.status_code == 200
+        assert len(fake_relay.calls) == 6
+        assert fake_relay.peak == 2
+
+    def test_too_many_requests_rejected(
+        self, client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Test the per-batch size limit."""
+        settings = relay.get_settings()
+        monkeypatch.setattr(settings, "relay_batch_max_requests", 2)
+
+        response = client.post(
+            "/api/jira/real/batch",
+            json={"requests": [{"path": "/rest/api/3/issue/T-1"}] * 3},
+        )
+
+        assert response.status_code == 400
+
+    def test_foreign_connection_forbidden(self, client: TestClient):
+        """Test that the connection ownership check applies once per batch."""
+        response = client.post(
+            "/api/jira/other/batch",
+            json={"requests": [{"path": "/rest/api/3/issue/T-1"}]},
+        )
+
+        assert response.status_code == 403
+
+    def test_demo_connection_uses_mock_jira(
+        self, client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Test that demo sub-requests are served by the in-process mock."""
+        monkeypatch.setattr(relay, "relay_service", RelayService())
+
+        response = client.post(
+            "/api/jira/demo/batch",
+            json={
+                "requests": [
+                    {
+                        "method": "POST",
+                        "path": "/rest/api/3/issue",
+                        "body": {
+                            "fields": {
+                                "summary": "Batched",
+                                "project": {"key": "TEST"},
+                                "issuetype": {"name": "Task"},
+                            }
+                        },
+                    },
+                    {"path": "/rest/api/3/issue/NOPE-1"},
+                ]
+            },
+        )
+
+        assert response.status_code == 200
+        created, missing = response.json()["results"]
+        assert created["status"] == 200
+        assert created["body"]["fields"]["summary"] == "Batched"
+        assert missing["status"] == 404
@@ -0,0 +1,321 @@
+"""Tests for the issue full-text search index."""
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+
+from app.core.security import encrypt_api_token
+from app.db.repositories import ConnectionRepository, IssueSearchRepository
+from app.models.search_index import IssueSearchEntry
+from app.services.search_index import (
+    adf_to_text,
+    build_issue_document,
+    extract_issue_documents,
+)
+
+
+def _adf(*paragraphs: str) -> dict:
+    """Build a minimal ADF document with one paragraph per argument."""
+    return {
+        "type": "doc",
+        "version": 1,
+        "content": [
+            {"type": "paragraph", "content": [{"type": "text", "text": p}]}
+            for p in paragraphs
+        ],
+    }
+
+
+def _issue(key: str, summary: str, description=None, comments=()) -> dict:
+    """Build a minimal JIRA issue payload."""
+    return {
+        "id": key.split("-")[1],
+        "key": key,
+        "fields": {
+            "summary": summary,
+            "description": description,
+            "updated": "2026-01-01T00:00:00.000+00:00",
+            "comment": {"comments": [{"body": c} for c in comments]},
+        },
+    }
+
+
+@pytest.fixture
+def search_repository(db_session) -> IssueSearchRepository:
+    """Create an IssueSearchRepository instance."""
+    return IssueSearchRepository(db_session)
+
+
+@pytest_asyncio.fixture
+async def connection(connection_repository: ConnectionRepository, test_user):
+    """Create a JIRA connection to scope index entries to."""
+    return await connection_repository.create(
+        user_id=test_user.id,
+        name="Test JIRA",
+        jira_url="https://test.atlassian.net",
+        email="test@example.com",
+        api_token_encrypted=encrypt_api_token("test-api-token"),
+    )
+
+
+class TestDocumentExtraction:
+    """Tests for turning JIRA payloads into plain-text documents."""
+
+    def test_adf_to_text_joins_paragraphs(self):
+        """Test that ADF paragraphs become separate lines."""
+        assert adf_to_text(_adf("First line", "Second line")) == (
+            "First line\nSecond line"
+        )
+
+    def test_adf_to_text_handles_mentions_and_breaks(self):
+        """Test that inline mention and hardBreak nodes are rendered."""
+        doc = {
+            "type": "doc",
+            "content": [
+                {
+                    "type": "paragraph",
+                    "content": [
+                        {"type": "text", "text": "Ping "},
+                        {"type": "mention", "attrs": {"text": "@alice"}},
+                        {"type": "hardBreak"},
+                        {"type": "text", "text": "done"},
+                    ],
+                }
+            ],
+        }
+        assert adf_to_text(doc) == "Ping @alice\ndone"
+
+    def test_adf_to_text_passes_through_strings(self):
+        """Test that v2 plain-text descriptions are kept as-is."""
+        assert adf_to_text("plain text") == "plain text"
+        assert adf_to_text(None) == ""
+
+    def test_build_issue_document_includes_comments(self):
+        """Test that comment bodies are collected into the document."""
+        doc = build_issue_document(
+            _issue("TEST-1", "Summary", _adf("Body"), [_adf("A comment"), "v2"])
+        )
+        assert doc.issue_key == "TEST-1"
+        assert doc.description == "Body"
+        assert doc.comments == "A comment\nv2"
+
+    def test_build_issue_document_marks_missing_fields(self):
+        """Test that fields left out of the payload are None, not empty."""
+        doc = build_issue_document({"key": "TEST-1", "fields": {"summary": "S"}})
+
+        assert doc.summary == "S"
+        assert doc.description is None
+        assert doc.comments is None
+
+    def test_extract_issue_documents_from_search_page(self):
+        """Test extracting documents from a search response."""
+        page = {"issues": [_issue("TEST-1", "One"), _issue("TEST-2", "Two")]}
+        assert [d.issue_key for d in extract_issue_documents(page)] == [
+            "TEST-1",
+            "TEST-2",
+        ]
+
+    def test_extract_issue_documents_ignores_other_payloads(self):
+        """Test that unrelated payloads produce no documents."""
+        assert extract_issue_documents({"transitions": []}) == []
+        assert extract_issue_documents([1, 2]) == []
+
+
+class TestIssueSearchRepository:
+    """Tests for IssueSearchRepository against SQLite FTS5."""
+
+    @pytest.mark.asyncio
+    async def test_search_finds_summary_description_and_comments(
+        self, search_repository: IssueSearchRepository, connection
+    ):
+        """Test that all three text sources are searchable."""
+        await search_repository.upsert_many(
+            connection.id,
+            extract_issue_documents(
+                {
+                    "issues": [
+                        _issue("TEST-1", "Login page crashes"),
+                        _issue("TEST-2", "Other", _adf("Crash on login")),
+                        _issue("TEST-3", "Third", comments=[_adf("login broken")]),
+                        _issue("TEST-4", "Unrelated issue"),
+                    ]
+                }
+            ),
+        )
+
+        total, hits = await search_repository.search(connection.id, "login")
+
+        assert total == 3
+        # Summary matches are weighted above description and comment matches
+        assert hits[0].issue_key == "TEST-1"
+        assert {h.issue_key for h in hits} == {"TEST-1", "TEST-2", "TEST-3"}
+
+    @pytest.mark.asyncio
+    async def test_search_matches_last_term_as_prefix(
+        self, search_repository: IssueSearchRepository, connection
+    ):
+        """Test search-as-you-type prefix matching."""
+        await search_repository.upsert_many(
+            connection.id, extract_issue_documents(_issue("TEST-1", "Database"))
+        )
+
+        total, _ = await search_repository.search(connection.id, "datab")
+
+        assert total == 1
+
+    @pytest.mark.asyncio
+    async def test_search_summary_scope(
+        self, search_repository: IssueSearchRepository, connection
+    ):
+        """Test that summary scope ignores description matches."""
+        await search_repository.upsert_many(
+            connection.id,
+            extract_issue_documents(
+                {
+                    "issues": [
+                        _issue("TEST-1", "Payment flow"),
+                        _issue("TEST-2", "Other", _adf("payment")),
+                    ]
+                }
+            ),
+        )
+
+        total, hits = await search_repository.search(
+            connection.id, "payment", scope="summary"
+        )
+
+        assert total == 1
+        assert hits[0].issue_key == "TEST-1"
+
+    @pytest.mark.asyncio
+    async def test_search_paginates(
+        self, search_repository: IssueSearchRepository, connection
+    ):
+        """Test limit/offset pagination with a stable total."""
+        await search_repository.upsert_many(
+            connection.id,
+            extract_issue_documents(
+                {"issues": [_issue(f"TEST-{i}", f"Report {i}") for i in range(5)]}
+            ),
+        )
+
+        total, page = await search_repository.search(
+            connection.id, "report", limit=2, offset=4
+        )
+
+        assert total == 5
+        assert len(page) == 1
+
+    @pytest.mark.asyncio
+    async def test_upsert_replaces_existing_entry(
+        self, search_repository: IssueSearchRepository, connection
+    ):
+        """Test that re-indexing an issue replaces its old text."""
+        await search_repository.upsert_many(
+            connection.id, extract_issue_documents(_issue("TEST-1", "Old title"))
+        )
+        await search_repository.upsert_many(
+            connection.id, extract_issue_documents(_issue("TEST-1", "New title"))
+        )
+
+        assert (await search_repository.search(connection.id, "old"))[0] == 0
+        assert (await search_repository.search(connection.id, "new"))[0] == 1
+        assert await search_repository.count(connection.id) == 1
+
+    @pytest.mark.asyncio
+    async def test_partial_upsert_keeps_missing_fields(
+        self, search_repository: IssueSearchRepository, connection
+    ):
+        """Test that a payload without description/comment keeps their text."""
+        await search_repository.upsert_many(
+            connection.id,
+            extract_issue_documents(
+                _issue("TEST-1", "Old title", _adf("Stack trace"), ["Seen on prod"])
+            ),
+        )
+        partial = {"key": "TEST-1", "fields": {"summary": "New title"}}
+
+        await search_repository.upsert_many(
+            connection.id, extract_issue_documents(partial)
+        )
+
+        total, hits = await search_repository.search(connection.id, "prod")
+        assert total == 1
+        assert hits[0].summary == "New title"
+        assert (await search_repository.search(connection.id, "stack"))[0] == 1
+        assert (await search_repository.search(connection.id, "old"))[0] == 0
+
+    @pytest.mark.asyncio
+    async def test_set_comments_updates_comment_text(
+        self, search_repository: IssueSearchRepository, connection
+    ):
+        """Test replacing only the comment text of an issue."""
+        await search_repository.upsert_many(
+            connection.id, extract_issue_documents(_issue("TEST-1", "Title"))
+        )
+        await search_repository.set_comments(connection.id, "TEST-1", "flaky test")
+
+        total, hits = await search_repository.search(connection.id, "flaky")
+
+        assert total == 1
+        assert hits[0].summary == "Title"
+
+    @pytest.mark.asyncio
+    async def test_search_is_scoped_to_connection(
+        self,
+        search_repository: IssueSearchRepository,
+        connection_repository: ConnectionRepository,
+        connection,
+        test_user,
+    ):
+        """Test that results never leak across connections."""
+        other = await connection_repository.create(
+            user_id=test_user.id,
+            name="Other JIRA",
+            jira_url="https://other.atlassian.net",
+            email="test@example.com",
+            api_token_encrypted=encrypt_api_token("token"),
+        )
+        await search_repository.upsert_many(
+            other.id, extract_issue_documents(_issue("OTHER-1", "Secret roadmap"))
+        )
+
+        total, _ = await search_repository.search(connection.id, "roadmap")
+
+        assert total == 0
+
+    @pytest.mark.asyncio
+    async def test_delete_removes_entry(
+        self, search_repository: IssueSearchRepository, connection
+    ):
+        """Test removing an issue from the index."""
+        await search_repository.upsert_many(
+            connection.id, extract_issue_documents(_issue("TEST-1", "Gone soon"))
+        )
+        await search_repository.delete(connection.id, "TEST-1")
+
+        assert (await search_repository.search(connection.id, "gone"))[0] == 0
+
+    @pytest.mark.asyncio
+    async def test_connection_delete_cascades(
+        self,
+        search_repository: IssueSearchRepository,
+        connection_repository: ConnectionRepository,
+        connection,
+        db_session,
+    ):
+        """Test that deleting a connection drops its index entries."""
+        await search_repository.upsert_many(
+            connection.id, extract_issue_documents(_issue("TEST-1", "Cascade"))
+        )
+        await connection_repository.delete(connection)
+
+        result = await db_session.execute(select(IssueSearchEntry))
+        assert result.scalars().all() == []
+
+    @pytest.mark.asyncio
+    async def test_search_without_terms_returns_nothing(
+        self, search_repository: IssueSearchRepository, connection
+    ):
+        """Test that punctuation-only queries are not sent to FTS."""
+        assert await search_repository.search(connection.id, '"*()') == (0, [])
@@ -0,0 +1,64 @@
+"""Tests for startup timing and lazily imported modules."""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from app.core.startup import StartupReport, process_age, startup_seconds
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+
+class TestStartupReport:
+    """Tests for lifespan step timing."""
+
+    def test_steps_and_ready(self):
+        """Test that steps are timed and exported as metrics."""
+        report = StartupReport()
+        report.imported()
+        with report.step("init_db"):
+            time.sleep(0.01)
+        report.ready()
+
+        data = report.as_dict()
+
+        assert data["steps_seconds"]["init_db"] >= 0.01
+        assert startup_seconds.value(step="init_db") >= 0.01
+        if sys.platform == "linux":
+            assert 0 < data["imported_after_seconds"] <= data["ready_after_seconds"]
+
+    @pytest.mark.skipif(sys.platform != "linux", reason="Reads /proc")
+    def test_process_age(self):
+        """Test that the process age is positive and grows."""
+        first = process_age()
+        time.sleep(0.02)
+
+        assert 0 < first < process_age()
+
+
+class TestLazyImports:
+    """Tests that heavy modules stay out of worker startup."""
+
+    def test_app_import_skips_unused_modules(self, tmp_path):
+        """Test that importing the app does not load JWT, Fernet or PostgreSQL."""
+        lazy = ["jose", "cryptography.fernet", "sqlalchemy.dialects.postgresql"]
+        code = f"import sys, app.main; print([m for m in {lazy!r} if m in sys.modules])"
+
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=BACKEND,
+            env={
+                "PATH": "",
+                "DATABASE_PATH": str(tmp_path / "app.db"),
+                "CACHE_PATH": str(tmp_path / "cache.db"),
+                "BLOB_CACHE_DIR": str(tmp_path / "blobs"),
+            },
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        assert result.stdout.strip() == "[]"
@@ -0,0 +1,179 @@
+"""Tests for request tracing and span export."""
+
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import Settings
+from app.core.tracing import Tracer, TracingMiddleware, parse_traceparent
+
+REMOTE_TRACE = "0af7651916cd43dd8448eb211c80319c"
+REMOTE_PARENT = "b7ad6b7169203331"
+
+
+@pytest.fixture
+def tracer(tmp_path) -> Tracer:
+    return Tracer(
+        Settings(tracing_enabled=True, tracing_export_path=str(tmp_path / "t.jsonl"))
+    )
+
+
+def _spans(tracer: Tracer) -> dict[str, dict]:
+    batch = tracer.export_batch()
+    spans = batch["resourceSpans"][0]["scopeSpans"][0]["spans"] if batch else []
+    return {span["name"]: span for span in spans}
+
+
+class TestTraceparent:
+    """Tests for W3C traceparent parsing."""
+
+    def test_valid_header(self):
+        """Test that a sampled traceparent is parsed."""
+        header = f"00-{REMOTE_TRACE}-{REMOTE_PARENT}-01"
+
+        assert parse_traceparent(header) == (REMOTE_TRACE, REMOTE_PARENT, True)
+
+    @pytest.mark.parametrize(
+        "header",
+        [
+            None,
+            "garbage",
+            f"01-{REMOTE_TRACE}-{REMOTE_PARENT}-01",
+            f"00-{'0' * 32}-{REMOTE_PARENT}-01",
+            f"00-{REMOTE_TRACE}-{'0' * 16}-01",
+        ],
+    )
+    def test_invalid_headers_ignored(self, header):
+        """Test that malformed or all-zero ids start a new trace instead."""
+        assert parse_traceparent(header) is None
+
+
+class TestTracingMiddleware:
+    """Tests for the request span."""
+
+    def _client(self, tracer: Tracer) -> TestClient:
+        app = FastAPI()
+
+        @app.get("/items/{item_id}")
+        async def item(item_id: str):
+            with tracer.span("work", item=item_id):
+                pass
+            return {}
+
+        app.add_middleware(TracingMiddleware, tracer=tracer)
+        return TestClient(app)
+
+    def test_remote_parent_and_children(self, tracer: Tracer):
+        """Test that the request joins the caller's trace and parents spans."""
+        response = self._client(tracer).get(
+            "/items/7", headers={"traceparent": f"00-{REMOTE_TRACE}-{REMOTE_PARENT}-01"}
+        )
+        spans = _spans(tracer)
+        request = spans["GET /items/{item_id}"]
+
+        assert response.headers["x-trace-id"] == REMOTE_TRACE
+        assert request["traceId"] == REMOTE_TRACE
+        assert request["parentSpanId"] == REMOTE_PARENT
+        assert request["kind"] == 2
+        assert spans["work"]["parentSpanId"] == request["spanId"]
+
+    def test_unsampled_remote_trace_not_exported(self, tracer: Tracer):
+        """Test that the caller's sampling decision is respected."""
+        self._client(tracer).get(
+            "/items/7", headers={"traceparent": f"00-{REMOTE_TRACE}-{REMOTE_PARENT}-00"}
+        )
+
+        assert _spans(tracer) == {}
+
+    def test_disabled_tracer_passes_through(self):
+        """Test that nothing is recorded or added when tracing is off."""
+        tracer = Tracer(Settings(tracing_enabled=False))
+
+        response = self._client(tracer).get("/items/7")
+
+        assert response.status_code == 200
+        assert "x-trace-id" not in response.headers
+        assert tracer.export_batch() is None
+
+
+class TestInstrumentation:
+    """Tests for database and upstream phase spans."""
+
+    @pytest.mark.asyncio
+    async def test_database_statements(self, tracer: Tracer):
+        """Test that each statement becomes a child span of the current one."""
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        tracer.instrument_engine(engine)
+
+        with tracer.span("handler"):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        await engine.dispose()
+        spans = _spans(tracer)
+
+        assert spans["db.query"]["parentSpanId"] == spans["handler"]["spanId"]
+        attributes = {a["key"]: a["value"] for a in spans["db.query"]["attributes"]}
+        assert attributes["db.system"] == {"stringValue": "sqlite"}
+        assert attributes["db.operation"] == {"stringValue": "SELECT"}
+
+    @pytest.mark.asyncio
+    async def test_httpcore_phases(self, tracer: Tracer):
+        """Test that httpcore trace events become upstream phase spans."""
+        upstream = tracer.start_span("relay.upstream", kind="client")
+        trace = tracer.httpcore_trace(upstream)
+
+        for event in [
+            "connection.connect_tcp.started",
+            "connection.connect_tcp.complete",
+            "connection.start_tls.started",
+            "connection.start_tls.complete",
+            "http11.send_request_headers.started",
+            "http11.send_request_headers.complete",
+            "http11.send_request_body.started",
+            "http11.send_request_body.complete",
+            "http11.receive_response_headers.started",
+            "http11.receive_response_headers.complete",
+            "http11.receive_response_body.started",
+            "http11.receive_response_body.complete",
+            "http11.response_closed.started",
+        ]:
+            await trace(event, {})
+        upstream.end()
+        spans = _spans(tracer)
+
+        assert set(spans) == {
+            "relay.upstream",
+            "upstream.connect",
+            "upstream.tls",
+            "upstream.send",
+            "upstream.ttfb",
+            "upstream.download",
+        }
+        assert spans["upstream.ttfb"]["parentSpanId"] == upstream.span_id
+
+
+class TestExport:
+    """Tests for OTLP/JSON export."""
+
+    @pytest.mark.asyncio
+    async def test_flush_appends_otlp_json_lines(self, tracer: Tracer, tmp_path):
+        """Test that each flush writes one ExportTraceServiceRequest line."""
+        with tracer.span("first"):
+            pass
+        await tracer.flush()
+        with pytest.raises(ValueError):
+            with tracer.span("second"):
+                raise ValueError("boom")
+        await tracer.flush()
+        await tracer.flush()  # Nothing buffered, nothing written
+
+        lines = (tmp_path / "t.jsonl").read_text().splitlines()
+        second = json.loads(lines[1])["resourceSpans"][0]["scopeSpans"][0]["spans"]
+
+        assert len(lines) == 2
+        assert second[0]["name"] == "second"
+        assert second[0]["status"] == {"code": 2, "message": "ValueError: boom"}
@@ -0,0 +1,107 @@
+"""Tests for upstream phase timings and the Server-Timing header."""
+
+import pytest
+
+from app.api.relay import _response_headers
+from app.core.upstream_timing import UpstreamTiming, origin_of, upstream_phase_seconds
+from app.services.relay_service import RelayResponse
+
+EVENTS = [
+    "connection.connect_tcp.started",
+    "connection.connect_tcp.complete",
+    "connection.start_tls.started",
+    "connection.start_tls.complete",
+    "http11.send_request_headers.started",
+    "http11.send_request_headers.complete",
+    "http11.send_request_body.started",
+    "http11.send_request_body.complete",
+    "http11.receive_response_headers.started",
+    "http11.receive_response_headers.complete",
+    "http11.receive_response_body.started",
+    "http11.receive_response_body.complete",
+    "http11.response_closed.started",
+]
+
+
+class TestUpstreamTiming:
+    """Tests for recording httpcore trace events."""
+
+    def test_origin_of(self):
+        """Test that the label is the JIRA site without its path."""
+        assert (
+            origin_of("https://acme.atlassian.net/jira") == "https://acme.atlassian.net"
+        )
+        assert origin_of("http://localhost:8080") == "http://localhost:8080"
+
+    @pytest.mark.asyncio
+    async def test_phases_recorded_and_chained(self):
+        """Test that every phase is timed and events reach the chained callback."""
+        seen = []
+
+        async def chained(event_name, info):
+            seen.append(event_name)
+
+        timing = UpstreamTiming("https://acme.atlassian.net")
+        trace = timing.trace(chained)
+        for event in EVENTS:
+            await trace(event, {})
+
+        assert set(timing.phases) == {"connect", "tls", "send", "ttfb", "download"}
+        assert seen == EVENTS
+
+    @pytest.mark.asyncio
+    async def test_reused_connection_has_no_connect(self):
+        """Test that keep-alive requests only have request phases."""
+        timing = UpstreamTiming("https://acme.atlassian.net")
+        trace = timing.trace()
+        for event in EVENTS[4:]:
+            await trace(event, {})
+
+        assert set(timing.phases) == {"send", "ttfb", "download"}
+
+    def test_observe_per_origin(self):
+        """Test that phases are aggregated under the JIRA origin."""
+        origin = "https://observe.example.net"
+        timing = UpstreamTiming(origin, phases={"ttfb": 0.2, "download": 0.01})
+
+        timing.observe()
+
+        assert upstream_phase_seconds.count(origin=origin, phase="ttfb") == 1
+        assert upstream_phase_seconds.count(origin=origin, phase="connect") == 0
+
+
+class TestServerTiming:
+    """Tests for the Server-Timing response header."""
+
+    def test_header_value(self):
+        """Test that phases are listed in order with the total last."""
+        timing = UpstreamTiming(
+            "https://acme.atlassian.net",
+            phases={"ttfb": 0.1804, "connect": 0.012},
+            total=0.2015,
+        )
+
+        assert timing.server_timing() == (
+            "upstream-connect;dur=12.0, upstream-ttfb;dur=180.4, upstream;dur=201.5"
+        )
+
+    def test_relay_headers_keep_jira_server_timing(self):
+        """Test that JIRA's own Server-Timing is appended, not replaced."""
+        response = RelayResponse(
+            status_code=200,
+            headers={"content-type": "application/json", "server-timing": "db;dur=5"},
+            body=b"{}",
+            timing=UpstreamTiming("https://acme.atlassian.net", total=0.05),
+        )
+
+        headers = _response_headers(response)
+
+        assert headers["Server-Timing"] == "upstream;dur=50.0, db;dur=5"
+        assert "server-timing" not in headers
+        assert response.headers["server-timing"] == "db;dur=5"
+
+    def test_mock_responses_unchanged(self):
+        """Test that responses without upstream timings keep their headers."""
+        response = RelayResponse(200, {"content-type": "application/json"}, b"{}")
+
+        assert _response_headers(response) == {"content-type": "application/json"}
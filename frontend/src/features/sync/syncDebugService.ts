@@ -21,6 +21,18 @@ export function logSyncEvent(
   useSyncDebugStore.getState().addLog(entry);
 }
 
+// Log upstream phase timings of the JIRA requests made while syncing, so a
+// slow network (connect/tls) can be told apart from a slow JIRA (ttfb)
+api.onUpstreamTiming((method, endpoint, timing) => {
+  if (useSyncStore.getState().status !== 'syncing') return;
+  logSyncEvent({
+    level: 'info',
+    operation: method === 'GET' ? 'pull' : 'push',
+    message: `Upstream ${method} ${endpoint.split('?')[0]}: ${timing.upstream ?? '?'} ms (ttfb ${timing.ttfb ?? '?'} ms)`,
+    details: { endpoint, timing },
+  });
+});
+
 // Helper to map status category
 function mapStatusCategory(
   category: string
@@ -4,7 +4,12 @@
  * Phase 3: Push and pull sync with conflict detection
  */
 
-import { api, type JiraIssue, type JiraSearchResponse } from '@/lib/api';
+import {
+  api,
+  type JiraIssue,
+  type JiraSearchResponse,
+  type RequestPriority,
+} from '@/lib/api';
 import {
   db,
   issueRepository,
@@ -17,6 +22,10 @@ import { issueService } from '@/features/issues/issueService';
 import { logSyncEvent } from '@/features/sync/syncDebugService';
 import type { Issue, PendingOperation } from '@/types';
 
+// Relay lane of every JIRA call the sync engine makes, so bulk pulls and
+// pushes queue behind requests for what the user is looking at
+const SYNC_PRIORITY: RequestPriority = 'sync';
+
 // Map status category from JIRA to our simplified version
 function mapStatusCategory(
   category: string
@@ -223,7 +232,8 @@ export class SyncEngine {
             'created',
             'updated',
           ],
-        }
+        },
+        SYNC_PRIORITY
       );
 
       // Process issues
@@ -384,7 +394,11 @@ export class SyncEngine {
       console.log(
         `[syncEngine] Fetching comments for ${issueKey} (issueId=${issueId})...`
       );
-      const response = await api.getComments(connectionId, issueKey);
+      const response = await api.getComments(
+        connectionId,
+        issueKey,
+        SYNC_PRIORITY
+      );
 
       console.log(
         `[syncEngine] Got ${response.comments.length} comments for ${issueKey}, total=${response.total}`
@@ -480,7 +494,8 @@ export class SyncEngine {
               try {
                 const remoteIssue = await api.getIssue(
                   connectionId,
-                  localIssue.key
+                  localIssue.key,
+                  SYNC_PRIORITY
                 );
                 await this.handlePushConflict(
                   localIssue,
@@ -540,7 +555,11 @@ export class SyncEngine {
     // Version check: GET current issue from JIRA
     let remoteIssue: JiraIssue;
     try {
-      remoteIssue = await api.getIssue(connectionId, localIssue.key);
+      remoteIssue = await api.getIssue(
+        connectionId,
+        localIssue.key,
+        SYNC_PRIORITY
+      );
     } catch (error) {
       // Issue might not exist on server (new issue) - handle separately
       console.error(`Failed to fetch remote issue ${localIssue.key}:`, error);
@@ -594,7 +613,11 @@ export class SyncEngine {
     await this.executePendingOperation(connectionId, op, localIssue);
 
     // Get updated remote version after push
-    const updatedRemote = await api.getIssue(connectionId, localIssue.key);
+    const updatedRemote = await api.getIssue(
+      connectionId,
+      localIssue.key,
+      SYNC_PRIORITY
+    );
 
     // Mark issue as synced with new version
     await issueRepository.put({
@@ -641,9 +664,11 @@ export class SyncEngine {
     );
 
     // Create the issue on the remote server
-    const createResult = await api.createIssue(connectionId, {
-      fields: payload.fields,
-    });
+    const createResult = await api.createIssue(
+      connectionId,
+      { fields: payload.fields },
+      SYNC_PRIORITY
+    );
 
     console.log(
       `[syncEngine] Issue created: id=${createResult.id}, key=${createResult.key}`
@@ -653,7 +678,11 @@ export class SyncEngine {
     // to prevent duplicate creation on retry, regardless of whether getIssue succeeds
     try {
       // Fetch the full issue to get all fields and timestamps
-      const remoteIssue = await api.getIssue(connectionId, createResult.key);
+      const remoteIssue = await api.getIssue(
+        connectionId,
+        createResult.key,
+        SYNC_PRIORITY
+      );
 
       // Convert to local format
       const newLocalIssue = this.mapJiraIssueToLocalStatic(remoteIssue);
@@ -754,7 +783,8 @@ export class SyncEngine {
     const response = await api.addComment(
       connectionId,
       localIssue.key,
-      payload.body
+      payload.body,
+      SYNC_PRIORITY
     );
 
     // Convert response to local format and store
@@ -794,13 +824,17 @@ export class SyncEngine {
       await api.transitionIssue(
         connectionId,
         localIssue.key,
-        payload.transition.id
+        payload.transition.id,
+        SYNC_PRIORITY
       );
     } else if (payload.fields) {
       // Handle field update
-      await api.updateIssue(connectionId, localIssue.key, {
-        fields: payload.fields,
-      });
+      await api.updateIssue(
+        connectionId,
+        localIssue.key,
+        { fields: payload.fields },
+        SYNC_PRIORITY
+      );
     }
   }
 
@@ -868,7 +902,11 @@ export class SyncEngine {
     const store = useSyncStore.getState();
 
     try {
-      const jiraIssue = await api.getIssue(connectionId, issueKey);
+      const jiraIssue = await api.getIssue(
+        connectionId,
+        issueKey,
+        SYNC_PRIORITY
+      );
       const issue = mapJiraIssueToLocal(jiraIssue);
       await issueRepository.put(issue);
       return issue;
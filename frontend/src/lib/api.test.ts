@@ -0,0 +1,61 @@
+import { describe, it, expect, vi, afterEach } from 'vitest';
+import { api, parseServerTiming } from './api';
+
+describe('parseServerTiming', () => {
+  it('parses upstream phases and the total', () => {
+    expect(
+      parseServerTiming(
+        'upstream-connect;dur=12.5, upstream-ttfb;dur=180.2, upstream;dur=201.5'
+      )
+    ).toEqual({ connect: 12.5, ttfb: 180.2, upstream: 201.5 });
+  });
+
+  it('ignores metrics that are not upstream timings', () => {
+    expect(
+      parseServerTiming('upstream-tls;dur=8, cdn-cache;desc=HIT, db;dur=3')
+    ).toEqual({ tls: 8 });
+  });
+
+  it('returns null without upstream timings', () => {
+    expect(parseServerTiming(null)).toBeNull();
+    expect(parseServerTiming('db;dur=3')).toBeNull();
+  });
+});
+
+describe('request priority', () => {
+  afterEach(() => {
+    vi.unstubAllGlobals();
+  });
+
+  function stubFetch() {
+    const fetchMock = vi.fn(
+      async () =>
+        new Response(JSON.stringify({ id: '1', key: 'T-1' }), { status: 200 })
+    );
+    vi.stubGlobal('fetch', fetchMock);
+    return fetchMock;
+  }
+
+  function sentRequest(fetchMock: ReturnType<typeof stubFetch>) {
+    return fetchMock.mock.calls[0] as unknown as [string, RequestInit];
+  }
+
+  it('sends the lane of a sync-initiated GET', async () => {
+    const fetchMock = stubFetch();
+
+    await api.getIssue('c1', 'T-1', 'sync');
+
+    const [url, init] = sentRequest(fetchMock);
+    expect(url).toBe('/api/jira/c1/rest/api/3/issue/T-1');
+    expect(init.headers).toHaveProperty('X-Request-Priority', 'sync');
+  });
+
+  it('leaves the lane to the backend without a priority', async () => {
+    const fetchMock = stubFetch();
+
+    await api.getIssue('c1', 'T-1');
+
+    const [, init] = sentRequest(fetchMock);
+    expect(init.headers).not.toHaveProperty('X-Request-Priority');
+  });
+});
@@ -13,22 +13,78 @@ import type {
 
 const API_BASE = '/api';
 
+/** Upstream JIRA phase durations in ms, e.g. { ttfb: 180.2, upstream: 201.5 } */
+export type UpstreamTiming = Record<string, number>;
+
+/**
+ * Relay lane for a JIRA call, sent as X-Request-Priority. Without it the
+ * backend picks the lane by route (searches are sync, the rest interactive).
+ */
+export type RequestPriority =
+  | 'interactive'
+  | 'sync'
+  | 'prefetch'
+  | 'background';
+
+export interface RequestOptions extends RequestInit {
+  priority?: RequestPriority;
+}
+
+type UpstreamTimingListener = (
+  method: string,
+  endpoint: string,
+  timing: UpstreamTiming
+) => void;
+
+/**
+ * Parse the relay's Server-Timing header (`upstream-ttfb;dur=180.2, ...`).
+ * Returns null when the response did not come from a JIRA server.
+ */
+export function parseServerTiming(
+  header: string | null
+): UpstreamTiming | null {
+  if (!header) return null;
+  const timing: UpstreamTiming = {};
+  for (const metric of header.split(',')) {
+    const [name, ...params] = metric.trim().split(';');
+    if (!name.startsWith('upstream')) continue;
+    const duration = params
+      .map((param) => param.trim())
+      .find((param) => param.startsWith('dur='));
+    if (duration) {
+      const phase = name.replace(/^upstream-?/, '') || 'upstream';
+      timing[phase] = Number(duration.slice(4));
+    }
+  }
+  return Object.keys(timing).length > 0 ? timing : null;
+}
+
 class ApiClient {
   private token: string | null = null;
+  private upstreamTimingListener: UpstreamTimingListener | null = null;
 
   setToken(token: string | null) {
     this.token = token;
   }
 
+  /** Be told the upstream phase timings of every relayed JIRA request. */
+  onUpstreamTiming(listener: UpstreamTimingListener | null) {
+    this.upstreamTimingListener = listener;
+  }
+
   private async request<T>(
     endpoint: string,
-    options: RequestInit = {}
+    { priority, ...options }: RequestOptions = {}
   ): Promise<T> {
     const headers: HeadersInit = {
       'Content-Type': 'application/json',
       ...options.headers,
     };
 
+    if (priority) {
+      (headers as Record<string, string>)['X-Request-Priority'] = priority;
+    }
+
     if (this.token) {
       (headers as Record<string, string>)['Authorization'] =
         `Bearer ${this.token}`;
@@ -46,6 +102,11 @@ class ApiClient {
       `[api] response: ${response.status} ${response.statusText} for ${url}`
     );
 
+    const timing = parseServerTiming(response.headers.get('Server-Timing'));
+    if (timing && this.upstreamTimingListener) {
+      this.upstreamTimingListener(options.method || 'GET', endpoint, timing);
+    }
+
     if (!response.ok) {
       const error = await response.json().catch(() => ({}));
       console.log(`[api] error:`, error);
@@ -128,7 +189,7 @@ class ApiClient {
   async jiraRequest<T>(
     connectionId: string,
     path: string,
-    options: RequestInit = {}
+    options: RequestOptions = {}
   ): Promise<T> {
     const fullPath = `/jira/${connectionId}${path}`;
     console.log(
@@ -144,7 +205,8 @@ class ApiClient {
       nextPageToken?: string;
       maxResults?: number;
       fields?: string[];
-    } = {}
+    } = {},
+    priority?: RequestPriority
   ): Promise<JiraSearchResponse> {
     console.log(`[api] searchIssues called with jql: "${params.jql}"`);
     const queryParams = new URLSearchParams();
@@ -164,24 +226,28 @@ class ApiClient {
     const query = queryParams.toString();
     return this.jiraRequest<JiraSearchResponse>(
       connectionId,
-      `/rest/api/3/search/jql${query ? `?${query}` : ''}`
+      `/rest/api/3/search/jql${query ? `?${query}` : ''}`,
+      { priority }
     );
   }
 
   async getIssue(
     connectionId: string,
-    issueIdOrKey: string
+    issueIdOrKey: string,
+    priority?: RequestPriority
   ): Promise<JiraIssue> {
     return this.jiraRequest<JiraIssue>(
       connectionId,
-      `/rest/api/3/issue/${issueIdOrKey}`
+      `/rest/api/3/issue/${issueIdOrKey}`,
+      { priority }
     );
   }
 
   async updateIssue(
     connectionId: string,
     issueIdOrKey: string,
-    update: { fields: Record<string, unknown> }
+    update: { fields: Record<string, unknown> },
+    priority?: RequestPriority
   ): Promise<void> {
     return this.jiraRequest<void>(
       connectionId,
@@ -189,13 +255,15 @@ class ApiClient {
       {
         method: 'PUT',
         body: JSON.stringify(update),
+        priority,
       }
     );
   }
 
   async createIssue(
     connectionId: string,
-    payload: { fields: Record<string, unknown> }
+    payload: { fields: Record<string, unknown> },
+    priority?: RequestPriority
   ): Promise<{ id: string; key: string; self: string }> {
     return this.jiraRequest<{ id: string; key: string; self: string }>(
       connectionId,
@@ -203,6 +271,7 @@ class ApiClient {
       {
         method: 'POST',
         body: JSON.stringify(payload),
+        priority,
       }
     );
   }
@@ -220,7 +289,8 @@ class ApiClient {
   async transitionIssue(
     connectionId: string,
     issueIdOrKey: string,
-    transitionId: string
+    transitionId: string,
+    priority?: RequestPriority
   ): Promise<void> {
     return this.jiraRequest<void>(
       connectionId,
@@ -228,13 +298,15 @@ class ApiClient {
       {
         method: 'POST',
         body: JSON.stringify({ transition: { id: transitionId } }),
+        priority,
       }
     );
   }
 
   async getComments(
     connectionId: string,
-    issueIdOrKey: string
+    issueIdOrKey: string,
+    priority?: RequestPriority
   ): Promise<{
     comments: JiraComment[];
     total: number;
@@ -249,7 +321,9 @@ class ApiClient {
       total: number;
       startAt: number;
       maxResults: number;
-    }>(connectionId, `/rest/api/3/issue/${issueIdOrKey}/comment`);
+    }>(connectionId, `/rest/api/3/issue/${issueIdOrKey}/comment`, {
+      priority,
+    });
     console.log(`[api] getComments result:`, result);
     return result;
   }
@@ -257,7 +331,8 @@ class ApiClient {
   async addComment(
     connectionId: string,
     issueIdOrKey: string,
-    body: unknown
+    body: unknown,
+    priority?: RequestPriority
   ): Promise<JiraComment> {
     return this.jiraRequest<JiraComment>(
       connectionId,
@@ -265,6 +340,7 @@ class ApiClient {
       {
         method: 'POST',
         body: JSON.stringify({ body }),
+        priority,
       }
     );
   }